@@ -0,0 +1,60 @@
+"""
+Colormap lookup tables for the dashboard maps.
+
+Each colormap is sampled once into a 256-entry table of hex colours (the
+resolution of matplotlib's own colormaps), so mapping values to colours is a
+single vectorised index into the table instead of a matplotlib call per value,
+and matplotlib is only touched at import time.
+"""
+
+import matplotlib
+import numpy as np
+
+LUT_SIZE = 256
+
+# Colormaps used by cs_map, tabulated at import
+COLORMAPS = ('viridis', 'plasma', 'RdYlGn_r')
+
+# matplotlib draws NaN with its transparent "bad" colour, which rgb2hex turns into black
+NAN_COLOR = '#000000'
+
+_luts = {}
+
+
+def lookup_table(cmap_name):
+    """256 hex colours of matplotlib colormap `cmap_name`, built on first use."""
+    lut = _luts.get(cmap_name)
+    if lut is None:
+        rgb = matplotlib.colormaps[cmap_name](np.arange(LUT_SIZE))[:, :3]
+        rgb = np.round(rgb * 255).astype(int)
+        lut = np.array([f'#{r:02x}{g:02x}{b:02x}' for r, g, b in rgb], dtype=object)
+        _luts[cmap_name] = lut
+    return lut
+
+
+def colors_for(values, vmin, vmax, cmap_name='viridis'):
+    """
+    Hex colour of every value in `values` on `cmap_name` normalised to
+    [vmin, vmax] (the lowest colour when vmax <= vmin). Values outside the range
+    take the end colours, as with matplotlib. Returns an object array.
+    """
+    values = np.asarray(values, dtype=float)
+    if vmax > vmin:
+        norm = (values - vmin) / (vmax - vmin)
+    else:
+        norm = np.where(np.isnan(values), np.nan, 0.0)
+    with np.errstate(invalid='ignore'):
+        index = np.clip(np.floor(norm * LUT_SIZE), 0, LUT_SIZE - 1)
+    nan = np.isnan(index)
+    colors = lookup_table(cmap_name)[np.where(nan, 0, index).astype(int)]
+    colors[nan] = NAN_COLOR
+    return colors
+
+
+def color_for(value, vmin, vmax, cmap_name='viridis'):
+    """Hex colour of a single value (see colors_for)."""
+    return colors_for([value], vmin, vmax, cmap_name)[0]
+
+
+for _name in COLORMAPS:
+    lookup_table(_name)
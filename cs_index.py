@@ -2,7 +2,6 @@ import dash
 from dash import Dash, html, dcc, Input, Output
 import dash_bootstrap_components as dbc
 import dash_html_components as html
-from datetime import datetime, timedelta
 from cs_map import (
     build_dafor_sum_map_figure,
     build_map_figure,
@@ -18,7 +17,8 @@ from cs_map import (
 )    
 
 from cs_controllers import cs_controls, REBIO_LOCALITIES, REBIO_ENTORNO_LOCALITIES, REBIO_SEM_LILI_ENTORNO_LOCALITIES
-from services.data_service import CoralDataService
+from services.data_service import CoralDataService, result_cache, snapshot_store
+from services.request_context import ContextStore, DashboardData, resolve_dashboard_filters
 from dash import Dash, html, dcc, Input, Output
 import dash_bootstrap_components as dbc
 from cs_map import build_map_figure
@@ -38,14 +38,15 @@ from cs_histogram import (
 ) 
 from cs_tables import build_occurrences_table
 from cs_methods import methods_layout  # Your text tab layout
-from cs_report import get_report_layout  # Real-time report tab
+from cs_report import get_report_layout, get_report_figure, get_report_summary, placeholder_figure, REPORT_CHARTS, UNAVAILABLE_MESSAGE  # Real-time report tab
+from cs_report_snapshot import load_report_figure, load_report_summary, start_report_refresher
 from services.data_service import CoralDataService
 #from cs_methods import methods_layout
 from dash import ctx
 import plotly.graph_objects as go
 from dash.dependencies import Output, State
 from dash import callback, no_update
-from flask import send_from_directory, Flask, Response
+from flask import send_from_directory, Flask, Response, jsonify
 import sqlalchemy
 import os
 import base64
@@ -57,6 +58,31 @@ app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP],
            title="Coral-Sol Dashboard" )
 server = app.server
 
+
+@server.route("/cache-stats")
+def cache_stats():
+    """Hit/miss/eviction counters and size of the shared service result cache."""
+    return jsonify(result_cache.stats())
+
+
+# Locality-dropdown groups and their locality ids
+LOCALITY_GROUPS = {
+    "rebiogrp": REBIO_LOCALITIES,
+    "rebiogrp_entorno": REBIO_ENTORNO_LOCALITIES,
+    "rebiogrp_sem_lili_entorno": REBIO_SEM_LILI_ENTORNO_LOCALITIES,
+}
+
+# Data of the recent control states, shared by the callbacks one interaction fires
+dashboard_contexts = ContextStore(max_entries=16, ttl_seconds=60)
+
+
+def get_dashboard_data(selected_localities, time_range, custom_start_date, custom_end_date):
+    """DashboardData of the current controls, shared by update_visuals and update_metrics."""
+    filters = resolve_dashboard_filters(selected_localities, time_range, custom_start_date, custom_end_date,
+                                        LOCALITY_GROUPS)
+    version = snapshot_store.version('locality', 'dafor', 'occurrence', 'management') if snapshot_store.enabled else None
+    return dashboard_contexts.get((filters, version), lambda: DashboardData(CoralDataService(), filters))
+
 # Define dashboard_layout 
 dashboard_layout = html.Div([
     html.Div(dcc.Loading(dcc.Graph(id="cs-map-graph", config={'scrollZoom': True}), type="circle"), id="div-map"),
@@ -160,50 +186,13 @@ def toggle_date_picker(time_range):
 )
 
 def update_visuals(indicator, selected_localities, time_range, custom_start_date, custom_end_date, boundary_toggle):
-    service = CoralDataService()
+    # Filters resolved once and data loaded once per interaction (see get_dashboard_data)
+    data = get_dashboard_data(selected_localities, time_range, custom_start_date, custom_end_date)
+    start_date, end_date = data.window
+    selected_localities = data.locality_list
     
     # Convert boundary toggle from list to boolean
     show_boundary = "show_boundary" in (boundary_toggle or [])
-    
-    # Calculate dates based on time range selection
-    if time_range == "all":
-        start_date = None
-        end_date = None
-    elif time_range == "custom":
-        start_date = custom_start_date
-        end_date = custom_end_date
-    elif time_range == "1year":
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=365)
-    elif time_range == "6months":
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=182)
-    elif time_range == "3months":
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=91)
-    else:
-        # Default to 1 year
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=365)
-
-    # Normalize selected_localities to handle group selection
-    if not selected_localities or 0 in (selected_localities if isinstance(selected_localities, list) else [selected_localities]):
-        selected_localities = None
-    else:
-        ids = []
-        for loc in selected_localities if isinstance(selected_localities, list) else [selected_localities]:
-            if loc == "rebiogrp":
-                ids.extend(REBIO_LOCALITIES)
-            elif loc == "rebiogrp_entorno":
-                ids.extend(REBIO_ENTORNO_LOCALITIES)
-            elif loc == "rebiogrp_sem_lili_entorno":
-                ids.extend(REBIO_SEM_LILI_ENTORNO_LOCALITIES)
-            else:
-                try:
-                    ids.append(int(loc))
-                except Exception:
-                    pass
-        selected_localities = list(set(ids)) if ids else None
 
     # Default empty figures
     fig_map = go.Figure()
@@ -225,9 +214,7 @@ def update_visuals(indicator, selected_localities, time_range, custom_start_date
     occurrences_table = None  # <--- Add this line
 
     if indicator == "dpue":
-        dpue_df = service.get_dpue_by_locality(start_date, end_date)
-        if selected_localities:
-            dpue_df = dpue_df[dpue_df['locality_id'].isin(selected_localities)]
+        dpue_df = data.dpue()
         fig_map = build_map_figure(dpue_df, show_boundary)
         fig_hist = build_histogram_figure(dpue_df)
         fig_bar = build_locality_bar_figure(dpue_df)
@@ -241,25 +228,11 @@ def update_visuals(indicator, selected_localities, time_range, custom_start_date
 
     elif indicator == "dafor":
         # Get DAFOR sum per locality (for bar and map)
-        df_dafor_sum = service.get_sum_of_dafor_by_locality(start_date, end_date)
-        if selected_localities:
-            df_dafor_sum = df_dafor_sum[df_dafor_sum['locality_id'].isin(selected_localities)]
+        df_dafor_sum = data.dafor_sum()
         fig_map = build_dafor_sum_map_figure(df_dafor_sum, show_boundary)
 
-        # Get all DAFOR values (for histogram)
-        dafor_df = service.get_dafor_data(start_date, end_date)
-        if selected_localities:
-            dafor_df = dafor_df[dafor_df['locality_id'].isin(selected_localities)]
-        # If dafor_value is a string of comma-separated values, flatten it:
-        if dafor_df['dafor_value'].apply(lambda x: isinstance(x, str) and ',' in x).any():
-            dafor_df['dafor_value'] = dafor_df['dafor_value'].apply(
-                lambda x: [pd.to_numeric(i, errors='coerce') for i in str(x).split(',')]
-            )
-            dafor_values = pd.Series([v for sublist in dafor_df['dafor_value'] for v in sublist])
-        else:
-            dafor_values = pd.to_numeric(dafor_df['dafor_value'], errors='coerce')
-        dafor_values = dafor_values.dropna()
-        dafor_values = dafor_values[(dafor_values >= 0) & (dafor_values <= 10)]
+        # Get all DAFOR minute scores (for histogram)
+        dafor_values = data.dafor_values()
 
         fig_dafor_hist = build_dafor_histogram_figure(dafor_values)
         fig_dafor_sum_bar = build_dafor_sum_bar_figure(df_dafor_sum)
@@ -272,9 +245,7 @@ def update_visuals(indicator, selected_localities, time_range, custom_start_date
 
     elif indicator == "raiw":
         # Get RAI-W data per locality
-        raiw_df = service.get_raiw_by_locality(start_date, end_date)
-        if selected_localities:
-            raiw_df = raiw_df[raiw_df['locality_id'].isin(selected_localities)]
+        raiw_df = data.raiw()
         
         # Build visualizations
         fig_map = build_raiw_map_figure(raiw_df, show_boundary)
@@ -290,9 +261,7 @@ def update_visuals(indicator, selected_localities, time_range, custom_start_date
 
     elif indicator == "dafor_spatial":
         # Get spatial DAFOR data (20m segments with averaged scores)
-        segments_df = service.get_dafor_spatial_data(start_date, end_date)
-        if selected_localities:
-            segments_df = segments_df[segments_df['locality_id'].isin(selected_localities)]
+        segments_df = data.dafor_spatial()
         
         # Build spatial heat map
         fig_map = build_dafor_spatial_map_figure(segments_df, show_boundary)
@@ -313,7 +282,7 @@ def update_visuals(indicator, selected_localities, time_range, custom_start_date
         removal_ratio_style = style_hide
 
     elif indicator == "occurrences":
-        occurrences_df = service.get_occurrences_data(start_date, end_date)
+        occurrences_df = data.occurrences()
         # Keep a copy for the map (needs spot_coords)
         map_df = occurrences_df.copy()
 
@@ -340,8 +309,8 @@ def update_visuals(indicator, selected_localities, time_range, custom_start_date
         removal_ratio_style = style_hide
 
     elif indicator == "management":
-        df_management = service.get_management_data(start_date, end_date)
-        localities = service.get_locality_data()[['locality_id', 'name']]
+        df_management = data.management()
+        localities = data.localities()[['locality_id', 'name']]
         localities.columns = localities.columns.str.lower()
         df_management.columns = df_management.columns.str.lower()
         df_management = df_management.merge(localities, on='locality_id', how='left')
@@ -355,12 +324,10 @@ def update_visuals(indicator, selected_localities, time_range, custom_start_date
         removal_ratio_style = style_show
 
     elif indicator == "days_since_management":
-        df_days_since = service.get_days_since_last_management(start_date, end_date)
+        df_days_since = data.days_since_management()
         # debug print
         print("DataFrame for chart:", df_days_since.head())
         print("Rows for chart:", len(df_days_since))
-        if selected_localities:
-            df_days_since = df_days_since[df_days_since['locality_id'].isin(selected_localities)]
         fig_map = build_days_since_management_map_figure(df_days_since, show_boundary)
         fig_bar = build_days_since_management_bar_figure(df_days_since)
         # Hide other charts, show map and bar
@@ -375,13 +342,11 @@ def update_visuals(indicator, selected_localities, time_range, custom_start_date
         removal_ratio_style = style_hide
    
     elif indicator == "days_since_monitoring":
-        df_days_since = service.get_days_since_last_monitoring(start_date, end_date)
+        df_days_since = data.days_since_monitoring()
         # debug print
         #print("DataFrame for chart:", df_days_since.head())
         #print("Rows for chart:", len(df_days_since))
-        print("All locality_ids in data:", df_days_since["locality_id"].unique())
         if selected_localities:
-            df_days_since = df_days_since[df_days_since['locality_id'].isin(selected_localities)]
             print("Selected localities:", selected_localities)
             print("Filtered locality_ids:", df_days_since["locality_id"].unique())
             print("Filtered rows:", len(df_days_since))
@@ -399,12 +364,10 @@ def update_visuals(indicator, selected_localities, time_range, custom_start_date
     
     elif indicator == "monitoring_intensity":
         # Get monitoring events data
-        events_df = service.get_monitoring_events_by_locality(start_date, end_date)
-        if selected_localities:
-            events_df = events_df[events_df['locality_id'].isin(selected_localities)]
+        events_df = data.monitoring_events()
         
         # Build visualizations with line-based density map
-        fig_map = build_monitoring_line_density_map_figure(service, start_date, end_date, selected_localities, None, show_boundary)
+        fig_map = build_monitoring_line_density_map_figure(data.service, start_date, end_date, selected_localities, None, show_boundary)
         fig_bar = build_monitoring_events_bar_figure(events_df)
         fig_hist = build_monitoring_events_histogram_figure(events_df)
         
@@ -546,34 +509,13 @@ app.layout = dbc.Container(
     ]
 )
 def update_metrics(indicator, selected_localities, time_range, custom_start_date, custom_end_date):
-    service = CoralDataService()
+    # Same filters and data as update_visuals (metrics cover every locality)
+    data = get_dashboard_data(selected_localities, time_range, custom_start_date, custom_end_date)
     
-    # Calculate dates based on time range selection (same logic as main callback)
-    if time_range == "all":
-        start_date = None
-        end_date = None
-    elif time_range == "custom":
-        start_date = custom_start_date
-        end_date = custom_end_date
-    elif time_range == "1year":
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=365)
-    elif time_range == "6months":
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=182)
-    elif time_range == "3months":
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=91)
-    else:
-        # Default to all time
-        start_date = None
-        end_date = None
-    
-    # Get data with calculated dates
-    df_management = service.get_management_data(start_date, end_date)
+    df_management = data.management()
     total_mass = df_management["managed_mass_kg"].sum() if not df_management.empty else 0
     num_actions = len(df_management) if not df_management.empty else 0
-    km_monitored = service.get_km_monitored(start_date, end_date)
+    km_monitored = data.km_monitored()
 
     return f"{total_mass:,.0f}", f"{num_actions:,}", f"{km_monitored:,.2f}"
 
@@ -590,6 +532,30 @@ def go_back_to_dashboard(n_clicks_report, n_clicks_methods):
         return "dashboard"
     return dash.no_update
 
+def register_report_chart_callback(graph_id):
+    """Fill report graph `graph_id` when the report tab is opened."""
+    @app.callback(
+        Output(graph_id, "figure"),
+        Input("main-tabs", "value"),
+        prevent_initial_call=True
+    )
+    def update_report_chart(tab):
+        if tab != "report":
+            return no_update
+        # Precomputed snapshot when available, otherwise built here
+        figure = load_report_figure(graph_id)
+        if figure is not None:
+            return figure
+        try:
+            return get_report_figure(graph_id)
+        except Exception as e:
+            print(f"Error building report chart {graph_id}: {e}")
+            return placeholder_figure(UNAVAILABLE_MESSAGE)
+
+
+for report_graph_id in REPORT_CHARTS:
+    register_report_chart_callback(report_graph_id)
+
 # Update report tab summary cards based on date range and locality
 @app.callback(
     [
@@ -607,33 +573,23 @@ def go_back_to_dashboard(n_clicks_report, n_clicks_methods):
 )
 def update_report_summary(selected_localities, time_range, custom_start_date, custom_end_date):
     """Update the summary statistics cards in the report tab."""
-    service = CoralDataService()
-
     # Report summary cards should always reflect the full dataset.
     # Inputs are kept only to trigger recalculation when dashboard controls change.
     _ = (selected_localities, time_range, custom_start_date, custom_end_date)
-    start_date = None
-    end_date = None
-
-    # Get full-dataset data
-    dpue_data = service.get_dpue_by_locality(start_date, end_date)
-    management_data = service.get_management_data(start_date, end_date)
-    occurrences_data = service.get_occurrences_data(start_date, end_date)
-
-    # Calculate statistics
-    total_localities = dpue_data['locality_id'].nunique() if not dpue_data.empty else 0
-    total_management_kg = management_data['managed_mass_kg'].sum() if not management_data.empty else 0
-    total_occurrences = len(occurrences_data) if not occurrences_data.empty else 0
-    avg_dpue = dpue_data['DPUE'].mean() if not dpue_data.empty else 0
-    
+    summary = load_report_summary() or get_report_summary()
+
     return (
-        str(total_localities),
-        f"{total_management_kg:.1f} kg",
-        str(total_occurrences),
-        f"{avg_dpue:.2f}"
+        str(summary['total_localities']),
+        f"{summary['total_management_kg']:.1f} kg",
+        str(summary['total_occurrences']),
+        f"{summary['avg_dpue']:.2f}"
     )
 
 if __name__ == "__main__":
+    # Keep the report snapshot up to date in the background (REPORT_REFRESH_SECONDS=0 disables it).
+    # The debug reloader runs this file in a watcher and a serving process; only the latter refreshes.
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_report_refresher()
     app.run(debug=True)
 
 
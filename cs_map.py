@@ -6,8 +6,7 @@ import json
 from services.data_service import CoralDataService
 import pandas as pd
 import numpy as np
-import matplotlib
-import matplotlib.cm
+from cs_colors import color_for, colors_for
 from geopy.distance import geodesic
 import os
 
@@ -85,11 +84,96 @@ def add_rebio_boundary_to_map(fig):
         ))
     return fig
 
-def value_to_color(val, vmin, vmax, cmap_name='viridis'):
-    norm = (val - vmin) / (vmax - vmin) if vmax > vmin else 0
-    cmap = matplotlib.cm.get_cmap(cmap_name)
-    rgba = cmap(norm)
-    return matplotlib.colors.rgb2hex(rgba)
+# Locality lines are drawn in at most this many traces, one per colour bin
+LINE_COLOR_BINS = 32
+
+
+def locality_line_arrays(coords_json):
+    """
+    Parse each locality's 'coords_local' JSON into (row positions, lats, lons) of
+    the valid polylines, skipping rows that are not a list of [lat, lon] points.
+    """
+    rows, lats, lons = [], [], []
+    for pos, coords in enumerate(coords_json):
+        try:
+            points = json.loads(coords)
+            if points and isinstance(points, list) and isinstance(points[0], list):
+                lat, lon = zip(*points)
+                rows.append(pos)
+                lats.append(lat)
+                lons.append(lon)
+        except Exception as e:
+            print(f"Error parsing locality line at row {pos}: {e}")
+    return rows, lats, lons
+
+
+def add_locality_lines(fig, localities, values, hover_text, cmap_name='viridis', colorscale='Viridis',
+                       vmin=None, vmax=None, line_width=4, marker_size=None, colorbar_title=None):
+    """
+    Draw the boundary ('coords_local') of every row of `localities`, coloured by
+    `values` (one per row), in a handful of traces instead of one per locality.
+
+    Scattermapbox lines take a single colour per trace, so rows are grouped into
+    LINE_COLOR_BINS colour bins and each bin is one trace whose polylines are
+    separated by None, drawn in the colour of the bin centre (`marker_size` also
+    marks their vertices); every vertex carries the hover text of its row. One
+    marker trace then holds a point per row, at the middle vertex of its line,
+    coloured by the exact value on `colorscale`, and carries the colorbar.
+    """
+    values = np.asarray(values, dtype=float)
+    hover_text = np.asarray(list(hover_text), dtype=object)
+    rows, lats, lons = locality_line_arrays(localities['coords_local'])
+
+    if rows:
+        # Colour bin of each line
+        norm = (values[rows] - vmin) / (vmax - vmin) if vmax > vmin else np.zeros(len(rows))
+        bins = np.clip((np.nan_to_num(norm) * LINE_COLOR_BINS).astype(int), 0, LINE_COLOR_BINS - 1)
+        bin_colors = colors_for((np.arange(LINE_COLOR_BINS) + 0.5) / LINE_COLOR_BINS, 0, 1, cmap_name)
+        for b in np.unique(bins):
+            bin_lats, bin_lons, bin_text = [], [], []
+            for i in np.flatnonzero(bins == b):
+                bin_lats.extend(lats[i] + (None,))
+                bin_lons.extend(lons[i] + (None,))
+                bin_text.extend([hover_text[rows[i]]] * len(lats[i]) + [None])
+            fig.add_trace(go.Scattermapbox(
+                showlegend=False,
+                lat=bin_lats,
+                lon=bin_lons,
+                mode="lines+markers" if marker_size else "lines",
+                name="",
+                line=dict(width=line_width, color=bin_colors[b]),
+                marker=dict(size=marker_size, color=bin_colors[b]) if marker_size else None,
+                hoverinfo="text",
+                text=bin_text,
+            ))
+
+    if len(values) and not np.isnan(values).all():
+        middle = [len(lat) // 2 for lat in lats]
+        fig.add_trace(go.Scattermapbox(
+            lat=[lat[m] for lat, m in zip(lats, middle)] or [None],
+            lon=[lon[m] for lon, m in zip(lons, middle)] or [None],
+            mode="markers",
+            name="",
+            marker=dict(
+                size=(marker_size or line_width) + 2,
+                color=values[rows] if rows else np.linspace(vmin, vmax, 10),
+                colorscale=colorscale,
+                cmin=vmin,
+                cmax=vmax,
+                colorbar=dict(
+                    title=colorbar_title,
+                    thickness=25,
+                    y=0.5,
+                    x=1.02,
+                    xanchor="left",
+                    yanchor="middle",
+                    len=0.95
+                ),
+            ),
+            showlegend=False,
+            hoverinfo="skip",
+        ))
+    return fig
 
 
 def build_map_figure(dpue_df, show_boundary=True): # DPUE valuess
@@ -113,53 +197,10 @@ def build_map_figure(dpue_df, show_boundary=True): # DPUE valuess
     dpue_max = localities['DPUE'].max()
     colorscale = 'Viridis'
 
+    hover_text = [f"{name}<br>DPUE: {value:.2f}" for name, value in zip(localities['name'], localities['DPUE'])]
     fig = go.Figure()
-    for _, row in localities.iterrows():
-        try:
-            points = json.loads(row['coords_local'])
-            if points and isinstance(points, list) and isinstance(points[0], list):
-                lats, lons = zip(*points)
-                color = value_to_color(row['DPUE'], dpue_min, dpue_max, 'viridis')
-                fig.add_trace(go.Scattermapbox(
-                    showlegend=False,
-                    lat=lats,
-                    lon=lons,
-                    mode="lines+markers",
-                    name="",
-                    line=dict(width=4, color=color),
-                    marker=dict(size=6, color=color),
-                    hoverinfo="text",
-                    text=f"{row['name']}<br>DPUE: {row['DPUE']:.2f}" if not pd.isna(row['DPUE']) else row['name']
-                ))
-        except Exception as e:
-            print(f"Error plotting {row['name']}: {e}")
-            pass
-
-    # Add a dummy trace for the colorbar
-    dpue_vals = localities['DPUE'].dropna()
-    if not dpue_vals.empty:
-        fig.add_trace(go.Scattermapbox(
-            lat=[None], lon=[None],
-            mode="markers",
-            marker=dict(
-                size=0.1,
-                color=np.linspace(dpue_min, dpue_max, 10),
-                colorscale=colorscale,
-                cmin=dpue_min,
-                cmax=dpue_max,
-                colorbar=dict(
-                    title="DPUE",
-                    thickness=25,
-                    y=0.5,
-                    x=1.02,
-                    xanchor="left",
-                    yanchor="middle",
-                    len=0.95
-                ),
-            ),
-            showlegend=False,
-            hoverinfo='none'
-        ))
+    add_locality_lines(fig, localities, localities['DPUE'], hover_text, 'viridis', colorscale,
+                       dpue_min, dpue_max, line_width=4, marker_size=6, colorbar_title="DPUE")
 
     if not localities.empty:
         mean_lat = localities['LATITUDE'].mean()
@@ -202,53 +243,10 @@ def build_raiw_map_figure(raiw_df, show_boundary=True):
     raiw_max = localities['RAIW'].max()
     colorscale = 'Viridis'
 
+    hover_text = [f"{name}<br>RAI-W: {value:.2f}" for name, value in zip(localities['name'], localities['RAIW'])]
     fig = go.Figure()
-    for _, row in localities.iterrows():
-        try:
-            points = json.loads(row['coords_local'])
-            if points and isinstance(points, list) and isinstance(points[0], list):
-                lats, lons = zip(*points)
-                color = value_to_color(row['RAIW'], raiw_min, raiw_max, 'viridis')
-                fig.add_trace(go.Scattermapbox(
-                    showlegend=False,
-                    lat=lats,
-                    lon=lons,
-                    mode="lines+markers",
-                    name="",
-                    line=dict(width=4, color=color),
-                    marker=dict(size=6, color=color),
-                    hoverinfo="text",
-                    text=f"{row['name']}<br>RAI-W: {row['RAIW']:.2f}" if not pd.isna(row['RAIW']) else row['name']
-                ))
-        except Exception as e:
-            print(f"Error plotting {row['name']}: {e}")
-            pass
-
-    # Add a dummy trace for the colorbar
-    raiw_vals = localities['RAIW'].dropna()
-    if not raiw_vals.empty:
-        fig.add_trace(go.Scattermapbox(
-            lat=[None], lon=[None],
-            mode="markers",
-            marker=dict(
-                size=0.1,
-                color=np.linspace(raiw_min, raiw_max, 10),
-                colorscale=colorscale,
-                cmin=raiw_min,
-                cmax=raiw_max,
-                colorbar=dict(
-                    title="RAI-W",
-                    thickness=25,
-                    y=0.5,
-                    x=1.02,
-                    xanchor="left",
-                    yanchor="middle",
-                    len=0.95
-                ),
-            ),
-            showlegend=False,
-            hoverinfo='none'
-        ))
+    add_locality_lines(fig, localities, localities['RAIW'], hover_text, 'viridis', colorscale,
+                       raiw_min, raiw_max, line_width=4, marker_size=6, colorbar_title="RAI-W")
 
     if not localities.empty:
         mean_lat = localities['LATITUDE'].mean()
@@ -269,10 +267,73 @@ def build_raiw_map_figure(raiw_df, show_boundary=True):
         add_rebio_boundary_to_map(fig)
     return fig
 
-def build_dafor_spatial_map_figure(segments_df, show_boundary=True):
+# Colour levels of the spatial DAFOR map, each drawn as one trace or layer
+SPATIAL_COLOR_BINS = 20
+
+
+def spatial_color_bins(scores, vmin, vmax, n_bins=SPATIAL_COLOR_BINS):
+    """Colour level (0..n_bins-1) of each score and the hex colour of every level."""
+    norm = (np.asarray(scores, dtype=float) - vmin) / (vmax - vmin)
+    bins = np.clip((np.nan_to_num(norm) * n_bins).astype(int), 0, n_bins - 1)
+    colors = colors_for((np.arange(n_bins) + 0.5) / n_bins, 0, 1, 'RdYlGn_r')
+    return bins, colors
+
+
+def add_spatial_segment_traces(fig, segments_df, vmin, vmax):
+    """One "lines" trace per colour level, its segments separated by None."""
+    bins, colors = spatial_color_bins(segments_df['dafor_score'], vmin, vmax)
+    hover_text = np.array([f"{name}<br>DAFOR: {score:.2f}"
+                           for name, score in zip(segments_df['name'], segments_df['dafor_score'])], dtype=object)
+    coords = segments_df[['start_lat', 'end_lat', 'start_lon', 'end_lon']].to_numpy(dtype=float)
+    for b in np.unique(bins):
+        members = bins == b
+        n = int(members.sum())
+        # start, end, None per segment
+        lat = np.full((n, 3), None, dtype=object)
+        lon = np.full((n, 3), None, dtype=object)
+        text = np.full((n, 3), None, dtype=object)
+        lat[:, :2] = coords[members, :2]
+        lon[:, :2] = coords[members, 2:]
+        text[:, 0] = text[:, 1] = hover_text[members]
+        fig.add_trace(go.Scattermapbox(
+            showlegend=False,
+            lat=lat.ravel().tolist(),
+            lon=lon.ravel().tolist(),
+            mode="lines",
+            line=dict(width=5, color=colors[b]),
+            hoverinfo="text",
+            text=text.ravel().tolist(),
+        ))
+    return fig
+
+
+def add_spatial_geojson_layers(fig, segments_df, vmin, vmax):
+    """One mapbox GeoJSON line layer (a MultiLineString) per colour level."""
+    bins, colors = spatial_color_bins(segments_df['dafor_score'], vmin, vmax)
+    coords = segments_df[['start_lon', 'start_lat', 'end_lon', 'end_lat']].to_numpy(dtype=float)
+    layers = []
+    for b in np.unique(bins):
+        lines = coords[bins == b].reshape(-1, 2, 2).tolist()
+        layers.append(dict(
+            sourcetype="geojson",
+            source={"type": "Feature", "properties": {},
+                    "geometry": {"type": "MultiLineString", "coordinates": lines}},
+            type="line",
+            color=colors[b],
+            line=dict(width=5),
+            below="traces",
+        ))
+    fig.update_layout(mapbox_layers=layers)
+    return fig
+
+
+def build_dafor_spatial_map_figure(segments_df, show_boundary=True, layer="traces"):
     """
     Builds a spatial heat map showing DAFOR scores along locality boundaries.
     Each 100m segment is colored by averaged DAFOR scores from overlapping monitoring.
+    Segments are drawn in SPATIAL_COLOR_BINS colour levels: one hoverable trace per
+    level (layer="traces"), or one GeoJSON line layer per level without hover
+    (layer="geojson"), the lightest option for very large segment counts.
     """
     import plotly.graph_objects as go
     import numpy as np
@@ -306,30 +367,10 @@ def build_dafor_spatial_map_figure(segments_df, show_boundary=True):
         dafor_max = 10
     
     fig = go.Figure()
-    
-    # Plot each 100m segment
-    for _, segment in segments_df.iterrows():
-        try:
-            color = value_to_color(segment['dafor_score'], dafor_min, dafor_max, 'RdYlGn_r')
-            
-            # Create hover text
-            hover_text = (
-                f"{segment['name']}<br>"
-                f"DAFOR: {segment['dafor_score']:.2f}"
-            )
-            
-            fig.add_trace(go.Scattermapbox(
-                showlegend=False,
-                lat=[segment['start_lat'], segment['end_lat']],
-                lon=[segment['start_lon'], segment['end_lon']],
-                mode="lines",
-                line=dict(width=5, color=color),
-                hoverinfo="text",
-                text=hover_text
-            ))
-        except Exception as e:
-            print(f"[MAP] Error plotting segment: {e}")
-            continue
+    if layer == "geojson":
+        add_spatial_geojson_layers(fig, segments_df, dafor_min, dafor_max)
+    else:
+        add_spatial_segment_traces(fig, segments_df, dafor_min, dafor_max)
     
     # Add colorbar
     fig.add_trace(go.Scattermapbox(
@@ -394,53 +435,10 @@ def build_dafor_sum_map_figure(df_dafor_sum, show_boundary=True):
     dafor_max = localities['DAFOR'].max()
     colorscale = 'Viridis'
 
+    hover_text = [f"{name}<br>DAFOR: {value:.2f}" for name, value in zip(localities['name'], localities['DAFOR'])]
     fig = go.Figure()
-    for _, row in localities.iterrows():
-        try:
-            points = json.loads(row['coords_local'])
-            if points and isinstance(points, list) and isinstance(points[0], list):
-                lats, lons = zip(*points)
-                color = value_to_color(row['DAFOR'], dafor_min, dafor_max, 'viridis')
-                fig.add_trace(go.Scattermapbox(
-                    showlegend=False,
-                    lat=lats,
-                    lon=lons,
-                    mode="lines+markers",
-                    name="",
-                    line=dict(width=6, color=color),
-                    marker=dict(size=6, color=color),
-                    hoverinfo="text",
-                    text=f"{row['name']}<br>DAFOR: {row['DAFOR']:.2f}" if not pd.isna(row['DAFOR']) else row['name']
-                ))
-        except Exception as e:
-            print(f"Error plotting {row['name']}: {e}")
-            pass
-
-    # Add a dummy trace for the colorbar
-    dafor_vals = localities['DAFOR'].dropna()
-    if not dafor_vals.empty:
-        fig.add_trace(go.Scattermapbox(
-            lat=[None], lon=[None],
-            mode="markers",
-            marker=dict(
-                size=0.1,
-                color=np.linspace(dafor_min, dafor_max, 10),
-                colorscale=colorscale,
-                cmin=dafor_min,
-                cmax=dafor_max,
-                colorbar=dict(
-                    title="DAFOR",
-                    thickness=25,
-                    y=0.5,
-                    x=1.02,
-                    xanchor="left",
-                    yanchor="middle",
-                    len=0.95
-                ),
-            ),
-            showlegend=False,
-            hoverinfo='none'
-        ))
+    add_locality_lines(fig, localities, localities['DAFOR'], hover_text, 'viridis', colorscale,
+                       dafor_min, dafor_max, line_width=6, marker_size=6, colorbar_title="DAFOR")
 
     if not localities.empty:
         mean_lat = localities['LATITUDE'].mean()
@@ -558,53 +556,10 @@ def build_dafor_sum_map_figure(df_dafor_sum, show_boundary=True):
     dafor_max = localities['DAFOR'].max()
     colorscale = 'Viridis'
 
+    hover_text = [f"{name}<br>DAFOR: {value:.2f}" for name, value in zip(localities['name'], localities['DAFOR'])]
     fig = go.Figure()
-    for _, row in localities.iterrows():
-        try:
-            points = json.loads(row['coords_local'])
-            if points and isinstance(points, list) and isinstance(points[0], list):
-                lats, lons = zip(*points)
-                color = value_to_color(row['DAFOR'], dafor_min, dafor_max, 'viridis')
-                fig.add_trace(go.Scattermapbox(
-                    showlegend=False,
-                    lat=lats,
-                    lon=lons,
-                    mode="lines+markers",
-                    name="",
-                    line=dict(width=6, color=color),
-                    marker=dict(size=6, color=color),
-                    hoverinfo="text",
-                    text=f"{row['name']}<br>DAFOR: {row['DAFOR']:.2f}" if not pd.isna(row['DAFOR']) else row['name']
-                ))
-        except Exception as e:
-            print(f"Error plotting {row['name']}: {e}")
-            pass
-
-    # Add a dummy trace for the colorbar
-    dafor_vals = localities['DAFOR'].dropna()
-    if not dafor_vals.empty:
-        fig.add_trace(go.Scattermapbox(
-            lat=[None], lon=[None],
-            mode="markers",
-            marker=dict(
-                size=0.1,
-                color=np.linspace(dafor_min, dafor_max, 10),
-                colorscale=colorscale,
-                cmin=dafor_min,
-                cmax=dafor_max,
-                colorbar=dict(
-                    title="DAFOR",
-                    thickness=25,
-                    y=0.5,
-                    x=1.02,
-                    xanchor="left",
-                    yanchor="middle",
-                    len=0.95
-                ),
-            ),
-            showlegend=False,
-            hoverinfo='none'
-        ))
+    add_locality_lines(fig, localities, localities['DAFOR'], hover_text, 'viridis', colorscale,
+                       dafor_min, dafor_max, line_width=6, marker_size=6, colorbar_title="DAFOR")
 
     if not localities.empty:
         mean_lat = localities['LATITUDE'].mean()
@@ -657,53 +612,11 @@ def build_management_map_figure(df_management, show_boundary=True):
     management_max = localities['managed_mass_kg'].max()
     colorscale = 'Viridis'
 
+    hover_text = [f"Localidade: {name}<br>Massa: {value:.2f} kg"
+                  for name, value in zip(localities['name'], localities['managed_mass_kg'])]
     fig = go.Figure()
-    for _, row in localities.iterrows():
-        try:
-            points = json.loads(row['coords_local'])
-            if points and isinstance(points, list) and isinstance(points[0], list):
-                lats, lons = zip(*points)
-                color = value_to_color(row['managed_mass_kg'], management_min, management_max, 'viridis')
-                fig.add_trace(go.Scattermapbox(
-                    showlegend=False,
-                    lat=lats,
-                    lon=lons,
-                    mode="lines+markers",
-                    name="",
-                    line=dict(width=6, color=color),
-                    marker=dict(size=6, color=color),
-                    hoverinfo="text",
-                    text=f"Localidade: {row['name']}<br>Massa: {row['managed_mass_kg']:.2f} kg"
-                ))
-        except Exception as e:
-            print(f"Error plotting {row['locality_id']}: {e}")
-            pass
-
-    # Add a dummy trace for the colorbar
-    mass_vals = localities['managed_mass_kg'].dropna()
-    if not mass_vals.empty:
-        fig.add_trace(go.Scattermapbox(
-            lat=[None], lon=[None],
-            mode="markers",
-            marker=dict(
-                size=0.1,
-                color=np.linspace(management_min, management_max, 10),
-                colorscale=colorscale,
-                cmin=management_min,
-                cmax=management_max,
-                colorbar=dict(
-                    title="Massa (kg)",
-                    thickness=25,
-                    y=0.5,
-                    x=1.02,
-                    xanchor="left",
-                    yanchor="middle",
-                    len=0.95
-                ),
-            ),
-            showlegend=False,
-            hoverinfo='none'
-        ))
+    add_locality_lines(fig, localities, localities['managed_mass_kg'], hover_text, 'viridis', colorscale,
+                       management_min, management_max, line_width=6, marker_size=6, colorbar_title="Massa (kg)")
 
     # Use latitude/longitude columns if available, else fallback
     if 'latitude' in localities.columns and 'longitude' in localities.columns:
@@ -745,55 +658,11 @@ def build_days_since_management_map_figure(df_days_since, show_boundary=True):
     days_max = localities['days_since'].max()
     colorscale = 'Viridis'
 
+    hover_text = [f"{name}<br>Último manejo há {days:.0f} dias<br>Obs: {observation}"
+                  for name, days, observation in zip(localities['name'], localities['days_since'], localities['observation'])]
     fig = go.Figure()
-
-    for _, row in localities.iterrows():
-        try:
-            points = json.loads(row['coords_local'])
-            if points and isinstance(points, list) and isinstance(points[0], list):
-                lats, lons = zip(*points)
-                color = value_to_color(row['days_since'], days_min, days_max, 'viridis')
-                fig.add_trace(go.Scattermapbox(
-                    showlegend=False,
-                    lat=lats,
-                    lon=lons,
-                    mode="lines",
-                    name="",
-                    line=dict(width=6, color=color),
-                    hoverinfo="text",
-                    #text=f"{row['name']}<br>Último manejo há {row['days_since']:.0f}" if not pd.isna(row['days_since']) else row['name']
-                    text=f"{row['name']}<br>Último manejo há {row['days_since']:.0f} dias<br>Obs: {row['observation']}" if not pd.isna(row['days_since']) else row['name']
-                ))
-        except Exception as e:
-            print(f"Error plotting {row['name']}: {e}")
-            pass
-
-
-    # Add a dummy trace for the colorbar
-    days_vals = localities['days_since'].dropna()
-    if not days_vals.empty:
-        fig.add_trace(go.Scattermapbox(
-            lat=[None], lon=[None],
-            mode="markers",
-            marker=dict(
-                size=0.1,
-                color=np.linspace(days_min, days_max, 10),
-                colorscale=colorscale,
-                cmin=days_min,
-                cmax=days_max,
-                colorbar=dict(
-                    title="Último Manejo (dias)",
-                    thickness=25,
-                    y=0.5,
-                    x=1.02,
-                    xanchor="left",
-                    yanchor="middle",
-                    len=0.95
-                ),
-            ),
-            showlegend=False,
-            hoverinfo='none'
-        ))
+    add_locality_lines(fig, localities, localities['days_since'], hover_text, 'viridis', colorscale,
+                       days_min, days_max, line_width=6, colorbar_title="Último Manejo (dias)")
 
     if not localities.empty:
         mean_lat = localities['LATITUDE'].mean()
@@ -836,51 +705,11 @@ def build_days_since_monitoring_map_figure(df_days_since, show_boundary=True):
     days_max = localities['days_since'].max()
     colorscale = 'Viridis'
 
+    hover_text = [f"{name}<br>Último monitoramento há {days:.0f}"
+                  for name, days in zip(localities['name'], localities['days_since'])]
     fig = go.Figure()
-    for _, row in localities.iterrows():
-        try:
-            points = json.loads(row['coords_local'])
-            if points and isinstance(points, list) and isinstance(points[0], list):
-                lats, lons = zip(*points)
-                color = value_to_color(row['days_since'], days_min, days_max, 'viridis')
-                fig.add_trace(go.Scattermapbox(
-                    showlegend=False,
-                    lat=lats,
-                    lon=lons,
-                    mode="lines",
-                    name="",
-                    line=dict(width=6, color=color),
-                    hoverinfo="text",
-                    text=f"{row['name']}<br>Último monitoramento há {row['days_since']:.0f}" if not pd.isna(row['days_since']) else row['name']
-                ))
-        except Exception as e:
-            print(f"Error plotting {row['name']}: {e}")
-            pass
-    # Add a dummy trace for the colorbar
-    days_vals = localities['days_since'].dropna()
-    if not days_vals.empty:
-        fig.add_trace(go.Scattermapbox(
-            lat=[None], lon=[None],
-            mode="markers",
-            marker=dict(
-                size=0.1,
-                color=np.linspace(days_min, days_max, 10),
-                colorscale=colorscale,
-                cmin=days_min,
-                cmax=days_max,
-                colorbar=dict(
-                    title="Último Monitoramento (dias)",
-                    thickness=25,
-                    y=0.5,
-                    x=1.02,
-                    xanchor="left",
-                    yanchor="middle",
-                    len=0.95
-                ),
-            ),
-            showlegend=False,
-            hoverinfo='none'
-        ))
+    add_locality_lines(fig, localities, localities['days_since'], hover_text, 'viridis', colorscale,
+                       days_min, days_max, line_width=6, colorbar_title="Último Monitoramento (dias)")
 
     if not localities.empty:
         mean_lat = localities['latitude'].mean()
@@ -1040,54 +869,10 @@ def build_monitoring_events_map_figure(events_df, show_boundary=True):
     event_min = localities['event_count'].min()
     event_max = localities['event_count'].max()
     
+    hover_text = [f"{name}<br>Eventos: {int(count)}" for name, count in zip(localities['name'], localities['event_count'])]
     fig = go.Figure()
-    
-    for _, row in localities.iterrows():
-        try:
-            points = json.loads(row['coords_local'])
-            if points and isinstance(points, list) and isinstance(points[0], list):
-                lats, lons = zip(*points)
-                color = value_to_color(row['event_count'], event_min, event_max, 'plasma')
-                fig.add_trace(go.Scattermapbox(
-                    showlegend=False,
-                    lat=lats,
-                    lon=lons,
-                    mode="lines+markers",
-                    name="",
-                    line=dict(width=4, color=color),
-                    marker=dict(size=6, color=color),
-                    hoverinfo="text",
-                    text=f"{row['name']}<br>Eventos: {int(row['event_count'])}"
-                ))
-        except Exception as e:
-            print(f"Error plotting {row['name']}: {e}")
-            pass
-    
-    # Add colorbar
-    event_vals = localities['event_count'].dropna()
-    if not event_vals.empty:
-        fig.add_trace(go.Scattermapbox(
-            lat=[None], lon=[None],
-            mode="markers",
-            marker=dict(
-                size=0.1,
-                color=np.linspace(event_min, event_max, 10),
-                colorscale='plasma',
-                cmin=event_min,
-                cmax=event_max,
-                colorbar=dict(
-                    title="Eventos",
-                    thickness=25,
-                    y=0.5,
-                    x=1.02,
-                    xanchor="left",
-                    yanchor="middle",
-                    len=0.95
-                ),
-            ),
-            showlegend=False,
-            hoverinfo='none'
-        ))
+    add_locality_lines(fig, localities, localities['event_count'], hover_text, 'plasma', 'plasma',
+                       event_min, event_max, line_width=4, marker_size=6, colorbar_title="Eventos")
     
     if not localities.empty:
         mean_lat = localities['LATITUDE'].mean()
@@ -1183,3 +968,54 @@ def build_monitoring_line_density_map_figure(data_service, start_date, end_date,
     if show_boundary:
         add_rebio_boundary_to_map(fig)
     return fig
+
+
+def benchmark_spatial_map(n_segments=5000, seed=0):
+    """Figure size and build time of the spatial DAFOR map, per segment vs binned, on synthetic segments."""
+    import time
+
+    rng = np.random.default_rng(seed)
+    start = np.column_stack([-27.28 + rng.normal(0, 0.02, n_segments), -48.39 + rng.normal(0, 0.02, n_segments)])
+    end = start + rng.normal(0, 0.0007, (n_segments, 2))
+    segments_df = pd.DataFrame({
+        'locality_id': rng.integers(1, 80, n_segments),
+        'start_lat': start[:, 0], 'start_lon': start[:, 1],
+        'end_lat': end[:, 0], 'end_lon': end[:, 1],
+        'dafor_score': rng.uniform(0, 10, n_segments),
+    })
+    segments_df['name'] = 'Locality ' + segments_df['locality_id'].astype(str)
+
+    def per_segment_figure():
+        # The former renderer: one trace per segment
+        fig = go.Figure()
+        for segment in segments_df.itertuples():
+            fig.add_trace(go.Scattermapbox(
+                showlegend=False,
+                lat=[segment.start_lat, segment.end_lat],
+                lon=[segment.start_lon, segment.end_lon],
+                mode="lines",
+                line=dict(width=5, color=color_for(segment.dafor_score, 0, 10, 'RdYlGn_r')),
+                hoverinfo="text",
+                text=f"{segment.name}<br>DAFOR: {segment.dafor_score:.2f}",
+            ))
+        return fig
+
+    builders = [
+        ("one trace per segment", per_segment_figure),
+        ("binned traces", lambda: build_dafor_spatial_map_figure(segments_df, False)),
+        ("geojson layers", lambda: build_dafor_spatial_map_figure(segments_df, False, layer="geojson")),
+    ]
+    print(f"{n_segments} segments")
+    for label, build in builders:
+        t0 = time.perf_counter()
+        fig = build()
+        build_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        size = len(fig.to_json())
+        json_time = time.perf_counter() - t0
+        print(f"  {label:22s} {len(fig.data):6d} traces {size / 1e6:7.2f} MB "
+              f"build {build_time:6.2f}s to_json {json_time:6.2f}s")
+
+
+if __name__ == "__main__":
+    benchmark_spatial_map()
@@ -4,13 +4,69 @@ Relatório em Tempo Real - Real-time report layout with detailed analyses
 
 from dash import html, dcc
 import dash_bootstrap_components as dbc
-from services.data_service import CoralDataService
+from services.data_service import CoralDataService, derived
+from services.dafor_store import DAFOR_CLASSES
+from services.indicator_cube import CLASS_COLUMNS
+from services.request_context import LazyFrames
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 import numpy as np
 
 
+class ReportContext(LazyFrames):
+    """
+    Data behind the report, loaded once and shared by every chart builder.
+
+    Each source is read from the data service on first use and kept for the
+    lifetime of the context; the frame accessors hand out copies, so builders
+    (possibly running concurrently) can add columns and filter in place.
+    Management dates are parsed once here.
+    """
+
+    def __init__(self, service=None):
+        super().__init__()
+        self.service = service or CoralDataService()
+
+    def indicator_cube(self):
+        return self._load('indicator_cube', self.service.get_indicator_cube)
+
+    def minute_store(self):
+        return self._load('minute_store', self.service.get_dafor_minute_store)
+
+    def localities(self):
+        return self._load('localities', self.service.get_locality_data).copy()
+
+    def occurrences(self):
+        return self._load('occurrences', lambda: self.service.get_occurrences_data(None, None)).copy()
+
+    def dpue(self):
+        return self._load('dpue', lambda: self.service.get_dpue_by_locality(None, None)).copy()
+
+    def raiw(self):
+        return self._load('raiw', lambda: self.service.get_raiw_by_locality(None, None)).copy()
+
+    def dafor_sum(self):
+        return self._load('dafor_sum', lambda: self.service.get_sum_of_dafor_by_locality(None, None)).copy()
+
+    def management(self):
+        """Management records with lower-case columns and `date` parsed to datetime."""
+        def load():
+            data = self.service.get_management_data(None, None)
+            data.columns = data.columns.str.lower()
+            if 'date' in data.columns:
+                data['date'] = pd.to_datetime(data['date'], dayfirst=True, errors='coerce')
+            return data
+        return self._load('management', load).copy()
+
+    def load_all(self):
+        """Load every source now (e.g. before forking workers that must not query the database)."""
+        for source in (self.indicator_cube, self.minute_store, self.localities, self.occurrences,
+                       self.dpue, self.raiw, self.dafor_sum, self.management):
+            source()
+        return self
+
+
 def create_summary_statistics():
     """Generate summary statistics cards - values updated by callback."""
     # Create cards with IDs that will be updated by callback
@@ -60,12 +116,26 @@ def create_summary_statistics():
     return cards
 
 
-def create_temporal_evolution_chart():
+def compute_report_summary(ctx=None):
+    """Full-history values of the summary cards (localities, managed mass, occurrences, mean DPUE)."""
+    ctx = ctx or ReportContext()
+    dpue_data = ctx.dpue()
+    management_data = ctx.management()
+    occurrences_data = ctx.occurrences()
+    return {
+        'total_localities': int(dpue_data['locality_id'].nunique()) if not dpue_data.empty else 0,
+        'total_management_kg': float(management_data['managed_mass_kg'].sum()) if not management_data.empty else 0.0,
+        'total_occurrences': len(occurrences_data),
+        'avg_dpue': float(dpue_data['DPUE'].mean()) if not dpue_data.empty else 0.0,
+    }
+
+
+def create_temporal_evolution_chart(ctx=None):
     """Create stacked chart showing temporal evolution of transects with and without sun coral."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
     
-    # Get DAFOR data with dates (raw data, not aggregated)
-    dafor_data = service.get_dafor_data(None, None)
+    # Per-locality monthly minute totals from the shared indicator cube
+    dafor_data = ctx.indicator_cube().monthly_frame()
     
     if dafor_data.empty:
         return go.Figure().update_layout(
@@ -73,29 +143,17 @@ def create_temporal_evolution_chart():
             height=400
         )
     
-    # Parse dates and aggregate by year-month
-    dafor_data['date'] = pd.to_datetime(dafor_data['date'], dayfirst=True, errors='coerce')
-    dafor_data = dafor_data.dropna(subset=['date'])
-    dafor_data['year_month'] = dafor_data['date'].dt.to_period('M').astype(str)
+    # Aggregate by year-month, keeping only months with scored minutes
+    dafor_data = dafor_data[dafor_data['Nmin'] > 0]
+    dafor_data['year_month'] = dafor_data['year_month'].dt.to_period('M').astype(str)
     
-    # Process dafor_value: split comma-separated values and explode to count individual 1-minute transects
-    dafor_data['dafor_value_list'] = dafor_data['dafor_value'].apply(
-        lambda x: [pd.to_numeric(i, errors='coerce') for i in str(x).split(',') if str(i).strip()]
-    )
-    dafor_data = dafor_data.explode('dafor_value_list')
-    dafor_data['dafor_value_list'] = pd.to_numeric(dafor_data['dafor_value_list'], errors='coerce')
-    dafor_data = dafor_data.dropna(subset=['dafor_value_list'])
-    
-    # Check for detections (dafor_value > 0)
-    dafor_data['has_detection'] = dafor_data['dafor_value_list'] > 0
-    
-    # Group by month and count individual transects with and without detections
-    temporal_agg = dafor_data.groupby('year_month').apply(
-        lambda df: pd.Series({
-            'Com Coral': df['has_detection'].sum(),  # Individual 1-minute transects with dafor_value > 0
-            'Sem Coral': (~df['has_detection']).sum()  # Individual 1-minute transects without detections
-        })
+    # Count individual 1-minute transects with (dafor_value > 0) and without detections
+    temporal_agg = dafor_data.groupby('year_month').agg(
+        com_coral=('Ndetec', 'sum'),
+        n_minutes=('Nmin', 'sum')
     ).reset_index()
+    temporal_agg['sem_coral'] = temporal_agg['n_minutes'] - temporal_agg['com_coral']
+    temporal_agg = temporal_agg[['year_month', 'com_coral', 'sem_coral']]
     temporal_agg.columns = ['Período', 'Com Coral', 'Sem Coral']
     
     # Create stacked bar chart
@@ -131,12 +189,12 @@ def create_temporal_evolution_chart():
     return fig
 
 
-def create_occurrence_by_year_chart():
+def create_occurrence_by_year_chart(ctx=None):
     """Create bar chart showing number of occurrences marked per year."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
     
     # Get occurrence data
-    occurrence_data = service.get_occurrences_data(None, None)
+    occurrence_data = ctx.occurrences()
     
     if occurrence_data.empty:
         return go.Figure().update_layout(
@@ -176,11 +234,11 @@ def create_occurrence_by_year_chart():
     return fig
 
 
-def create_locality_ranking_chart():
+def create_locality_ranking_chart(ctx=None):
     """Create chart ranking localities by DPUE."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
     
-    dpue_data = service.get_dpue_by_locality(None, None)
+    dpue_data = ctx.dpue()
     
     if dpue_data.empty:
         return go.Figure()
@@ -214,17 +272,15 @@ def create_locality_ranking_chart():
     return fig
 
 
-def create_management_efficiency_chart():
+def create_management_efficiency_chart(ctx=None):
     """Create chart showing management effort over time."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
     
-    management_data = service.get_management_data(None, None)
+    management_data = ctx.management()
     
     if management_data.empty:
         return go.Figure().update_layout(title="Sem dados de manejo disponíveis", height=400)
     
-    management_data.columns = management_data.columns.str.lower()
-    management_data['date'] = pd.to_datetime(management_data['date'], dayfirst=True, errors='coerce')
     management_data = management_data.dropna(subset=['date'])
     management_data['year'] = management_data['date'].dt.year
     
@@ -294,26 +350,17 @@ def create_management_efficiency_chart():
     return fig
 
 
-def create_dafor_distribution_chart():
+def create_dafor_distribution_chart(ctx=None):
     """Create chart showing DAFOR score distribution."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
     
-    dafor_data = service.get_dafor_data(None, None)
+    store = ctx.minute_store()
     
-    if dafor_data.empty:
+    if len(store) == 0:
         return go.Figure()
     
-    # Process DAFOR values
-    if dafor_data['dafor_value'].apply(lambda x: isinstance(x, str) and ',' in x).any():
-        dafor_data['dafor_value'] = dafor_data['dafor_value'].apply(
-            lambda x: [pd.to_numeric(i, errors='coerce') for i in str(x).split(',')]
-        )
-        dafor_values = pd.Series([v for sublist in dafor_data['dafor_value'] for v in sublist])
-    else:
-        dafor_values = pd.to_numeric(dafor_data['dafor_value'], errors='coerce')
-    
-    dafor_values = dafor_values.dropna()
-    dafor_values = dafor_values[(dafor_values >= 0) & (dafor_values <= 10)]
+    # Minute scores, already parsed and validated against the DAFOR scale
+    dafor_values = pd.Series(store.minute_values())
     
     # Count occurrences
     value_counts = dafor_values.value_counts().sort_index()
@@ -362,54 +409,36 @@ def create_dafor_distribution_chart():
     return fig
 
 
-def create_dafor_by_year_stacked_chart():
+def create_dafor_by_year_stacked_chart(ctx=None):
     """Create stacked bar chart showing DAFOR class distribution by year for REBIO + Entorno."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
     
     # Get REBIO + Entorno locality IDs
     from cs_controllers import REBIO_ENTORNO_LOCALITIES
     
-    # Get DAFOR data
-    dafor_data = service.get_dafor_data(None, None)
+    # Monthly DAFOR class counts per locality from the shared indicator cube
+    cube = ctx.indicator_cube()
     
-    if dafor_data.empty:
+    if len(cube.localities) == 0:
         return go.Figure().update_layout(
             title="Sem dados DAFOR disponíveis",
             height=450
         )
     
-    # Filter to REBIO + Entorno localities
-    dafor_data = dafor_data[dafor_data['locality_id'].isin(REBIO_ENTORNO_LOCALITIES)]
+    # Filter to REBIO + Entorno localities (dated transects only)
+    monthly = cube.monthly_frame(REBIO_ENTORNO_LOCALITIES)
     
-    if dafor_data.empty:
+    if monthly.empty:
         return go.Figure().update_layout(
             title="Sem dados DAFOR para REBIO + Entorno",
             height=450
         )
     
-    # Parse dates and extract year
-    dafor_data['date'] = pd.to_datetime(dafor_data['date'], dayfirst=True, errors='coerce')
-    dafor_data = dafor_data.dropna(subset=['date'])
-    dafor_data['year'] = dafor_data['date'].dt.year
-    
-    # Process DAFOR values (they may be comma-separated strings)
-    if dafor_data['dafor_value'].apply(lambda x: isinstance(x, str) and ',' in str(x)).any():
-        dafor_data['dafor_value'] = dafor_data['dafor_value'].apply(
-            lambda x: [pd.to_numeric(i, errors='coerce') for i in str(x).split(',')]
-        )
-        dafor_data = dafor_data.explode('dafor_value')
-    
-    dafor_data['dafor_value'] = pd.to_numeric(dafor_data['dafor_value'], errors='coerce')
-    dafor_data = dafor_data.dropna(subset=['dafor_value'])
-    
-    # Filter valid DAFOR values (0, 2, 4, 6, 8, 10)
-    dafor_data = dafor_data[dafor_data['dafor_value'].isin([0, 2, 4, 6, 8, 10])]
-    
-    # Count occurrences by year and DAFOR class
-    yearly_counts = dafor_data.groupby(['year', 'dafor_value']).size().reset_index(name='count')
-    
-    # Create pivot table for easier plotting
-    pivot_data = yearly_counts.pivot(index='year', columns='dafor_value', values='count').fillna(0)
+    # Count minutes by year and DAFOR class (0, 2, 4, 6, 8, 10)
+    yearly_counts = monthly[CLASS_COLUMNS].set_axis(list(DAFOR_CLASSES), axis=1)
+    yearly_counts['year'] = monthly['year_month'].dt.year.to_numpy()
+    pivot_data = yearly_counts.groupby('year').sum()
+    pivot_data = pivot_data.loc[pivot_data.sum(axis=1) > 0, pivot_data.sum(axis=0) > 0]
     
     # DAFOR labels and colors
     dafor_labels = {
@@ -466,12 +495,12 @@ def create_dafor_by_year_stacked_chart():
     return fig
 
 
-def create_dafor_sum_by_locality_chart():
+def create_dafor_sum_by_locality_chart(ctx=None):
     """Create stacked bar chart showing sum of DAFOR scores by locality."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
     
     # Get sum of DAFOR values by locality
-    dafor_sum_data = service.get_sum_of_dafor_by_locality(None, None)
+    dafor_sum_data = ctx.dafor_sum()
     
     if dafor_sum_data.empty or dafor_sum_data["DAFOR"].dropna().empty:
         return go.Figure().update_layout(
@@ -565,34 +594,25 @@ def create_dafor_sum_by_locality_chart():
     return fig
 
 
-def create_raiw_by_year_chart():
+def create_raiw_by_year_chart(ctx=None):
     """Create bar chart showing weighted relative abundance index (IAR-P/RAI-W) by year."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
 
     # Get REBIO + Entorno locality IDs
     from cs_controllers import REBIO_ENTORNO_LOCALITIES
 
-    # Manual weights from method description
-    weight_map = {
-        10: 1.00,
-        8: 0.80,
-        6: 0.60,
-        4: 0.10,
-        2: 0.04,
-        0: 0.00,
-    }
+    # Monthly RAI-W weight sums per locality (manual weights from the method description)
+    cube = ctx.indicator_cube()
+    locality_data = ctx.localities()
 
-    dafor_data = service.get_dafor_data(None, None)
-    locality_data = service.get_locality_data()
-
-    if dafor_data.empty or locality_data.empty:
+    if len(cube.localities) == 0 or locality_data.empty:
         return go.Figure().update_layout(
             title="Sem dados disponíveis para IAR-P/RAI-W",
             height=450,
         )
 
     # Filter to REBIO + Entorno localities
-    dafor_data = dafor_data[dafor_data['locality_id'].isin(REBIO_ENTORNO_LOCALITIES)].copy()
+    dafor_data = cube.monthly_frame(REBIO_ENTORNO_LOCALITIES)
 
     if dafor_data.empty:
         return go.Figure().update_layout(
@@ -600,13 +620,11 @@ def create_raiw_by_year_chart():
             height=450,
         )
 
-    # Parse dates and extract year
-    dafor_data['date'] = pd.to_datetime(dafor_data['date'], dayfirst=True, errors='coerce')
-    dafor_data = dafor_data.dropna(subset=['date'])
-    dafor_data['year'] = dafor_data['date'].dt.year
+    # Extract year
+    dafor_data['year'] = dafor_data['year_month'].dt.year
 
     # Compute Uni100m per locality using the same approach as DPUE
-    locality_data['locality_length_m'] = locality_data['coords_local'].apply(service.calculate_locality_length)
+    locality_data['locality_length_m'] = locality_data['length_m']
     locality_data['Uni100m'] = locality_data['locality_length_m'] / 100
 
     dafor_data = dafor_data.merge(
@@ -615,17 +633,6 @@ def create_raiw_by_year_chart():
         how='left'
     )
 
-    # Convert each record's DAFOR series into (sum of weights, number of minutes)
-    def _compute_weight_and_minutes(dafor_value):
-        values = [pd.to_numeric(i, errors='coerce') for i in str(dafor_value).split(',')]
-        values = [v for v in values if not pd.isna(v)]
-        return pd.Series({
-            'weight_sum': float(sum(weight_map.get(v, 0.0) for v in values)),
-            'Nmin': int(len(values)),
-        })
-
-    dafor_data[['weight_sum', 'Nmin']] = dafor_data['dafor_value'].apply(_compute_weight_and_minutes)
-
     dafor_data['Nhours'] = dafor_data['Nmin'] / 60
     dafor_data['denominator'] = dafor_data['Nhours'] * dafor_data['Uni100m']
 
@@ -687,14 +694,14 @@ def create_raiw_by_year_chart():
     return fig
 
 
-def create_raiw_by_locality_chart():
+def create_raiw_by_locality_chart(ctx=None):
     """Create horizontal bar chart showing weighted relative abundance index (IAR-P/RAI-W) by locality."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
 
     # Keep scope aligned with yearly chart
     from cs_controllers import REBIO_ENTORNO_LOCALITIES
 
-    raiw_data = service.get_raiw_by_locality(None, None)
+    raiw_data = ctx.raiw()
 
     if raiw_data.empty:
         return go.Figure().update_layout(
@@ -751,15 +758,15 @@ def create_raiw_by_locality_chart():
     return fig
 
 
-def create_removal_rate_per_day_chart():
+def create_removal_rate_per_day_chart(ctx=None):
     """Create stacked bar chart showing coral mass removal rate per management day per year by method for REBIO + Entorno."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
     
     # Get REBIO + Entorno locality IDs
     from cs_controllers import REBIO_ENTORNO_LOCALITIES
     
     # Get all management data
-    management_data = service.get_management_data(None, None)
+    management_data = ctx.management()
     
     if management_data.empty:
         return go.Figure().update_layout(
@@ -776,8 +783,7 @@ def create_removal_rate_per_day_chart():
             height=400
         )
     
-    # Ensure date is datetime and extract year
-    management_data['date'] = pd.to_datetime(management_data['date'], dayfirst=True, errors='coerce')
+    # Dates are parsed by the report context; extract year
     management_data = management_data.dropna(subset=['date'])
     management_data['year'] = management_data['date'].dt.year
     management_data['date_only'] = management_data['date'].dt.date
@@ -856,15 +862,15 @@ def create_removal_rate_per_day_chart():
     return fig
 
 
-def create_mass_per_cylinder_chart():
+def create_mass_per_cylinder_chart(ctx=None):
     """Create stacked bar chart showing managed mass per cylinder by year and method for REBIO + Entorno."""
-    service = CoralDataService()
+    ctx = ctx or ReportContext()
     
     # Get REBIO + Entorno locality IDs
     from cs_controllers import REBIO_ENTORNO_LOCALITIES
     
     # Get all management data
-    management_data = service.get_management_data(None, None)
+    management_data = ctx.management()
     
     if management_data.empty:
         return go.Figure().update_layout(
@@ -881,8 +887,7 @@ def create_mass_per_cylinder_chart():
             height=400
         )
     
-    # Ensure date is datetime and extract year
-    management_data['date'] = pd.to_datetime(management_data['date'], dayfirst=True, errors='coerce')
+    # Dates are parsed by the report context; extract year
     management_data = management_data.dropna(subset=['date'])
     management_data['year'] = management_data['date'].dt.year
     
@@ -974,8 +979,66 @@ def create_mass_per_cylinder_chart():
     return fig
 
 
+# Report graphs in page order: graph id -> builder of its figure
+REPORT_CHARTS = {
+    'report-temporal-chart': create_temporal_evolution_chart,
+    'report-occurrence-chart': create_occurrence_by_year_chart,
+    'report-ranking-chart': create_locality_ranking_chart,
+    'report-dafor-chart': create_dafor_distribution_chart,
+    'report-dafor-year-stacked': create_dafor_by_year_stacked_chart,
+    'report-raiw-year-chart': create_raiw_by_year_chart,
+    'report-raiw-locality-chart': create_raiw_by_locality_chart,
+    'report-dafor-sum-locality': create_dafor_sum_by_locality_chart,
+    'report-management-chart': create_management_efficiency_chart,
+    'report-removal-rate-chart': create_removal_rate_per_day_chart,
+    'report-mass-per-cylinder-chart': create_mass_per_cylinder_chart,
+}
+
+# Every report chart reads the full history of these tables
+REPORT_TABLES = ('locality', 'dafor', 'occurrence', 'management')
+
+
+# Placeholder text of a chart whose builder failed
+UNAVAILABLE_MESSAGE = "Gráfico indisponível"
+
+
+def placeholder_figure(message="Carregando..."):
+    """Empty dark figure shown until a report chart is built."""
+    fig = go.Figure()
+    fig.update_layout(
+        template="plotly_dark",
+        height=450,
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        annotations=[dict(text=message, showarrow=False, font=dict(size=16, color="#6c757d"))],
+    )
+    return fig
+
+
+def get_report_figure(graph_id):
+    """
+    Figure of report graph `graph_id`. Charts are built when the report tab is
+    first opened and then reused until one of REPORT_TABLES changes.
+    """
+    return derived(f'report:{graph_id}', REPORT_TABLES,
+                   lambda: REPORT_CHARTS[graph_id](get_report_context()))
+
+
+def get_report_summary():
+    """Summary card values, computed once per version of REPORT_TABLES."""
+    return derived('report:summary', REPORT_TABLES, lambda: compute_report_summary(get_report_context()))
+
+
+def get_report_context():
+    """ReportContext shared by the report charts until one of REPORT_TABLES changes."""
+    return derived('report:context', REPORT_TABLES, ReportContext)
+
+
 def get_report_layout():
-    """Generate the real-time report layout with processed data and charts."""
+    """
+    Generate the real-time report layout. Charts start as placeholders and are
+    filled by callbacks when the report tab is opened (see get_report_figure).
+    """
     
     layout = dbc.Container([
         # Header
@@ -1012,7 +1075,7 @@ def get_report_layout():
         Os dados são agrupados por período (ano-mês) para mostrar tendências temporais na presença do coral-sol nos monitoramentos realizados.
         """),
         dcc.Loading(
-            dcc.Graph(id='report-temporal-chart', figure=create_temporal_evolution_chart()),
+            dcc.Graph(id='report-temporal-chart', figure=placeholder_figure()),
             type="circle"
         ),
         
@@ -1024,7 +1087,7 @@ def get_report_layout():
         georreferenciada identificada durante atividades de monitoramento. Na aba 'Dashboard', é possível filtrar por localidade e período e visualizar as fotos das marcações.             
         """),
         dcc.Loading(
-            dcc.Graph(id='report-occurrence-chart', figure=create_occurrence_by_year_chart()),
+            dcc.Graph(id='report-occurrence-chart', figure=placeholder_figure()),
             type="circle"
         ),
         
@@ -1036,7 +1099,7 @@ def get_report_layout():
         considerando todos os dados de monitoramento disponíveis.
         """),
         dcc.Loading(
-            dcc.Graph(id='report-ranking-chart', figure=create_locality_ranking_chart()),
+            dcc.Graph(id='report-ranking-chart', figure=placeholder_figure()),
             type="circle"
         ),
         
@@ -1048,7 +1111,7 @@ def get_report_layout():
         A escala DAFOR varia de 0 (Ausente) a 10 (Dominante), indicando a abundância do coral-sol.
         """),
         dcc.Loading(
-            dcc.Graph(id='report-dafor-chart', figure=create_dafor_distribution_chart()),
+            dcc.Graph(id='report-dafor-chart', figure=placeholder_figure()),
             type="circle"
         ),
         
@@ -1060,7 +1123,7 @@ def get_report_layout():
         O gráfico empilhado mostra como a abundância do coral-sol varia ao longo dos anos.
         """),
         dcc.Loading(
-            dcc.Graph(id='report-dafor-year-stacked', figure=create_dafor_by_year_stacked_chart()),
+            dcc.Graph(id='report-dafor-year-stacked', figure=placeholder_figure()),
             type="circle"
         ),
 
@@ -1074,7 +1137,7 @@ def get_report_layout():
         Este índice permite a comparação temporal de abundancia relativa considerando o esforco de monitoramento em horas e espaço disponível (tramanho da localidade).
         """),
         dcc.Loading(
-            dcc.Graph(id='report-raiw-year-chart', figure=create_raiw_by_year_chart()),
+            dcc.Graph(id='report-raiw-year-chart', figure=placeholder_figure()),
             type="circle"
         ),
 
@@ -1086,7 +1149,7 @@ def get_report_layout():
         considerando todos os dados de monitoramento disponiveis.
         """),
         dcc.Loading(
-            dcc.Graph(id='report-raiw-locality-chart', figure=create_raiw_by_locality_chart()),
+            dcc.Graph(id='report-raiw-locality-chart', figure=placeholder_figure()),
             type="circle"
         ),
         
@@ -1100,7 +1163,7 @@ def get_report_layout():
         Os dados devem ser interpretados com cautela, pois este produto não leva em consideração os esforços diferentes realizados em cada localidade.             
         """),
         dcc.Loading(
-            dcc.Graph(id='report-dafor-sum-locality', figure=create_dafor_sum_by_locality_chart()),
+            dcc.Graph(id='report-dafor-sum-locality', figure=placeholder_figure()),
             type="circle"
         ),
         
@@ -1111,7 +1174,7 @@ def get_report_layout():
         Análise da massa total manejada por ano e o número de eventos de manejo realizados. As setas vermelhas indicam anos em que métodos mecanizados foram utilizados, o que pode influenciar a eficiência do manejo.
         """),
         dcc.Loading(
-            dcc.Graph(id='report-management-chart', figure=create_management_efficiency_chart()),
+            dcc.Graph(id='report-management-chart', figure=placeholder_figure()),
             type="circle"
         ),
         
@@ -1124,7 +1187,7 @@ def get_report_layout():
         para a massa total removida por dia de manejo na REBIO Arvoredo e Entorno Imediato.
         """),
         dcc.Loading(
-            dcc.Graph(id='report-removal-rate-chart', figure=create_removal_rate_per_day_chart()),
+            dcc.Graph(id='report-removal-rate-chart', figure=placeholder_figure()),
             type="circle"
         ),
         
@@ -1138,7 +1201,7 @@ def get_report_layout():
         considerando apenas eventos com registro válido de cilindros na REBIO Arvoredo e Entorno Imediato.
         """),
         dcc.Loading(
-            dcc.Graph(id='report-mass-per-cylinder-chart', figure=create_mass_per_cylinder_chart()),
+            dcc.Graph(id='report-mass-per-cylinder-chart', figure=placeholder_figure()),
             type="circle"
         ),
         
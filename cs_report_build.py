@@ -0,0 +1,170 @@
+"""
+Report build engine.
+
+Once the data is loaded the report charts are independent pandas/Plotly jobs,
+so a full build schedules them on a concurrent.futures pool:
+
+    thread   charts share one ReportContext; cheap to start, but the builders
+             hold the GIL most of the time, so the gain is limited
+    process  the parent loads the ReportContext first and forks the workers,
+             which inherit it and build charts in parallel on separate
+             cores without querying the database (needs the fork start
+             method, i.e. not Windows)
+    serial   no pool, charts are built one after the other
+
+The executor, pool size and per-chart timeout come from REPORT_BUILD_EXECUTOR,
+REPORT_BUILD_WORKERS and REPORT_CHART_TIMEOUT_SECONDS. A chart that raises or
+exceeds its timeout gets a placeholder figure and is reported as failed. A
+timed-out builder cannot be interrupted and keeps its worker until it returns;
+when every worker of the pool is held that way, the remaining charts move to
+a fresh pool, so a chart's timeout only ever counts its own running time.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from cs_report import REPORT_CHARTS, UNAVAILABLE_MESSAGE, ReportContext, placeholder_figure
+
+EXECUTORS = ('thread', 'process', 'serial')
+BUILD_EXECUTOR = os.getenv('REPORT_BUILD_EXECUTOR', 'thread')
+BUILD_WORKERS = int(os.getenv('REPORT_BUILD_WORKERS', '0')) or os.cpu_count() or 1
+CHART_TIMEOUT_SECONDS = float(os.getenv('REPORT_CHART_TIMEOUT_SECONDS', '120'))
+
+# Context of the process-pool workers, loaded by the parent before it forks them
+_worker_context = None
+
+
+def _init_worker():
+    # Pooled connections inherited from the parent must not be shared with it
+    from config.database import db
+    db.engine.dispose(close=False)
+
+
+def _build_chart(graph_id, ctx=None):
+    """Figure JSON of `graph_id` and the seconds its builder took."""
+    if ctx is None:
+        ctx = _worker_context
+    t0 = time.perf_counter()
+    figure_json = REPORT_CHARTS[graph_id](ctx).to_json()
+    return figure_json, time.perf_counter() - t0
+
+
+class ReportBuild:
+    """Result of a report build: figure JSON per graph id, timings and failures."""
+
+    def __init__(self, executor, workers):
+        self.executor = executor
+        self.workers = workers
+        self.figures = {}
+        self.timings = {}
+        self.failed = {}
+        self.elapsed = 0.0
+
+    def add(self, graph_id, figure_json, seconds):
+        self.figures[graph_id] = figure_json
+        self.timings[graph_id] = round(seconds, 3)
+
+    def fail(self, graph_id, reason):
+        self.figures[graph_id] = placeholder_figure(UNAVAILABLE_MESSAGE).to_json()
+        self.failed[graph_id] = reason
+        print(f"[REPORT BUILD] {graph_id} failed: {reason}")
+
+    def report(self):
+        """Per-chart timing table, slowest first."""
+        lines = [f"[REPORT BUILD] {len(self.timings)}/{len(REPORT_CHARTS)} charts in {self.elapsed:.2f}s "
+                 f"({self.executor}, {self.workers} workers, {sum(self.timings.values()):.2f}s of chart time)"]
+        for graph_id, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            lines.append(f"    {graph_id:<34} {seconds:7.3f}s")
+        for graph_id, reason in self.failed.items():
+            lines.append(f"    {graph_id:<34}  failed: {reason}")
+        return "\n".join(lines)
+
+
+def build_report_figures(executor=BUILD_EXECUTOR, workers=BUILD_WORKERS, timeout=CHART_TIMEOUT_SECONDS, ctx=None):
+    """
+    Build every report chart on a pool of `workers` (see the module docstring).
+
+    Args:
+        executor: 'thread', 'process' or 'serial'.
+        timeout: seconds each chart may take once started (None or 0 waits forever).
+        ctx: ReportContext the charts are built from (a new one by default).
+    Returns:
+        ReportBuild with a figure for every graph id of REPORT_CHARTS, in page order.
+    """
+    global _worker_context
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown report build executor {executor!r}, expected one of {EXECUTORS}")
+    workers = 1 if executor == 'serial' else max(1, int(workers))
+    build = ReportBuild(executor, workers)
+    t0 = time.perf_counter()
+
+    if executor == 'serial':
+        ctx = ctx or ReportContext()
+        for graph_id in REPORT_CHARTS:
+            try:
+                build.add(graph_id, *_build_chart(graph_id, ctx))
+            except Exception as e:
+                build.fail(graph_id, str(e) or type(e).__name__)
+    elif executor == 'thread':
+        ctx = ctx or ReportContext()
+        _run_on_pools(lambda: ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-build'),
+                      workers, timeout, ctx, build)
+    else:
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise ValueError("The process report build executor needs the fork start method")
+        _worker_context = (ctx or ReportContext()).load_all()
+        fork = multiprocessing.get_context('fork')
+        try:
+            _run_on_pools(lambda: ProcessPoolExecutor(max_workers=workers, mp_context=fork, initializer=_init_worker),
+                          workers, timeout, None, build)
+        finally:
+            _worker_context = None
+
+    build.elapsed = time.perf_counter() - t0
+    build.figures = {graph_id: build.figures[graph_id] for graph_id in REPORT_CHARTS}
+    return build
+
+
+def _run_on_pools(make_pool, workers, timeout, ctx, build):
+    # A chart is only submitted when a worker is free, so it starts on
+    # submission and its timeout can be counted from there. Timed-out
+    # builders keep holding their worker (`stuck`).
+    queue = list(REPORT_CHARTS)
+    running = {}
+    pools = [make_pool()]
+    stuck = []
+    try:
+        while queue or running:
+            stuck = [future for future in stuck if not future.done()]
+            if queue and len(stuck) >= workers:
+                print(f"[REPORT BUILD] All {workers} workers are stuck, continuing on a new pool")
+                pools.append(make_pool())
+                stuck = []
+            while queue and len(running) + len(stuck) < workers:
+                graph_id = queue.pop(0)
+                running[pools[-1].submit(_build_chart, graph_id, ctx)] = (graph_id, time.perf_counter())
+
+            wait_for = None
+            if timeout:
+                next_deadline = min(started for _, started in running.values()) + timeout
+                wait_for = max(0.0, next_deadline - time.perf_counter())
+            done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                graph_id, _ = running.pop(future)
+                try:
+                    build.add(graph_id, *future.result())
+                except Exception as e:
+                    build.fail(graph_id, str(e) or type(e).__name__)
+            if timeout:
+                now = time.perf_counter()
+                for future, (graph_id, started) in list(running.items()):
+                    if now - started >= timeout:
+                        running.pop(future)
+                        stuck.append(future)
+                        build.fail(graph_id, f"timed out after {timeout:g}s")
+    finally:
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,200 @@
+"""
+Precomputed report artifacts.
+
+The report charts cover the whole history and only change when field data
+changes, so they can be built ahead of time. A refresh compares the database
+fingerprints of the report tables with those recorded in the snapshot
+directory and, when they differ, rebuilds every chart and writes:
+
+    <graph id>.json   Plotly figure JSON of each report graph
+    summary.json      values of the summary cards
+    manifest.json     fingerprints the files were built from, build time and timings
+
+The report tab serves these files while the manifest fingerprints match the
+current data and falls back to building charts on demand otherwise. Refreshes run in a daemon thread of the app every
+REPORT_REFRESH_SECONDS (0 disables it) or from the command line:
+
+    python cs_report_snapshot.py            # refresh once if the data changed
+    python cs_report_snapshot.py --force    # rebuild unconditionally
+    python cs_report_snapshot.py --watch    # keep refreshing
+    python cs_report_snapshot.py --executor process --workers 8
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+
+from cs_report import REPORT_TABLES, ReportContext, compute_report_summary
+from cs_report_build import BUILD_EXECUTOR, BUILD_WORKERS, CHART_TIMEOUT_SECONDS, EXECUTORS, build_report_figures
+from services.data_service import snapshot_store
+
+# REPORT_SNAPSHOT_DIR holds the artifacts; set it empty to disable them
+SNAPSHOT_DIR = os.getenv(
+    'REPORT_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'report'),
+)
+REFRESH_SECONDS = int(os.getenv('REPORT_REFRESH_SECONDS', '600'))
+
+# Last check of each snapshot directory: (checked at, manifest if current else None)
+_manifest_checks = {}
+_manifest_lock = threading.Lock()
+
+
+def data_fingerprint():
+    """Fingerprints of the report tables in JSON form, as stored in the manifest."""
+    return json.loads(json.dumps(snapshot_store.fingerprints(*REPORT_TABLES), default=str))
+
+
+def _write_json(path, content):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_manifest(directory=SNAPSHOT_DIR):
+    return _read_json(os.path.join(directory, 'manifest.json')) if directory else None
+
+
+def current_manifest(directory=SNAPSHOT_DIR):
+    """
+    Manifest of the snapshot in `directory` if it was built from the current
+    data, None otherwise. Reading the fingerprints queries the database, so
+    the result is reused for snapshot_store.poll_seconds.
+    """
+    if not directory:
+        return None
+    with _manifest_lock:
+        checked = _manifest_checks.get(directory)
+        if checked is not None and time.monotonic() - checked[0] < snapshot_store.poll_seconds:
+            return checked[1]
+        manifest = read_manifest(directory)
+        if manifest is not None and manifest.get('fingerprint') != data_fingerprint():
+            manifest = None
+        _manifest_checks[directory] = (time.monotonic(), manifest)
+        return manifest
+
+
+def write_report_snapshot(directory=SNAPSHOT_DIR, fingerprint=None, executor=BUILD_EXECUTOR, workers=BUILD_WORKERS,
+                          timeout=CHART_TIMEOUT_SECONDS):
+    """
+    Build every report chart and the summary and write them to `directory`.
+    Charts are built by cs_report_build (on a pool, see build_report_figures);
+    charts whose builder fails or times out are left out (the tab then builds
+    them live). Returns the manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    fingerprint = data_fingerprint() if fingerprint is None else fingerprint
+    ctx = ReportContext()
+    build = build_report_figures(executor=executor, workers=workers, timeout=timeout, ctx=ctx)
+    for graph_id, figure_json in build.figures.items():
+        path = os.path.join(directory, f'{graph_id}.json')
+        if graph_id not in build.failed:
+            _write_json(path, figure_json)
+        elif os.path.exists(path):
+            # Never serve the previous build's figure of a chart that failed now
+            os.remove(path)
+    _write_json(os.path.join(directory, 'summary.json'), json.dumps(compute_report_summary(ctx)))
+
+    manifest = {
+        'fingerprint': fingerprint,
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'executor': build.executor,
+        'workers': build.workers,
+        'elapsed': round(build.elapsed, 3),
+        'timings': build.timings,
+        'failed': sorted(build.failed),
+    }
+    # Written last: a manifest always describes complete files
+    _write_json(os.path.join(directory, 'manifest.json'), json.dumps(manifest, indent=2))
+    with _manifest_lock:
+        _manifest_checks.pop(directory, None)
+    print(build.report())
+    print(f"[REPORT SNAPSHOT] Wrote {len(build.timings)} charts to {directory}")
+    return manifest
+
+
+def refresh_report_snapshot(directory=SNAPSHOT_DIR, force=False, **build_options):
+    """
+    Rebuild the snapshot if the report tables changed since it was written
+    (`build_options` go to write_report_snapshot). Returns True if rebuilt.
+    """
+    fingerprint = data_fingerprint()
+    manifest = read_manifest(directory)
+    if not force and manifest is not None and manifest.get('fingerprint') == fingerprint and not manifest.get('failed'):
+        return False
+    write_report_snapshot(directory, fingerprint, **build_options)
+    return True
+
+
+def load_report_figure(graph_id, directory=SNAPSHOT_DIR):
+    """
+    Stored figure of report graph `graph_id` as a dict, or None if there is no
+    current snapshot of it (see current_manifest) or it failed in the last build.
+    """
+    manifest = current_manifest(directory)
+    if manifest is None or graph_id in manifest.get('failed', ()):
+        return None
+    return _read_json(os.path.join(directory, f'{graph_id}.json'))
+
+
+def load_report_summary(directory=SNAPSHOT_DIR):
+    """Stored summary card values (see cs_report.compute_report_summary), or None if not current."""
+    if current_manifest(directory) is None:
+        return None
+    return _read_json(os.path.join(directory, 'summary.json'))
+
+
+def _refresh_forever(directory, interval, **build_options):
+    while True:
+        try:
+            refresh_report_snapshot(directory, **build_options)
+        except Exception as e:
+            print(f"[REPORT SNAPSHOT] Refresh failed: {e}")
+        time.sleep(interval)
+
+
+def start_report_refresher(directory=SNAPSHOT_DIR, interval=REFRESH_SECONDS):
+    """Refresh the snapshot now and every `interval` seconds in a daemon thread (None when disabled)."""
+    if not directory or interval <= 0:
+        return None
+    thread = threading.Thread(target=_refresh_forever, args=(directory, interval),
+                              name='report-snapshot-refresher', daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the report charts and summary to the snapshot directory.")
+    parser.add_argument('--dir', default=SNAPSHOT_DIR, help="snapshot directory (default: %(default)s)")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the data did not change")
+    parser.add_argument('--watch', action='store_true', help="keep refreshing every --interval seconds")
+    parser.add_argument('--interval', type=int, default=REFRESH_SECONDS or 600)
+    parser.add_argument('--executor', choices=EXECUTORS, default=BUILD_EXECUTOR,
+                        help="pool the charts are built on (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=BUILD_WORKERS, help="pool size (default: %(default)s)")
+    parser.add_argument('--timeout', type=float, default=CHART_TIMEOUT_SECONDS,
+                        help="seconds each chart may take, 0 for no limit (default: %(default)s)")
+    args = parser.parse_args(argv)
+    build_options = {'executor': args.executor, 'workers': args.workers, 'timeout': args.timeout}
+
+    if not args.dir:
+        parser.error("no snapshot directory (REPORT_SNAPSHOT_DIR is empty)")
+    if args.watch:
+        _refresh_forever(args.dir, args.interval, **build_options)
+    elif not refresh_report_snapshot(args.dir, force=args.force, **build_options):
+        print(f"[REPORT SNAPSHOT] {args.dir} is up to date")
+
+
+if __name__ == "__main__":
+    main()
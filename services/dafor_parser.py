@@ -0,0 +1,136 @@
+"""
+Vectorised parser for the comma-separated `dafor_value` column.
+
+A whole column is parsed in one pass: the strings are joined and split once,
+cast to numbers with a single bulk conversion and validated against the DAFOR
+scale. The result is returned directly in CSR form (flat int8 scores plus
+per-transect offsets), together with the Dafor_ids of the records that held
+tokens which are not DAFOR scores and the reason they were rejected.
+
+Run `python -m services.dafor_parser` to benchmark it against the previous
+per-minute `pd.to_numeric` idiom on a synthetic table.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+DAFOR_CLASSES = (0, 2, 4, 6, 8, 10)
+
+ParsedDafor = namedtuple('ParsedDafor', ['values', 'offsets', 'bad_records'])
+
+
+def parse_dafor_column(dafor_ids, dafor_values):
+    """
+    Parse a column of comma-separated DAFOR minute scores.
+
+    Args:
+        dafor_ids: sequence of Dafor_id, one per transect (used for reporting).
+        dafor_values: sequence of dafor_value strings, one per transect.
+    Returns:
+        ParsedDafor(values, offsets, bad_records) where `values` is an int8 array
+        of all valid minute scores back to back, `offsets` (len n + 1) delimits
+        the scores of each transect, and `bad_records` is a DataFrame with
+        columns ['dafor_id', 'reason'] listing every transect that had at least
+        one rejected token. Rejected tokens are dropped; the other minutes of
+        the transect are kept.
+    """
+    texts = pd.Series(dafor_values, dtype=object).fillna('').astype(str).to_numpy()
+    n = len(texts)
+    if n == 0:
+        return ParsedDafor(np.zeros(0, dtype=np.int8), np.zeros(1, dtype=np.int64),
+                           pd.DataFrame({'dafor_id': [], 'reason': []}))
+
+    # One split over the whole column; each record contributes (commas + 1) tokens
+    tokens = np.array(','.join(texts).split(','), dtype=object)
+    counts = np.char.count(texts.astype(str), ',') + 1
+    owner = np.repeat(np.arange(n), counts)
+
+    numbers = _to_float(tokens)
+    is_number = np.isfinite(numbers)
+    is_integer = is_number & (numbers == np.round(numbers))
+    is_valid = is_integer & np.isin(numbers, DAFOR_CLASSES)
+
+    kept_counts = np.bincount(owner[is_valid], minlength=n)
+    offsets = np.concatenate(([0], np.cumsum(kept_counts))).astype(np.int64)
+    values = numbers[is_valid].astype(np.int8)
+
+    bad_records = _describe_rejections(np.asarray(dafor_ids), tokens, owner, numbers,
+                                       is_number, is_integer, is_valid)
+    return ParsedDafor(values, offsets, bad_records)
+
+
+def _to_float(tokens):
+    """Bulk string -> float conversion; tokens that are not numbers become NaN."""
+    try:
+        return tokens.astype(np.float64)
+    except ValueError:
+        # At least one token is not a number: fall back to the coercing parser for the column
+        return pd.to_numeric(pd.Series(tokens), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _describe_rejections(dafor_ids, tokens, owner, numbers, is_number, is_integer, is_valid):
+    """One row per transect with rejected tokens, naming the first offending token."""
+    rejected = np.flatnonzero(~is_valid)
+    if len(rejected) == 0:
+        return pd.DataFrame({'dafor_id': dafor_ids[:0], 'reason': pd.Series([], dtype=object)})
+
+    reasons = []
+    for idx in rejected:
+        token = str(tokens[idx]).strip()
+        if token == '':
+            reasons.append('empty minute score')
+        elif not is_number[idx]:
+            reasons.append(f"non-numeric minute score '{token}'")
+        elif not is_integer[idx]:
+            reasons.append(f"non-integer minute score '{token}'")
+        else:
+            reasons.append(f"score {numbers[idx]:g} is not on the DAFOR scale {DAFOR_CLASSES}")
+    report = pd.DataFrame({'transect': owner[rejected], 'reason': reasons})
+    report = report.groupby('transect', sort=True).agg(
+        reason=('reason', 'first'),
+        n_rejected=('reason', 'size'),
+    ).reset_index()
+    report['reason'] = np.where(
+        report['n_rejected'] > 1,
+        report['reason'] + ' (+' + (report['n_rejected'] - 1).astype(str) + ' more)',
+        report['reason'],
+    )
+    report['dafor_id'] = dafor_ids[report['transect'].to_numpy()]
+    return report[['dafor_id', 'reason']]
+
+
+def _legacy_parse(dafor_values):
+    """The per-minute idiom this module replaces, kept for the benchmark."""
+    return [
+        [v for v in (pd.to_numeric(i, errors='coerce') for i in str(x).split(',')) if not pd.isna(v)]
+        for x in dafor_values
+    ]
+
+
+def benchmark(n_transects=100_000, minutes_per_transect=20, seed=0):
+    """Time parse_dafor_column against the legacy idiom on a synthetic dafor_value column."""
+    import time
+
+    rng = np.random.default_rng(seed)
+    scores = rng.choice(DAFOR_CLASSES, size=(n_transects, minutes_per_transect)).astype(str)
+    dafor_values = [','.join(row) for row in scores]
+    dafor_ids = np.arange(1, n_transects + 1)
+
+    t0 = time.perf_counter()
+    parsed = parse_dafor_column(dafor_ids, dafor_values)
+    vectorised = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    legacy = _legacy_parse(dafor_values)
+    legacy_time = time.perf_counter() - t0
+
+    assert len(parsed.values) == sum(len(m) for m in legacy)
+    print(f"{n_transects} transects x {minutes_per_transect} minutes")
+    print(f"  parse_dafor_column: {vectorised:.3f}s")
+    print(f"  legacy to_numeric : {legacy_time:.3f}s ({legacy_time / vectorised:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    benchmark()
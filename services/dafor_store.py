@@ -0,0 +1,124 @@
+"""
+Columnar, pre-exploded store of minute-level DAFOR scores.
+
+All minute scores of all transects live back to back in one int8 array;
+`offsets[i]:offsets[i+1]` is the slice belonging to transect i (CSR layout).
+Parallel per-transect arrays hold dafor_id, locality_id and date. Per-transect
+totals (minutes, detections, RAI-W weight sum, DAFOR sum and a count per DAFOR
+class) are reduced once when the store is built, so every indicator becomes a
+mask plus a bincount over shared buffers instead of a split/explode per call.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from services.dafor_parser import DAFOR_CLASSES, parse_dafor_column
+
+# RAI-W weights of the method description
+RAIW_WEIGHTS = {10: 1.00, 8: 0.80, 6: 0.60, 4: 0.10, 2: 0.04, 0: 0.00}
+
+# Lookup tables indexed by score + 128 (the whole int8 range)
+_WEIGHT_LUT = np.zeros(256)
+_CLASS_LUT = np.full(256, -1, dtype=np.int64)
+for _idx, _score in enumerate(DAFOR_CLASSES):
+    _WEIGHT_LUT[_score + 128] = RAIW_WEIGHTS[_score]
+    _CLASS_LUT[_score + 128] = _idx
+
+
+class DaforMinuteStore:
+    def __init__(self, values, offsets, dafor_id, locality_id, date):
+        self.values = np.asarray(values, dtype=np.int8)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.dafor_id = np.asarray(dafor_id)
+        self.locality_id = np.asarray(locality_id)
+        self.date = np.asarray(date, dtype='datetime64[ns]')
+        self.lengths = np.diff(self.offsets)
+        # Transect index of every minute
+        self.minute_transect = np.repeat(np.arange(len(self.lengths)), self.lengths)
+        self._reduce_transects()
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build the store from a get_dafor_data() frame. The minute scores the
+        snapshot loader already parsed ('dafor_minutes') are packed as they are;
+        frames without that column have their 'dafor_value' column parsed with
+        services/dafor_parser.py (invalid minute scores are dropped).
+        """
+        if 'dafor_minutes' in df.columns:
+            minutes = df['dafor_minutes'].tolist()
+            counts = np.fromiter((len(m) for m in minutes), dtype=np.int64, count=len(minutes))
+            values = np.fromiter(itertools.chain.from_iterable(minutes), dtype=np.int8, count=int(counts.sum()))
+            offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        else:
+            parsed = parse_dafor_column(df['dafor_id'].to_numpy(), df['dafor_value'].to_numpy())
+            values, offsets = parsed.values, parsed.offsets
+        return cls(values, offsets, df['dafor_id'].to_numpy(),
+                   df['locality_id'].to_numpy(), pd.to_datetime(df['date']).to_numpy())
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def _reduce_transects(self):
+        """Per-transect totals, computed once for the lifetime of the store."""
+        n = len(self.lengths)
+        owner = self.minute_transect
+        lut_index = self.values.astype(np.int64) + 128
+        self.n_minutes = self.lengths
+        self.n_detections = np.bincount(owner, weights=self.values > 0, minlength=n).astype(np.int64)
+        self.weight_sum = np.bincount(owner, weights=_WEIGHT_LUT[lut_index], minlength=n)
+        self.dafor_sum = np.bincount(owner, weights=self.values, minlength=n)
+        class_idx = _CLASS_LUT[lut_index]
+        in_class = class_idx >= 0
+        self.class_counts = np.bincount(
+            owner[in_class] * len(DAFOR_CLASSES) + class_idx[in_class],
+            minlength=n * len(DAFOR_CLASSES)
+        ).reshape(n, len(DAFOR_CLASSES))
+
+    def transect_mask(self, start_date=None, end_date=None, locality_ids=None):
+        """Boolean mask over transects for an inclusive date window and optional locality list."""
+        mask = np.ones(len(self), dtype=bool)
+        if start_date and end_date:
+            start = np.datetime64(pd.to_datetime(start_date), 'ns')
+            end = np.datetime64(pd.to_datetime(end_date), 'ns')
+            mask &= (self.date >= start) & (self.date <= end)
+        if locality_ids:
+            mask &= np.isin(self.locality_id, [int(i) for i in locality_ids])
+        return mask
+
+    def minute_values(self, mask=None):
+        """Flat array of the minute scores of the transects selected by `mask`."""
+        if mask is None:
+            return self.values
+        return self.values[mask[self.minute_transect]]
+
+    def transect_frame(self, mask=None):
+        """
+        One row per selected transect with its reduced totals:
+        dafor_id, locality_id, date, Nmin, Ndetec, weight_sum, dafor_sum.
+        """
+        if mask is None:
+            mask = np.ones(len(self), dtype=bool)
+        return pd.DataFrame({
+            'dafor_id': self.dafor_id[mask],
+            'locality_id': self.locality_id[mask],
+            'date': self.date[mask],
+            'Nmin': self.n_minutes[mask],
+            'Ndetec': self.n_detections[mask],
+            'weight_sum': self.weight_sum[mask],
+            'dafor_sum': self.dafor_sum[mask],
+        })
+
+    def locality_totals(self, mask=None):
+        """Ndetec, Nmin and weight_sum per locality_id over the selected transects."""
+        if mask is None:
+            mask = np.ones(len(self), dtype=bool)
+        ids, inverse = np.unique(self.locality_id[mask], return_inverse=True)
+        return pd.DataFrame({
+            'locality_id': ids,
+            'Ndetec': np.bincount(inverse, weights=self.n_detections[mask], minlength=len(ids)).astype(np.int64),
+            'Nmin': np.bincount(inverse, weights=self.n_minutes[mask], minlength=len(ids)).astype(np.int64),
+            'weight_sum': np.bincount(inverse, weights=self.weight_sum[mask], minlength=len(ids)),
+        })
@@ -1,378 +1,521 @@
+import os
+import numpy as np
 import pandas as pd
 import json
-from functools import lru_cache
+import threading
+from sqlalchemy import text, bindparam
 from config.database import db
-from geopy.distance import geodesic
+from services.snapshot_cache import TableSnapshotStore
+from services.dafor_store import DaforMinuteStore
+from services.indicator_cube import IndicatorCube
+from services.dafor_parser import parse_dafor_column
+from services.geodesy import (
+    cumulative_length, interpolate_at_distances, parse_line, polyline_length_json, resample_every,
+)
+from services.length_cache import GeodesicLengthCache
+from services.result_cache import ResultCache
+from services.window_filter import build_window_filter
+from services import spatial_dafor
 
-class CoralDataService:
-    def get_locality_data(self):
-        query = "SELECT locality_id, name, coords_local FROM data_coralsol_locality"
-        df = pd.read_sql(query, db.engine)
+LOCALITY_QUERY = "SELECT locality_id, name, coords_local FROM data_coralsol_locality"
+DAFOR_QUERY = "SELECT Dafor_id, Locality_id, Dafor_coords, Date, Dafor_value FROM data_coralsol_dafor"
+OCCURRENCE_QUERY = "SELECT Locality_id, Occurrence_id, Spot_Coords, Date, Depth, Access, Geomorphology, Subaquatica_photo, Superficie_photo FROM data_coralsol_occurrence"
+MANAGEMENT_QUERY = "SELECT management_id, Locality_id, Management_coords, Date, Observer, Depth, Number_of_divers, Number_of_cylinders, Method, Managed_mass_kg, Observation, occurrences_managed FROM data_coralsol_management"
 
-        # Parse JSON coordinates with error handling
-        def parse_coords(val):
-            try:
-                coords = json.loads(val)
-                if coords and isinstance(coords[0], list):
-                    return coords[0]
-            except Exception:
-                return [None, None]
-            return [None, None]
+# Full-table snapshots shared by every CoralDataService instance.
+# Snapshots are reloaded when their table fingerprint changes (checked at most every
+# SNAPSHOT_POLL_SECONDS) and in any case after SNAPSHOT_TTL_SECONDS.
+# SNAPSHOT_TTL_SECONDS=0 disables them and sends every getter straight to MySQL.
+snapshot_store = TableSnapshotStore(
+    ttl_seconds=int(os.getenv('SNAPSHOT_TTL_SECONDS', '3600')),
+    poll_seconds=int(os.getenv('SNAPSHOT_POLL_SECONDS', '30')),
+)
+
+# Lengths of locality and transect lines, persisted across restarts.
+# GEODESIC_LENGTH_CACHE is the JSON file backing it; set it empty to keep lengths in memory only.
+length_cache = GeodesicLengthCache(os.getenv(
+    'GEODESIC_LENGTH_CACHE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'geodesic_lengths.json'),
+))
+
+# Results of the expensive getters, shared by all service instances and keyed on
+# their arguments and the data version (see services/result_cache.py).
+# RESULT_CACHE_MAX_MB bounds its size (0 disables it); RESULT_CACHE_TTL_SECONDS
+# expires entries that were not invalidated by new data (0 keeps them until evicted).
+result_cache = ResultCache(
+    max_bytes=int(float(os.getenv('RESULT_CACHE_MAX_MB', '256')) * 1024 ** 2),
+    ttl_seconds=int(os.getenv('RESULT_CACHE_TTL_SECONDS', '3600')),
+)
+
+# Structures derived from the snapshots and shared by all service instances:
+# name -> (snapshot versions they were built from, value)
+_derived = {}
+# name -> lock held while that structure is built, so concurrent callbacks build it once
+_derived_locks = {}
+_derived_locks_guard = threading.Lock()
+
+
+def derived(name, tables, build):
+    """
+    Return the structure `name` built by `build()` from the snapshots of
+    `tables`, rebuilding it only when one of those tables changes. Threads
+    asking for a structure that is being built wait for that build.
+    """
+    if not snapshot_store.enabled:
+        return build()
+    version = snapshot_store.version(*tables)
+    cached = _derived.get(name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _derived_locks_guard:
+        lock = _derived_locks.setdefault(name, threading.Lock())
+    with lock:
+        cached = _derived.get(name)
+        if cached is None or cached[0] != version:
+            cached = (version, build())
+            _derived[name] = cached
+    return cached[1]
+
+
+def cached_result(*tables, ttl_seconds=None):
+    """
+    Cache a getter's result in `result_cache` until one of `tables` changes.
+    Without snapshots there is no data version and every call is computed.
+    """
+    def version():
+        return snapshot_store.version(*tables) if snapshot_store.enabled else None
+    return result_cache.cached(version, ttl_seconds)
+
+
+def read_filtered(query, date_column, start_date=None, end_date=None, locality_ids=None, locality_column='Locality_id'):
+    """Run `query` with the window filter appended as bound parameters and return a DataFrame."""
+    where_sql, params = build_window_filter(date_column, start_date, end_date, locality_ids, locality_column)
+    statement = text(query + where_sql)
+    if 'locality_ids' in params:
+        statement = statement.bindparams(bindparam('locality_ids', expanding=True))
+    with db.engine.connect() as conn:
+        return pd.read_sql(statement, conn, params=params)
+
+
+def dafor_checksum(max_id=None):
+    """
+    (highest Dafor_id, row count, XOR of the CRC32 of every row) of the DAFOR
+    table, or of its rows with Dafor_id <= `max_id`. Any insert, delete or
+    in-place edit within the range changes it.
+    """
+    statement = (
+        "SELECT MAX(Dafor_id), COUNT(*), "
+        "COALESCE(BIT_XOR(CRC32(CONCAT_WS('|', Dafor_id, Locality_id, Dafor_coords, Date, Dafor_value))), 0) "
+        "FROM data_coralsol_dafor"
+    )
+    params = {}
+    if max_id is not None:
+        statement += " WHERE Dafor_id <= :max_id"
+        params['max_id'] = int(max_id)
+    with db.engine.connect() as conn:
+        max_found, count, crc = conn.execute(text(statement), params).one()
+    return (int(max_id if max_id is not None else (max_found or 0)), int(count), int(crc))
+
+
+def read_after_id(query, id_column, last_id):
+    """Run `query` restricted to rows whose `id_column` is greater than `last_id`."""
+    statement = text(f"{query} WHERE {id_column} > :last_id")
+    with db.engine.connect() as conn:
+        return pd.read_sql(statement, conn, params={'last_id': int(last_id)})
+
+
+def filter_window(df, start_date=None, end_date=None, locality_ids=None):
+    """
+    In-memory counterpart of build_window_filter for snapshot frames: same
+    inclusive date window and locality list, applied to the lowercase
+    'date' and 'locality_id' columns.
+    """
+    mask = pd.Series(True, index=df.index)
+    if start_date and end_date:
+        mask &= df['date'].between(pd.to_datetime(start_date), pd.to_datetime(end_date))
+    if locality_ids:
+        mask &= df['locality_id'].isin([int(i) for i in locality_ids])
+    return df[mask].reset_index(drop=True)
+
+
+def parse_first_coord(val):
+    """Return the first [lat, lon] pair of a JSON coordinate list, or [None, None]."""
+    try:
+        coords = json.loads(val)
+        if coords and isinstance(coords[0], list):
+            return coords[0]
+    except Exception:
+        return [None, None]
+    return [None, None]
+
+
+def line_length_m(coords_json):
+    """Geodesic length (in meters) of a JSON [[lat, lon], ...] polyline; 0 if it cannot be parsed."""
+    return polyline_length_json(coords_json)
+
+
+def interpolate_points_on_line(coords, cumulative_dist, target_dists):
+    """
+    Interpolate points at several distances along a polyline in one pass
+    (binary search over `cumulative_dist`, see geodesy.interpolate_at_distances).
+    Returns an (N, 2) array of [lat, lon]. A zero-length segment yields its start
+    point; distances beyond the end of the line yield the last point.
+    """
+    return interpolate_at_distances(coords, cumulative_dist, target_dists)
+
+
+def interpolate_point_on_line(coords, cumulative_dist, target_dist):
+    """
+    Interpolate a point at a specific distance along a polyline.
+    Returns [lat, lon] at the target distance.
+    """
+    return interpolate_points_on_line(coords, cumulative_dist, [target_dist])[0].tolist()
+
+
+def split_transect_segments(coords_json, dafor_values):
+    """
+    Split one monitoring transect into ~100m segments carrying the mean DAFOR
+    score of the minutes that fall in them.
+    Returns a list of dicts with the segment midpoint ('lat', 'lon'),
+    'dafor_score' and 'effort' (number of minutes).
+    """
+    segments = []
+    try:
+        coords = parse_line(coords_json)
+        if coords is None or not dafor_values:
+            return segments
+
+        # Calculate cumulative distances
+        cumulative_dist = cumulative_length(coords)
+
+        total_length = cumulative_dist[-1]
+        if total_length == 0:
+            return segments
+
+        # Create 100m segments along this transect
+        num_segments = max(1, int(total_length / 100))
+        segment_length = total_length / num_segments
+        values_per_segment = max(1, len(dafor_values) // num_segments)
+
+        # Midpoint coordinates of every segment at once
+        start_dists = np.arange(num_segments) * segment_length
+        end_dists = np.minimum(start_dists + segment_length, total_length)
+        mid_points = interpolate_points_on_line(coords, cumulative_dist, (start_dists + end_dists) / 2)
+
+        for seg_idx in range(num_segments):
+            # Get DAFOR values for this segment
+            start_val_idx = seg_idx * values_per_segment
+            end_val_idx = min((seg_idx + 1) * values_per_segment, len(dafor_values))
+            segment_dafor_values = dafor_values[start_val_idx:end_val_idx]
+
+            if not segment_dafor_values:
+                continue
+
+            segments.append({
+                'lat': mid_points[seg_idx, 0],
+                'lon': mid_points[seg_idx, 1],
+                'dafor_score': np.mean(segment_dafor_values),
+                'effort': len(segment_dafor_values)  # number of minutes, used for weighting
+            })
+    except Exception as e:
+        print(f"[DAFOR SPATIAL] Error processing transect: {e}")
+    return segments
 
-        df[['LATITUDE', 'LONGITUDE']] = df['coords_local'].apply(parse_coords).apply(pd.Series)
-        return df  # <-- Do NOT drop 'coords_local'
 
-    def get_dafor_data(self, start_date=None, end_date=None):
-        query = "SELECT Dafor_id, Locality_id, Dafor_coords, Date, Dafor_value FROM data_coralsol_dafor"
-        df = pd.read_sql(query, db.engine)
+def add_transect_products(df):
+    """
+    Attach the per-transect products that never change once a transect is
+    uploaded: parsed minute scores ('dafor_minutes'), the reason any score was
+    rejected by the parser ('dafor_error', None when the record is clean),
+    geodesic length ('length_m') and the 100m monitoring segments
+    ('monitoring_segments').
+    """
+    parsed = parse_dafor_column(df['dafor_id'].to_numpy(), df['dafor_value'].to_numpy())
+    bounds = parsed.offsets
+    df['dafor_minutes'] = [parsed.values[bounds[i]:bounds[i+1]].tolist() for i in range(len(df))]
+    errors = dict(zip(parsed.bad_records['dafor_id'], parsed.bad_records['reason']))
+    df['dafor_error'] = [errors.get(i) for i in df['dafor_id']]
+    if errors:
+        print(f"[DAFOR PARSER] {len(errors)} transect(s) with invalid minute scores: {sorted(errors)[:10]}")
+    df['length_m'] = length_cache.lengths('dafor', df['dafor_id'], df['dafor_coords'])
+    df['monitoring_segments'] = [
+        split_transect_segments(coords, minutes)
+        for coords, minutes in zip(df['dafor_coords'], df['dafor_minutes'])
+    ]
+    return df
+
+
+def load_locality_table():
+    df = pd.read_sql(LOCALITY_QUERY, db.engine)
+    df[['LATITUDE', 'LONGITUDE']] = df['coords_local'].apply(parse_first_coord).apply(pd.Series)
+    df['length_m'] = length_cache.lengths('locality', df['locality_id'], df['coords_local'])
+    return df
+
+
+def load_dafor_table():
+    # Checksum first: an edit made during the read then fails the next append check
+    checksum = dafor_checksum()
+    df = pd.read_sql(DAFOR_QUERY, db.engine)
+    df.columns = df.columns.str.lower()
+    df['date'] = pd.to_datetime(df['date'])
+    df = add_transect_products(df)
+    df.attrs['checksum'] = checksum
+    return df
+
+
+def append_dafor_rows(frame, old_fingerprint, new_fingerprint):
+    """
+    Grow the cached DAFOR snapshot with the transects uploaded since it was
+    loaded (Dafor_id > last ingested id), processing only those rows.
+    Returns None, forcing a full reload, when the change is not a pure append:
+    rows deleted or edited in place are caught by comparing the checksum of
+    the already ingested id range with the one recorded with the snapshot
+    (the count and UPDATE_TIME of the fingerprint also move on inserts, so
+    they cannot tell an insert plus an edit from an insert).
+    """
+    old_count, old_max_id = old_fingerprint[0], old_fingerprint[1]
+    new_count = new_fingerprint[0]
+    checksum = frame.attrs.get('checksum')
+    if old_max_id is None or new_count <= old_count or checksum is None:
+        return None
+    if dafor_checksum(checksum[0]) != checksum:
+        return None
+    # Recorded before the new rows are read, so it never covers rows missing from the frame
+    new_checksum = dafor_checksum()
+    new_rows = read_after_id(DAFOR_QUERY, 'Dafor_id', old_max_id)
+    if len(new_rows) != new_count - old_count:
+        return None
+    new_rows.columns = new_rows.columns.str.lower()
+    new_rows['date'] = pd.to_datetime(new_rows['date'])
+    new_rows = add_transect_products(new_rows)
+    grown = pd.concat([frame, new_rows], ignore_index=True)
+    grown.attrs['checksum'] = new_checksum
+    return grown
+
+
+def load_occurrence_table():
+    df = pd.read_sql(OCCURRENCE_QUERY, db.engine)
+    df.columns = df.columns.str.lower()
+    df['date'] = pd.to_datetime(df['date'], dayfirst=True)
+    return df
+
+
+def load_management_table():
+    df = pd.read_sql(MANAGEMENT_QUERY, db.engine)
+    df.columns = df.columns.str.lower()
+    df['date'] = pd.to_datetime(df['date'], dayfirst=True)
+    return df
+
+
+def table_fingerprint(table, id_column):
+    """
+    Return a zero-argument callable giving a cheap change fingerprint for `table`:
+    row count, highest id and the UPDATE_TIME MySQL keeps in information_schema
+    (which also catches in-place edits when the server tracks it).
+    """
+    statement = text(
+        f"SELECT COUNT(*), MAX({id_column}), "
+        f"(SELECT UPDATE_TIME FROM information_schema.TABLES "
+        f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table}') "
+        f"FROM {table}"
+    )
+
+    def fingerprint():
+        with db.engine.connect() as conn:
+            return tuple(conn.execute(statement).one())
+    return fingerprint
+
+
+snapshot_store.register('locality', load_locality_table, table_fingerprint('data_coralsol_locality', 'locality_id'))
+snapshot_store.register('dafor', load_dafor_table, table_fingerprint('data_coralsol_dafor', 'Dafor_id'),
+                        append=append_dafor_rows)
+snapshot_store.register('occurrence', load_occurrence_table, table_fingerprint('data_coralsol_occurrence', 'Occurrence_id'))
+snapshot_store.register('management', load_management_table, table_fingerprint('data_coralsol_management', 'management_id'))
+
+
+class CoralDataService:
+    def data_version(self, *tables):
+        """
+        Version tuple of the given snapshot tables (all of them by default).
+        It only changes when new data is loaded, so derived results keyed on it
+        are rebuilt exactly when the underlying tables change.
+        """
+        return snapshot_store.version(*(tables or ('locality', 'dafor', 'occurrence', 'management')))
+
+    def get_locality_data(self):
+        if snapshot_store.enabled:
+            return snapshot_store.get('locality')
+        return load_locality_table()  # <-- Do NOT drop 'coords_local'
+
+    def get_dafor_data(self, start_date=None, end_date=None, locality_ids=None):
+        if snapshot_store.enabled:
+            return filter_window(snapshot_store.get('dafor'), start_date, end_date, locality_ids)
+        # Date window and locality filter are applied by MySQL
+        df = read_filtered(DAFOR_QUERY, 'Date', start_date, end_date, locality_ids)
         df.columns = df.columns.str.lower()  # Standardize to lowercase
         if start_date and end_date:
             df['date'] = pd.to_datetime(df['date'])
-            df = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
-        return df
+        return add_transect_products(df)
     
-    def get_dafor_spatial_data(self, start_date=None, end_date=None):
+    @cached_result('locality', 'dafor')
+    def get_dafor_spatial_data(self, start_date=None, end_date=None, radius_m=spatial_dafor.NEIGHBOUR_RADIUS_M):
         """
         Spatialize DAFOR scores along locality boundaries with 100m resolution.
         1. Split each monitoring transect into 100m segments with averaged DAFOR scores
         2. Split locality boundaries into 100m segments
-        3. Overlay monitoring segments onto locality segments and average
+        3. Overlay monitoring segments within `radius_m` meters onto locality segments and average
         
-        Uses caching to improve performance on repeated calls.
+        Results are kept in the shared result cache until the data changes.
         """
-        # Convert dates to strings for cache key
-        cache_key = (str(start_date) if start_date else None, str(end_date) if end_date else None)
-        return self._get_dafor_spatial_data_cached(cache_key)
-    
-    @lru_cache(maxsize=32)
-    def _get_dafor_spatial_data_cached(self, cache_key):
-        """Cached implementation of spatial DAFOR processing"""
-        # Extract dates from cache key
-        start_date = pd.to_datetime(cache_key[0]) if cache_key[0] and cache_key[0] != 'None' else None
-        end_date = pd.to_datetime(cache_key[1]) if cache_key[1] and cache_key[1] != 'None' else None
-        import numpy as np
-        from scipy.spatial import cKDTree
-        
-        # Get locality data with coordinates
-        df_locality = self.get_locality_data()
-        
-        # Get DAFOR data
-        df_dafor = self.get_dafor_data(start_date, end_date)
-        print(f"[DAFOR SPATIAL] Processing {len(df_dafor)} DAFOR records...")
+        # Steps 1-2: monitoring segments, 100m locality grid and their neighbour pairs,
+        # built once per data version and radius
+        overlay = self.get_spatial_overlay(float(radius_m))
         
-        # Step 1: Process each monitoring transect into 20m segments
-        monitoring_segments = []
-        
-        for _, row in df_dafor.iterrows():
-            try:
-                coords = json.loads(row['dafor_coords'])
-                dafor_values = [pd.to_numeric(i, errors='coerce') for i in str(row['dafor_value']).split(',')]
-                dafor_values = [v for v in dafor_values if not pd.isna(v)]
-                
-                if not coords or len(coords) < 2 or not dafor_values:
-                    continue
-                
-                # Calculate cumulative distances
-                cumulative_dist = [0]
-                for i in range(len(coords) - 1):
-                    dist = geodesic(coords[i], coords[i+1]).meters
-                    cumulative_dist.append(cumulative_dist[-1] + dist)
-                
-                total_length = cumulative_dist[-1]
-                if total_length == 0:
-                    continue
-                
-                # Create 100m segments along this transect
-                num_segments = max(1, int(total_length / 100))
-                segment_length = total_length / num_segments
-                values_per_segment = max(1, len(dafor_values) // num_segments)
-                
-                for seg_idx in range(num_segments):
-                    start_dist = seg_idx * segment_length
-                    end_dist = min((seg_idx + 1) * segment_length, total_length)
-                    
-                    # Get DAFOR values for this segment
-                    start_val_idx = seg_idx * values_per_segment
-                    end_val_idx = min((seg_idx + 1) * values_per_segment, len(dafor_values))
-                    segment_dafor_values = dafor_values[start_val_idx:end_val_idx]
-                    
-                    if not segment_dafor_values:
-                        continue
-                    
-                    # Use weighted average - weight by number of observations (effort)
-                    avg_dafor = np.mean(segment_dafor_values)
-                    effort = len(segment_dafor_values)  # number of minutes
-                    
-                    # Get midpoint coordinates
-                    mid_dist = (start_dist + end_dist) / 2
-                    mid_point = self._interpolate_point_on_line(coords, cumulative_dist, mid_dist)
-                    
-                    if mid_point:
-                        monitoring_segments.append({
-                            'locality_id': row['locality_id'],
-                            'lat': mid_point[0],
-                            'lon': mid_point[1],
-                            'dafor_score': avg_dafor,
-                            'effort': effort  # track effort for weighting
-                        })
-            
-            except Exception as e:
-                print(f"[DAFOR SPATIAL] Error processing transect: {e}")
-                continue
-        
-        print(f"[DAFOR SPATIAL] Created {len(monitoring_segments)} 100m monitoring segments")
-        
-        # Step 2: Process each locality into 100m segments and overlay monitoring data
-        locality_segments = []
-        
-        for _, loc_row in df_locality.iterrows():
-            try:
-                coords = json.loads(loc_row['coords_local'])
-                if not coords or len(coords) < 2:
-                    continue
-                
-                # Get monitoring segments for this locality
-                loc_monitoring = [s for s in monitoring_segments if s['locality_id'] == loc_row['locality_id']]
-                
-                if not loc_monitoring:
-                    continue
-                
-                # Build KDTree for fast spatial lookup
-                monitoring_coords = np.array([[s['lat'], s['lon']] for s in loc_monitoring])
-                monitoring_scores = np.array([s['dafor_score'] for s in loc_monitoring])
-                monitoring_efforts = np.array([s['effort'] for s in loc_monitoring])
-                tree = cKDTree(monitoring_coords)
-                
-                # Calculate cumulative distances along locality boundary
-                cumulative_dist = [0]
-                for i in range(len(coords) - 1):
-                    dist = geodesic(coords[i], coords[i+1]).meters
-                    cumulative_dist.append(cumulative_dist[-1] + dist)
-                
-                total_length = cumulative_dist[-1]
-                if total_length == 0:
-                    continue
-                
-                # Create 100m segments along locality boundary
-                num_segments = max(1, int(total_length / 100))
-                
-                for seg_idx in range(num_segments):
-                    start_dist = seg_idx * 100
-                    end_dist = min((seg_idx + 1) * 100, total_length)
-                    
-                    # Get start and end points
-                    start_point = self._interpolate_point_on_line(coords, cumulative_dist, start_dist)
-                    end_point = self._interpolate_point_on_line(coords, cumulative_dist, end_dist)
-                    
-                    if not start_point or not end_point:
-                        continue
-                    
-                    # Find nearby monitoring segments (within 50m radius)
-                    mid_point = [(start_point[0] + end_point[0]) / 2, (start_point[1] + end_point[1]) / 2]
-                    
-                    # Query nearby points (0.0005 degrees ≈ 50m)
-                    indices = tree.query_ball_point(mid_point, r=0.0005)
-                    
-                    # Calculate DAFOR score (keep all segments, even with 0)
-                    if indices:
-                        # Use WEIGHTED AVERAGE - weight by effort (number of minutes)
-                        nearby_scores = monitoring_scores[indices]
-                        nearby_efforts = monitoring_efforts[indices]
-                        
-                        # Weighted average: Σ(score × effort) / Σ(effort)
-                        total_effort = np.sum(nearby_efforts)
-                        if total_effort > 0:
-                            weighted_score = np.sum(nearby_scores * nearby_efforts) / total_effort
-                        else:
-                            weighted_score = np.mean(nearby_scores)
-                    else:
-                        # No monitoring data nearby - assign 0 (absent)
-                        weighted_score = 0.0
-                    
-                    # Keep all segments regardless of score
-                    locality_segments.append({
-                        'locality_id': loc_row['locality_id'],
-                        'name': loc_row['name'],
-                        'start_lat': start_point[0],
-                        'start_lon': start_point[1],
-                        'end_lat': end_point[0],
-                        'end_lon': end_point[1],
-                        'dafor_score': weighted_score
-                    })
-            
-            except Exception as e:
-                print(f"[DAFOR SPATIAL] Error processing locality {loc_row.get('name')}: {e}")
-                continue
+        # Step 3: Effort-weighted average of the nearby monitoring segments in the window (0 when none)
+        locality_segments = overlay.frame(
+            pd.to_datetime(start_date) if start_date else None,
+            pd.to_datetime(end_date) if end_date else None,
+        )
         
         print(f"[DAFOR SPATIAL] Created {len(locality_segments)} locality segments")
-        return pd.DataFrame(locality_segments)
+        return locality_segments
+
+    def get_monitoring_index(self):
+        """
+        Metric KD-tree over the 100m monitoring segments of all transects
+        (see services/spatial_dafor.py), rebuilt only when the dafor snapshot changes.
+        """
+        return derived('monitoring_index', ('dafor',), lambda: spatial_dafor.MonitoringIndex(
+            spatial_dafor.monitoring_arrays(self.get_dafor_data())))
+
+    def get_locality_grid(self):
+        """
+        100m segments of every locality boundary (ids, endpoints, midpoints),
+        rebuilt only when the locality snapshot changes.
+        """
+        return derived('locality_grid', ('locality',),
+                       lambda: spatial_dafor.segment_localities(self.get_locality_data()))
+
+    def get_spatial_overlay(self, radius_m=spatial_dafor.NEIGHBOUR_RADIUS_M):
+        """Neighbour pairs between the locality grid and the monitoring segments within `radius_m`."""
+        return derived(f'spatial_overlay:{float(radius_m)}', ('locality', 'dafor'),
+                       lambda: spatial_dafor.SpatialOverlay(self.get_locality_grid(), self.get_monitoring_index(), radius_m))
     
     def _interpolate_point_on_line(self, coords, cumulative_dist, target_dist):
         """
         Interpolate a point at a specific distance along a polyline.
         Returns [lat, lon] at the target distance.
         """
-        # Find which segment the target distance falls in
-        for i in range(len(cumulative_dist) - 1):
-            if cumulative_dist[i] <= target_dist <= cumulative_dist[i+1]:
-                # Interpolate within this segment
-                seg_start_dist = cumulative_dist[i]
-                seg_end_dist = cumulative_dist[i+1]
-                seg_length = seg_end_dist - seg_start_dist
-                
-                if seg_length == 0:
-                    return coords[i]
-                
-                # How far along this segment?
-                fraction = (target_dist - seg_start_dist) / seg_length
-                
-                # Interpolate coordinates
-                start_lat, start_lon = coords[i]
-                end_lat, end_lon = coords[i+1]
-                
-                interp_lat = start_lat + (end_lat - start_lat) * fraction
-                interp_lon = start_lon + (end_lon - start_lon) * fraction
-                
-                return [interp_lat, interp_lon]
-        
-        # If target_dist is beyond the line, return the last point
-        return coords[-1]
+        return interpolate_point_on_line(coords, cumulative_dist, target_dist)
+
+    def _interpolate_points_on_line(self, coords, cumulative_dist, target_dists):
+        """
+        Interpolate points at an array of distances along a polyline.
+        Returns an (N, 2) array of [lat, lon].
+        """
+        return interpolate_points_on_line(coords, cumulative_dist, target_dists)
 
     def calculate_locality_length(self, coords_local):
         """Calculate the length of a locality based on its coordinates."""        
-
-        try:
-            coords = json.loads(coords_local)
-            if not coords or len(coords) < 2:
-                return 0
-            return sum(
-                geodesic(coords[i], coords[i+1]).meters
-                for i in range(len(coords)-1)
-            )
-        except Exception:
-            return 0
+        return line_length_m(coords_local)
 
     def calculate_dafor_length(self, dafor_coords):
         """Calculate the length (in meters) of a DAFOR line from its coordinates."""
-        try:
-            coords = json.loads(dafor_coords)
-            if not coords or len(coords) < 2:
-                return 0
-            return sum(
-                geodesic(coords[i], coords[i+1]).meters
-                for i in range(len(coords)-1)
-            )
-        except Exception:
-            return 0
+        return line_length_m(dafor_coords)
 
-    def get_dpue_by_locality(self, start_date=None, end_date=None):
-        """Calculate DPUE (Detections Per Unit Effort) by locality within a date range."""        
+    def get_dafor_minute_store(self):
+        """
+        Columnar minute-level DAFOR store (see services/dafor_store.py),
+        rebuilt only when the dafor snapshot changes.
+        """
+        return derived('minute_store', ('dafor',), lambda: DaforMinuteStore.from_frame(self.get_dafor_data()))
 
+    def get_indicator_cube(self):
+        """
+        Monthly per-locality indicator totals (see services/indicator_cube.py),
+        rebuilt from the minute store only when the dafor snapshot changes.
+        """
+        return derived('indicator_cube', ('dafor',), lambda: IndicatorCube(self.get_dafor_minute_store()))
+
+    @cached_result('locality', 'dafor')
+    def compute_effort_indicators(self, start_date=None, end_date=None, locality_ids=None):
+        """
+        Effort-based indicators of every locality with transects in the window,
+        from one pass over the monthly indicator cube.
+            Ndetec: minutes with coral-sol detected (score > 0)
+            Nmin: monitored minutes; Nhoras = Nmin / 60
+            weight_sum: sum of the RAI-W weights of the minute scores
+            Uni100m: locality boundary length in units of 100m
+            DPUE = Ndetec / (Nhoras × Uni100m)
+            RAIW = weight_sum / (Nhoras × Uni100m)
+        `locality_ids` restricts the rows to those localities (None keeps all).
+        Returns:
+            pandas.DataFrame: columns ['locality_id', 'name', 'Ndetec', 'Nmin', 'Nhoras',
+            'weight_sum', 'Uni100m', 'DPUE', 'RAIW'].
+        """
         # Fetch data
         df_locality = self.get_locality_data()
-        df_dafor = self.get_dafor_data(start_date, end_date)
+        cube = self.get_indicator_cube()
 
-        # Calculate locality length
-        df_locality['locality_length_m'] = df_locality['coords_local'].apply(self.calculate_locality_length)
-        df_locality['Uni100m'] = df_locality['locality_length_m'] / 100
+        # Locality length (m), measured once per line by the length cache
+        df_locality['Uni100m'] = df_locality['length_m'] / 100
 
-        # Process dafor_value
-        df_dafor['dafor_value'] = df_dafor['dafor_value'].apply(
-            lambda x: [pd.to_numeric(i, errors='coerce') for i in str(x).split(',')]
-        )
-        df_dafor = df_dafor.explode('dafor_value')
-        df_dafor['dafor_value'] = pd.to_numeric(df_dafor['dafor_value'], errors='coerce')
-
-        # Group by locality
-        grouped = df_dafor.groupby('locality_id')
-        df_dpue = grouped.agg(
-            Ndetec=('dafor_value', lambda x: (x > 0).sum()),
-            Nmin=('dafor_value', 'count')
-        ).reset_index()
-        df_dpue['Nhoras'] = df_dpue['Nmin'] / 60
+        # Detections, weights and minutes by locality from the monthly indicator cube
+        df = cube.locality_totals(start_date, end_date, locality_ids)[['locality_id', 'Ndetec', 'Nmin', 'weight_sum']]
+        df['Nhoras'] = df['Nmin'] / 60
 
         # Merge with locality data
-        df_dpue = df_dpue.merge(df_locality[['locality_id', 'name', 'Uni100m']], left_on='locality_id', right_on='locality_id', how='left')
-        df_dpue['DPUE'] = df_dpue['Ndetec'] / (df_dpue['Nhoras'] * df_dpue['Uni100m'])
+        df = df.merge(df_locality[['locality_id', 'name', 'Uni100m']], on='locality_id', how='left')
+        effort = df['Nhoras'] * df['Uni100m']
+        df['DPUE'] = df['Ndetec'] / effort
+        df['RAIW'] = df['weight_sum'] / effort
+
+        return df[['locality_id', 'name', 'Ndetec', 'Nmin', 'Nhoras', 'weight_sum', 'Uni100m', 'DPUE', 'RAIW']]
 
-        return df_dpue
+    def get_dpue_by_locality(self, start_date=None, end_date=None):
+        """Calculate DPUE (Detections Per Unit Effort) by locality within a date range."""
+        df = self.compute_effort_indicators(start_date, end_date)
+        return df[['locality_id', 'Ndetec', 'Nmin', 'Nhoras', 'name', 'Uni100m', 'DPUE']]
     
     def get_raiw_by_locality(self, start_date=None, end_date=None):
         """
         Calculate RAI-W (Relative Abundance Index - Weighted) by locality within a date range.
         RAI-W = sum_i w(s_i) / (N_hours × Uni100m)
         Where weights are: w(10)=1.00, w(8)=0.8, w(6)=0.6, w(4)=0.10, w(2)=0.04, w(0)=0
+        (see RAIW_WEIGHTS in services/dafor_store.py)
         """
-        # Define weight mapping
-        weight_map = {
-            10: 1.00,
-            8: 0.80,
-            6: 0.60,
-            4: 0.10,
-            2: 0.04,
-            0: 0.00
-        }
-        
-        # Fetch data
-        df_locality = self.get_locality_data()
-        df_dafor = self.get_dafor_data(start_date, end_date)
-        
-        # Calculate locality length
-        df_locality['locality_length_m'] = df_locality['coords_local'].apply(self.calculate_locality_length)
-        df_locality['Uni100m'] = df_locality['locality_length_m'] / 100
-        
-        # Process dafor_value - split comma-separated values and explode
-        df_dafor['dafor_value'] = df_dafor['dafor_value'].apply(
-            lambda x: [pd.to_numeric(i, errors='coerce') for i in str(x).split(',')]
-        )
-        df_dafor = df_dafor.explode('dafor_value')
-        df_dafor['dafor_value'] = pd.to_numeric(df_dafor['dafor_value'], errors='coerce')
-        
-        # Apply weight mapping
-        df_dafor['weight'] = df_dafor['dafor_value'].map(weight_map).fillna(0)
-        
-        # Group by locality and sum weights
-        grouped = df_dafor.groupby('locality_id')
-        df_raiw = grouped.agg(
-            weight_sum=('weight', 'sum'),
-            Nmin=('dafor_value', 'count')
-        ).reset_index()
-        df_raiw['Nhoras'] = df_raiw['Nmin'] / 60
-        
-        # Merge with locality data
-        df_raiw = df_raiw.merge(
-            df_locality[['locality_id', 'name', 'Uni100m']], 
-            left_on='locality_id', 
-            right_on='locality_id', 
-            how='left'
-        )
-        
-        # Calculate RAI-W
-        df_raiw['RAIW'] = df_raiw['weight_sum'] / (df_raiw['Nhoras'] * df_raiw['Uni100m'])
-        
-        return df_raiw
+        df = self.compute_effort_indicators(start_date, end_date)
+        return df[['locality_id', 'weight_sum', 'Nmin', 'Nhoras', 'name', 'Uni100m', 'RAIW']]
     
-    def get_dafor_value_histogram_data(self, start_date=None, end_date=None):
+    @cached_result('dafor')
+    def get_dafor_value_histogram_data(self, start_date=None, end_date=None, locality_ids=None):
         """
         Prepares DAFOR values for histogram plotting (density of values in the DAFOR scale 1-10).
         Args:
             start_date (str or datetime, optional): The start date for filtering the data. Defaults to None.
             end_date (str or datetime, optional): The end date for filtering the data. Defaults to None.
+            locality_ids (list, optional): Only include transects of these localities. Defaults to None.
         Returns:
-            pandas.Series: A Series of all DAFOR values (flattened, numeric, NaNs dropped).
+            pandas.Series: A Series of all DAFOR values (flattened, numeric, invalid scores dropped).
         """
-        df_dafor = self.get_dafor_data(start_date, end_date)
-        # Split and flatten dafor_value column
-        df_dafor['dafor_value'] = df_dafor['dafor_value'].apply(
-            lambda x: [pd.to_numeric(i, errors='coerce') for i in str(x).split(',')]
-        )
-        values = pd.to_numeric(pd.Series([v for sublist in df_dafor['dafor_value'] for v in sublist]), errors='coerce')
-        values = values.dropna()
-        # Optionally filter to 1-10 range
-        values = values[(values >= 0) & (values <= 10)]
-        return values
+        store = self.get_dafor_minute_store()
+        mask = store.transect_mask(start_date, end_date, locality_ids)
+        return pd.Series(store.minute_values(mask), dtype=float)
 
+    def get_dafor_parse_errors(self):
+        """
+        DAFOR records whose dafor_value held tokens that are not DAFOR scores.
+        Returns:
+            pandas.DataFrame: columns ['dafor_id', 'locality_id', 'date', 'dafor_value', 'reason'].
+        """
+        df = self.get_dafor_data()
+        df = df[df['dafor_error'].notna()]
+        return df[['dafor_id', 'locality_id', 'date', 'dafor_value', 'dafor_error']].rename(
+            columns={'dafor_error': 'reason'}
+        ).reset_index(drop=True)
 
+
+    @cached_result('locality', 'dafor')
     def get_sum_of_dafor_by_locality(self, start_date=None, end_date=None):
         """
         Calculates the sum of DAFOR values by locality and date within an optional date range.
@@ -385,17 +528,12 @@ class CoralDataService:
         """
         # Fetch locality and DAFOR data
         df_locality = self.get_locality_data()
-        df_dafor_sum = self.get_dafor_data(start_date, end_date)
-        
-        df_dafor_sum['dafor_value'] = df_dafor_sum['dafor_value'].apply(
-            lambda x: [pd.to_numeric(i, errors='coerce') for i in str(x).split(',')]
-        )
-        df_dafor_sum = df_dafor_sum.explode('dafor_value')
-        df_dafor_sum['dafor_value'] = pd.to_numeric(df_dafor_sum['dafor_value'], errors='coerce')
+        store = self.get_dafor_minute_store()
+        df_dafor_sum = store.transect_frame(store.transect_mask(start_date, end_date))
 
         # Group by locality and date
         df_dafor_sum = df_dafor_sum.groupby(['locality_id', 'date']).agg(
-            DAFOR=('dafor_value', 'sum')
+            DAFOR=('dafor_sum', 'sum')
         ).reset_index()
 
         # Merge with locality data
@@ -407,20 +545,16 @@ class CoralDataService:
         return df_dafor_sum[['locality_id', 'name', 'date', 'DAFOR']]
     
 
-    def get_occurrences_data(self, start_date=None, end_date=None):
+    def get_occurrences_data(self, start_date=None, end_date=None, locality_ids=None):
         """
         Fetches occurrence data related to the Coral-Sol project, including locality names.
         """
-        query = "SELECT Locality_id, Occurrence_id, Spot_Coords, Date, Depth, Access, Geomorphology, Subaquatica_photo, Superficie_photo FROM data_coralsol_occurrence"
-        df = pd.read_sql(query, db.engine)
-        df.columns = df.columns.str.lower()  # Standardize to lowercase
-
-        df['date'] = pd.to_datetime(df['date'], dayfirst=True)
-
-        if start_date and end_date:
-            df_occ = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
+        if snapshot_store.enabled:
+            df_occ = filter_window(snapshot_store.get('occurrence'), start_date, end_date, locality_ids)
         else:
-            df_occ = df
+            df_occ = read_filtered(OCCURRENCE_QUERY, 'Date', start_date, end_date, locality_ids)
+            df_occ.columns = df_occ.columns.str.lower()  # Standardize to lowercase
+            df_occ['date'] = pd.to_datetime(df_occ['date'], dayfirst=True)
 
         # Merge with locality names
         df_locality = self.get_locality_data()[['locality_id', 'name']]
@@ -439,30 +573,30 @@ class CoralDataService:
         # Reorder columns to include 'name' after 'locality_id'
         return df_occ[['locality_id', 'name', 'occurrence_id', 'spot_coords', 'date', 'depth', 'access', 'geomorphology', 'subaquatica_photo', 'superficie_photo']]
     
-    def get_management_data(self, start_date=None, end_date=None):
+    def get_management_data(self, start_date=None, end_date=None, locality_ids=None):
         """
         Fetches management data .
         Returns:
             pandas.DataFrame: A DataFrame containing management data.
         """
-        query = "SELECT management_id, Locality_id, Management_coords, Date, Observer, Depth, Number_of_divers, Number_of_cylinders, Method, Managed_mass_kg, Observation, occurrences_managed FROM data_coralsol_management"
-        df = pd.read_sql(query, db.engine)
-        df.columns = df.columns.str.lower()
-
-        df['date'] = pd.to_datetime(df['date'], dayfirst=True)
-
-        if start_date and end_date:
-            df = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
+        if snapshot_store.enabled:
+            df = filter_window(snapshot_store.get('management'), start_date, end_date, locality_ids)
+        else:
+            df = read_filtered(MANAGEMENT_QUERY, 'Date', start_date, end_date, locality_ids)
+            df.columns = df.columns.str.lower()
+            df['date'] = pd.to_datetime(df['date'], dayfirst=True)
 
         return df[['management_id', 'locality_id', 'management_coords', 'date', 'observer', 'depth', 'number_of_divers', 'number_of_cylinders', 'method', 'managed_mass_kg', 'observation', 'occurrences_managed']]
 
-    def get_days_since_last_management(self, start_date=None, end_date=None):
-        query = "SELECT Locality_id, Date, Observation FROM data_coralsol_management"
-        df = pd.read_sql(query, db.engine)
-        df.columns = df.columns.str.lower()
-        df['date'] = pd.to_datetime(df['date'])
-        if start_date and end_date:
-            df = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
+    def get_days_since_last_management(self, start_date=None, end_date=None, locality_ids=None):
+        if snapshot_store.enabled:
+            df = filter_window(snapshot_store.get('management'), start_date, end_date, locality_ids)
+            df = df[['locality_id', 'date', 'observation']]
+        else:
+            query = "SELECT Locality_id, Date, Observation FROM data_coralsol_management"
+            df = read_filtered(query, 'Date', start_date, end_date, locality_ids)
+            df.columns = df.columns.str.lower()
+            df['date'] = pd.to_datetime(df['date'])
         # Get the last management row per locality (includes observation)
         df_sorted = df.sort_values('date')
         last_dates = df_sorted.groupby('locality_id').tail(1).reset_index(drop=True)
@@ -491,23 +625,25 @@ class CoralDataService:
         last_dates['days_since'] = (today - last_dates['date']).dt.days
         return last_dates
     
+    @cached_result('dafor')
     def get_km_monitored(self, start_date=None, end_date=None):
         """Sum the lengths of all DAFOR lines (in kilometers) for the given date range."""
         df_dafor = self.get_dafor_data(start_date, end_date)
-        df_dafor['length_m'] = df_dafor['dafor_coords'].apply(self.calculate_dafor_length)
+        # length_m is computed once per transect at ingestion
         total_km = df_dafor['length_m'].sum() / 1000  # convert meters to kilometers
         return total_km
     
+    @cached_result('locality', 'dafor')
     def get_monitoring_events_by_locality(self, start_date=None, end_date=None):
         """
         Count the number of monitoring events (transects) per locality.
         Returns a DataFrame with locality_id, name, and event_count.
         """
-        df_dafor = self.get_dafor_data(start_date, end_date)
         df_locality = self.get_locality_data()
         
         # Count events per locality
-        event_counts = df_dafor.groupby('locality_id').size().reset_index(name='event_count')
+        event_counts = self.get_indicator_cube().locality_totals(start_date, end_date)[['locality_id', 'n_transects']]
+        event_counts = event_counts.rename(columns={'n_transects': 'event_count'})
         
         # Merge with locality data to get names and coordinates
         result = event_counts.merge(
@@ -518,6 +654,7 @@ class CoralDataService:
         
         return result
     
+    @cached_result('dafor')
     def get_transect_coordinates_for_density(self, start_date=None, end_date=None):
         """
         Extract all transect coordinates for kernel density estimation.
@@ -526,54 +663,28 @@ class CoralDataService:
         """
         df_dafor = self.get_dafor_data(start_date, end_date)
         
-        # Parse coordinates and interpolate along line segments
-        points = []
-        for _, row in df_dafor.iterrows():
-            try:
-                coords = json.loads(row['dafor_coords'])
-                if coords and isinstance(coords, list) and len(coords) >= 2:
-                    # Interpolate points along each line segment
-                    for i in range(len(coords) - 1):
-                        if isinstance(coords[i], list) and isinstance(coords[i+1], list):
-                            start_lat, start_lon = coords[i]
-                            end_lat, end_lon = coords[i+1]
-                            
-                            # Calculate distance between points
-                            try:
-                                distance_m = geodesic((start_lat, start_lon), (end_lat, end_lon)).meters
-                                
-                                # Create interpolated points every 5 meters along the segment
-                                num_points = max(2, int(distance_m / 5))
-                                
-                                for j in range(num_points):
-                                    fraction = j / (num_points - 1) if num_points > 1 else 0
-                                    interp_lat = start_lat + (end_lat - start_lat) * fraction
-                                    interp_lon = start_lon + (end_lon - start_lon) * fraction
-                                    
-                                    points.append({
-                                        'latitude': interp_lat,
-                                        'longitude': interp_lon,
-                                        'locality_id': row['locality_id'],
-                                        'date': row['date']
-                                    })
-                            except Exception:
-                                # If distance calculation fails, just use endpoints
-                                points.append({
-                                    'latitude': start_lat,
-                                    'longitude': start_lon,
-                                    'locality_id': row['locality_id'],
-                                    'date': row['date']
-                                })
-                                points.append({
-                                    'latitude': end_lat,
-                                    'longitude': end_lon,
-                                    'locality_id': row['locality_id'],
-                                    'date': row['date']
-                                })
-            except Exception:
+        # Interpolate points every 5 meters along each line segment of each transect
+        point_arrays = []
+        rows = []
+        for row_idx, coords_json in enumerate(df_dafor['dafor_coords']):
+            coords = parse_line(coords_json)
+            if coords is None:
                 continue
+            point_arrays.append(resample_every(coords, 5))
+            rows.append(np.full(len(point_arrays[-1]), row_idx))
         
-        return pd.DataFrame(points)
+        if not point_arrays:
+            return pd.DataFrame()
+        points = np.concatenate(point_arrays)
+        rows = np.concatenate(rows)
+        return pd.DataFrame({
+            'latitude': points[:, 0],
+            'longitude': points[:, 1],
+            'locality_id': df_dafor['locality_id'].to_numpy()[rows],
+            'date': df_dafor['date'].to_numpy()[rows],
+        })
+
+    @cached_result('dafor')
     def get_transect_lines_for_density(self, start_date=None, end_date=None):
         """
         Extract transect lines (not interpolated points) for line-based density visualization.
@@ -0,0 +1,47 @@
+"""
+Resolution of the dashboard's time-range control into a canonical date window.
+
+Relative ranges ("Último ano", 6 and 3 months) used to end at datetime.now(),
+so every request asked for a different window and nothing keyed on dates
+(the result cache, the SQL filters) could be shared. Windows are snapped to
+whole days instead: they start at midnight and end at the last instant of
+their end day, so every request made during the same day resolves to the same
+(start, end) pair.
+"""
+
+import pandas as pd
+
+# Length in days of the relative ranges offered by the time-range dropdown
+RELATIVE_RANGES = {'1year': 365, '6months': 182, '3months': 91}
+
+END_OF_DAY = pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+
+
+def day_window(start_date, end_date):
+    """(midnight of start_date, last microsecond of end_date) as Timestamps."""
+    return pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize() + END_OF_DAY
+
+
+def resolve_date_window(time_range, custom_start=None, custom_end=None, fallback='all', today=None):
+    """
+    Canonical (start, end) window for a time-range dropdown value.
+
+    Args:
+        time_range: 'all', 'custom' or one of RELATIVE_RANGES.
+        custom_start, custom_end: the date picker values, used for 'custom'.
+        fallback: time range used for any other value.
+        today: reference day of relative ranges (defaults to the current day).
+    Returns:
+        (start, end) Timestamps covering whole days, or (None, None) for the
+        whole database (also when a custom bound is missing).
+    """
+    if time_range not in RELATIVE_RANGES and time_range not in ('all', 'custom'):
+        time_range = fallback
+    if time_range == 'custom':
+        if not (custom_start and custom_end):
+            return None, None
+        return day_window(custom_start, custom_end)
+    if time_range in RELATIVE_RANGES:
+        end = pd.Timestamp(today if today is not None else pd.Timestamp.now()).normalize()
+        return day_window(end - pd.Timedelta(days=RELATIVE_RANGES[time_range]), end)
+    return None, None
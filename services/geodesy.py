@@ -0,0 +1,178 @@
+"""
+Vectorised distances on the WGS84 ellipsoid for short polylines.
+
+Each segment is measured on the plane tangent to the ellipsoid at its mean
+latitude, using the meridional (M) and prime-vertical (N) radii of curvature
+there. Measured against geopy.distance.geodesic (Karney) at the REBIO
+latitude (~27 S) with `error_bound_vs_geopy`, over 10k random segments:
+  up to 5 km:  max error 0.07 mm (1.4e-8 relative)
+  up to 50 km: max error 67 mm (1.3e-6 relative)
+Vertex spacing in the locality and transect lines is far below 5 km.
+
+Polylines are handled as (n, 2) float arrays of [lat, lon]. `to_local_xy`
+gives a local equirectangular projection in meters around the REBIO centroid
+for code that needs planar coordinates (e.g. neighbour searches).
+"""
+
+import json
+
+import numpy as np
+
+# WGS84
+_A = 6378137.0
+_F = 1 / 298.257223563
+_E2 = _F * (2 - _F)
+
+# Approximate centroid of the REBIO Arvoredo monitoring area
+REBIO_CENTROID = (-27.28, -48.39)
+
+
+def radii_of_curvature(lat_deg):
+    """Meridional (M) and prime-vertical (N) radii of curvature, in meters, at `lat_deg`."""
+    sin_lat = np.sin(np.radians(lat_deg))
+    w = np.sqrt(1 - _E2 * sin_lat ** 2)
+    return _A * (1 - _E2) / w ** 3, _A / w
+
+
+def segment_lengths(lat, lon):
+    """Lengths (m) of the segments between consecutive [lat, lon] vertices (len n - 1)."""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    if len(lat) < 2:
+        return np.zeros(0)
+    mean_lat = (lat[:-1] + lat[1:]) / 2
+    m, n = radii_of_curvature(mean_lat)
+    dy = m * np.radians(np.diff(lat))
+    dx = n * np.cos(np.radians(mean_lat)) * np.radians(np.diff(lon))
+    return np.hypot(dx, dy)
+
+
+def parse_line(coords_json):
+    """(n, 2) float array from a JSON [[lat, lon], ...] string, or None if it is not a polyline."""
+    try:
+        coords = np.asarray(json.loads(coords_json), dtype=np.float64)
+    except Exception:
+        return None
+    if coords.ndim != 2 or coords.shape[1] != 2 or len(coords) < 2:
+        return None
+    return coords
+
+
+def cumulative_length(coords):
+    """Distance (m) from the first vertex to every vertex of an (n, 2) polyline (len n, starts at 0)."""
+    coords = np.asarray(coords, dtype=np.float64)
+    return np.concatenate(([0.0], np.cumsum(segment_lengths(coords[:, 0], coords[:, 1]))))
+
+
+def interpolate_at_distances(coords, cumdist, targets):
+    """
+    Points at the distances `targets` (m) along an (n, 2) polyline whose
+    cumulative vertex distances are `cumdist`, as an (N, 2) array.
+    A target on a vertex returns that vertex; on a zero-length segment the
+    segment start is returned; targets beyond the end return the last vertex.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    cumdist = np.asarray(cumdist, dtype=np.float64)
+    targets = np.atleast_1d(np.asarray(targets, dtype=np.float64))
+    # Segment i spans cumdist[i]..cumdist[i+1]; pick the first one containing the target
+    idx = np.clip(np.searchsorted(cumdist, targets, side='left') - 1, 0, len(coords) - 2)
+    seg_start = cumdist[idx]
+    seg_length = cumdist[idx + 1] - seg_start
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(seg_length > 0, (targets - seg_start) / seg_length, 0.0)
+    points = coords[idx] + (coords[idx + 1] - coords[idx]) * fraction[:, None]
+    points[targets > cumdist[-1]] = coords[-1]
+    return points
+
+
+def resample_every(coords, step_m):
+    """
+    Densify an (n, 2) polyline segment by segment: each segment is replaced by
+    max(2, int(length / step_m)) evenly spaced points including both of its
+    endpoints (so inner vertices appear twice). Returns an (N, 2) array.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    lengths = segment_lengths(coords[:, 0], coords[:, 1])
+    counts = np.maximum(2, (lengths / step_m).astype(np.int64))
+    segment = np.repeat(np.arange(len(lengths)), counts)
+    # Position of each point inside its segment: 0, 1, ..., count - 1
+    first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    position = np.arange(counts.sum()) - np.repeat(first, counts)
+    fraction = position / (counts[segment] - 1)
+    return coords[segment] + (coords[segment + 1] - coords[segment]) * fraction[:, None]
+
+
+def to_local_xy(lat, lon, origin=REBIO_CENTROID):
+    """Project lat/lon (degrees) to x (east) / y (north) meters on the plane tangent at `origin`."""
+    m, n = radii_of_curvature(origin[0])
+    x = n * np.cos(np.radians(origin[0])) * np.radians(np.asarray(lon, dtype=np.float64) - origin[1])
+    y = m * np.radians(np.asarray(lat, dtype=np.float64) - origin[0])
+    return x, y
+
+
+def from_local_xy(x, y, origin=REBIO_CENTROID):
+    """Inverse of `to_local_xy`: (lat, lon) in degrees."""
+    m, n = radii_of_curvature(origin[0])
+    lat = origin[0] + np.degrees(np.asarray(y, dtype=np.float64) / m)
+    lon = origin[1] + np.degrees(np.asarray(x, dtype=np.float64) / (n * np.cos(np.radians(origin[0]))))
+    return lat, lon
+
+
+def polyline_length(coords):
+    """Total length (m) of a [[lat, lon], ...] polyline."""
+    coords = np.asarray(coords, dtype=np.float64)
+    if coords.ndim != 2 or len(coords) < 2:
+        return 0.0
+    return float(segment_lengths(coords[:, 0], coords[:, 1]).sum())
+
+
+def polyline_length_json(coords_json):
+    """Length (m) of a JSON [[lat, lon], ...] polyline; 0 if it cannot be parsed."""
+    coords = parse_line(coords_json)
+    return 0 if coords is None else polyline_length(coords)
+
+
+def polyline_lengths_json(coords_jsons):
+    """
+    Lengths (m) of many JSON polylines (0 for those that cannot be parsed).
+    All vertices are measured in one segment_lengths call; the segments
+    joining consecutive polylines are dropped and the rest summed per line.
+    """
+    lines = [parse_line(c) for c in coords_jsons]
+    lengths = np.zeros(len(lines))
+    valid = np.array([i for i, line in enumerate(lines) if line is not None], dtype=np.int64)
+    if len(valid) == 0:
+        return lengths
+    points = np.concatenate([lines[i] for i in valid])
+    counts = np.array([len(lines[i]) for i in valid])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    segments = segment_lengths(points[:, 0], points[:, 1])
+    segments[starts[1:] - 1] = 0.0
+    lengths[valid] = np.add.reduceat(segments, starts)
+    return lengths
+
+
+def error_bound_vs_geopy(lat=-27.28, lon=-48.39, n=10_000, max_length_m=5_000, seed=0):
+    """
+    Largest absolute (m) and relative difference between segment_lengths and
+    geopy's geodesic over `n` random segments of up to `max_length_m` around
+    (lat, lon). Needs geopy.
+    """
+    from geopy.distance import geodesic
+
+    rng = np.random.default_rng(seed)
+    bearing = rng.uniform(0, 2 * np.pi, n)
+    length = rng.uniform(1, max_length_m, n)
+    m, n_radius = radii_of_curvature(lat)
+    lat2 = lat + np.degrees(length * np.cos(bearing) / m)
+    lon2 = lon + np.degrees(length * np.sin(bearing) / (n_radius * np.cos(np.radians(lat))))
+    ours = segment_lengths(np.column_stack([np.full(n, lat), lat2]).ravel(),
+                           np.column_stack([np.full(n, lon), lon2]).ravel())[::2]
+    reference = np.array([geodesic((lat, lon), (a, b)).meters for a, b in zip(lat2, lon2)])
+    diff = np.abs(ours - reference)
+    return diff.max(), (diff / reference).max()
+
+
+if __name__ == "__main__":
+    abs_err, rel_err = error_bound_vs_geopy()
+    print(f"max abs error {abs_err * 1000:.3f} mm, max relative error {rel_err:.2e}")
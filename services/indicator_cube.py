@@ -0,0 +1,86 @@
+"""
+Monthly pre-aggregated DAFOR indicators per locality.
+
+Built from the per-transect totals of a DaforMinuteStore, the cube holds for
+every (locality_id, year_month) the detections (Ndetec), scored minutes
+(Nmin), RAI-W weight sum, DAFOR sum, minute counts per DAFOR class and the
+number of transects. Window totals per locality come from month prefix sums
+(services/month_cube.py), so indicator latency does not grow with the number
+of years of monitoring, and charts by month or year read the cells directly.
+"""
+
+import numpy as np
+import pandas as pd
+
+from services.dafor_parser import DAFOR_CLASSES
+from services.month_cube import MonthCube
+
+CLASS_COLUMNS = [f'class_{score}' for score in DAFOR_CLASSES]
+QUANTITIES = ['Ndetec', 'Nmin', 'weight_sum', 'dafor_sum', 'n_transects'] + CLASS_COLUMNS
+
+
+class IndicatorCube:
+    def __init__(self, store):
+        self.localities, code = np.unique(store.locality_id, return_inverse=True)
+        values = {
+            'Ndetec': store.n_detections,
+            'Nmin': store.n_minutes,
+            'weight_sum': store.weight_sum,
+            'dafor_sum': store.dafor_sum,
+            'n_transects': np.ones(len(store)),
+        }
+        for col, name in enumerate(CLASS_COLUMNS):
+            values[name] = store.class_counts[:, col]
+        dated = ~np.isnat(store.date)
+        self.cube = MonthCube(code[dated], store.date[dated],
+                              {name: np.asarray(v, dtype=np.float64)[dated] for name, v in values.items()},
+                              n_rows=len(self.localities))
+        # Transects without a date only count when no window is applied
+        self._undated = {name: np.bincount(code[~dated], weights=np.asarray(v, dtype=np.float64)[~dated],
+                                           minlength=len(self.localities))
+                         for name, v in values.items()}
+
+    def locality_totals(self, start_date=None, end_date=None, locality_ids=None):
+        """
+        One row per locality with transects in the inclusive window, with the
+        columns locality_id and QUANTITIES (counts as integers).
+        """
+        sums = self.cube.window_sums(start_date, end_date)
+        if not (start_date and end_date):
+            sums = {name: sums[name] + self._undated[name] for name in QUANTITIES}
+        df = pd.DataFrame({'locality_id': self.localities})
+        for name in QUANTITIES:
+            df[name] = sums[name]
+        df = self._as_counts(df)
+        keep = df['n_transects'] > 0
+        if locality_ids:
+            keep &= df['locality_id'].isin([int(i) for i in locality_ids])
+        return df[keep].reset_index(drop=True)
+
+    def monthly_frame(self, locality_ids=None):
+        """
+        Long frame with one row per (locality_id, year_month) holding transects:
+        locality_id, year_month (first day of the month) and QUANTITIES.
+        `locality_ids` restricts it to a group of localities (None keeps all;
+        an empty group gives an empty frame).
+        """
+        months = self.cube.months()
+        n_rows, n_months = len(self.localities), len(months)
+        df = pd.DataFrame({
+            'locality_id': np.repeat(self.localities, n_months),
+            'year_month': np.tile(months.astype('datetime64[ns]'), n_rows),
+        })
+        for name in QUANTITIES:
+            df[name] = self.cube.monthly(name).ravel() if n_months else np.zeros(0)
+        df = self._as_counts(df)
+        keep = df['n_transects'] > 0
+        if locality_ids is not None:
+            keep &= df['locality_id'].isin([int(i) for i in locality_ids])
+        return df[keep].reset_index(drop=True)
+
+    @staticmethod
+    def _as_counts(df):
+        # Prefix sums are floats; counts are whole numbers
+        for name in ['Ndetec', 'Nmin', 'n_transects'] + CLASS_COLUMNS:
+            df[name] = np.rint(df[name]).astype(np.int64)
+        return df
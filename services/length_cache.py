@@ -0,0 +1,89 @@
+"""
+Persisted table of polyline lengths.
+
+Lengths are stored per (table, id) together with a hash of the coordinates
+they were computed from, so a line is measured once and only measured again
+when its coordinates are edited. Misses are computed in one vectorised batch
+(geodesy.polyline_lengths_json) and the table is written back to a JSON file, so the
+lengths survive restarts and are shared by every worker reading the same file.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from services.geodesy import polyline_lengths_json
+
+
+def coords_hash(coords_json):
+    """Stable hash of a coordinates string (Python's hash() is salted per process)."""
+    return hashlib.sha1(str(coords_json).encode('utf-8')).hexdigest()[:16]
+
+
+class GeodesicLengthCache:
+    def __init__(self, path=None):
+        """`path` is the JSON file backing the cache; None or '' keeps it in memory only."""
+        self.path = path or None
+        self._table = None     # table -> {str(id): [coords_hash, length_m]}
+        self._lock = threading.Lock()
+
+    def lengths(self, table, ids, coords):
+        """
+        Lengths (m) of the polylines `coords` (JSON strings) whose primary keys in
+        `table` are `ids`, as a float array. Unknown or edited lines are measured
+        and persisted.
+        """
+        ids = [str(i) for i in ids]
+        coords = list(coords)
+        hashes = [coords_hash(c) for c in coords]
+        result = np.empty(len(ids))
+        with self._lock:
+            entries = self._entries().setdefault(table, {})
+            missing = []
+            for pos, (key, digest) in enumerate(zip(ids, hashes)):
+                cached = entries.get(key)
+                if cached is not None and cached[0] == digest:
+                    result[pos] = cached[1]
+                else:
+                    missing.append(pos)
+            if missing:
+                result[missing] = polyline_lengths_json([coords[pos] for pos in missing])
+                for pos in missing:
+                    entries[ids[pos]] = [hashes[pos], float(result[pos])]
+                print(f"[LENGTH CACHE] Measured {len(missing)} {table} line(s)")
+                self._save()
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._table = {}
+            self._save()
+
+    def _entries(self):
+        if self._table is None:
+            self._table = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path) as f:
+                        self._table = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"[LENGTH CACHE] Ignoring unreadable cache {self.path}: {e}")
+        return self._table
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._table, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[LENGTH CACHE] Could not write {self.path}: {e}")
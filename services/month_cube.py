@@ -0,0 +1,102 @@
+"""
+Per-(row, month) totals with prefix sums along the month axis.
+
+A MonthCube is built once from dated contributions (a row index, a date and
+one value per quantity). The sums of any date window are then a difference of
+two prefix slices for the calendar months the window covers completely, plus
+the raw contributions of the (at most two) partially covered edge months, so
+the answer is exact for windows that start or end mid-month.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class MonthCube:
+    def __init__(self, rows, dates, values, n_rows):
+        """
+        Args:
+            rows: int array, the row each contribution is added to (0..n_rows-1).
+            dates: datetime64 array, the date of each contribution (no NaT; callers
+                keep undated contributions aside, see IndicatorCube).
+            values: dict of quantity name -> float array, one value per contribution.
+            n_rows: number of rows of the cube.
+        """
+        self.n_rows = n_rows
+        self.names = list(values)
+        dates = np.asarray(dates, dtype='datetime64[ns]')
+        rows = np.asarray(rows, dtype=np.int64)
+        if np.isnat(dates).any():
+            raise ValueError("MonthCube contributions need a date (got NaT)")
+        if len(dates) == 0:
+            self.first_month = None
+            self.n_months = 0
+            self.prefix = {name: np.zeros((n_rows, 1)) for name in self.names}
+            return
+
+        month = dates.astype('datetime64[M]')
+        self.first_month = month.min()
+        month_idx = (month - self.first_month).astype(np.int64)
+        self.n_months = int(month_idx.max()) + 1
+
+        # Raw contributions sorted by month, for the partially covered edge months
+        order = np.argsort(month_idx, kind='stable')
+        self._rows = rows[order]
+        self._dates = dates[order]
+        self._values = {name: np.asarray(v, dtype=np.float64)[order] for name, v in values.items()}
+        self._month_bounds = np.searchsorted(month_idx[order], np.arange(self.n_months + 1))
+
+        # prefix[name][:, m] = total of months 0..m-1
+        cell = rows * self.n_months + month_idx
+        self.prefix = {}
+        for name, v in values.items():
+            cube = np.bincount(cell, weights=v, minlength=n_rows * self.n_months).reshape(n_rows, self.n_months)
+            self.prefix[name] = np.concatenate([np.zeros((n_rows, 1)), np.cumsum(cube, axis=1)], axis=1)
+
+    def window_sums(self, start_date=None, end_date=None):
+        """
+        Totals per row of every quantity over the inclusive window
+        [start_date, end_date] (everything when either end is missing).
+        Returns a dict of quantity name -> array of length n_rows.
+        """
+        if not (start_date and end_date) or self.n_months == 0:
+            return {name: prefix[:, -1].copy() for name, prefix in self.prefix.items()}
+
+        start = np.datetime64(pd.to_datetime(start_date), 'ns')
+        end = np.datetime64(pd.to_datetime(end_date), 'ns')
+        start_month = self._month_index(start)
+        end_month = self._month_index(end)
+        # Months fully inside the window: from the first month starting at or after
+        # `start` up to (excluding) the month containing `end`
+        first_full = start_month if self._month_start(start_month) == start else start_month + 1
+
+        lo = min(max(first_full, 0), self.n_months)
+        hi = min(max(end_month, 0), self.n_months)
+        sums = {name: prefix[:, hi] - prefix[:, lo] if hi > lo else np.zeros(self.n_rows)
+                for name, prefix in self.prefix.items()}
+
+        for month in sorted({start_month, end_month}):
+            if first_full <= month < end_month or not 0 <= month < self.n_months:
+                continue
+            a, b = self._month_bounds[month], self._month_bounds[month + 1]
+            inside = (self._dates[a:b] >= start) & (self._dates[a:b] <= end)
+            rows = self._rows[a:b][inside]
+            for name in self.names:
+                sums[name] += np.bincount(rows, weights=self._values[name][a:b][inside], minlength=self.n_rows)
+        return sums
+
+    def months(self):
+        """The calendar months of the cube's columns, as datetime64[M]."""
+        if self.n_months == 0:
+            return np.zeros(0, dtype='datetime64[M]')
+        return self.first_month + np.arange(self.n_months)
+
+    def monthly(self, name):
+        """(n_rows, n_months) totals of quantity `name` per row and month."""
+        return np.diff(self.prefix[name], axis=1)
+
+    def _month_index(self, timestamp):
+        return int((timestamp.astype('datetime64[M]') - self.first_month).astype(np.int64))
+
+    def _month_start(self, month_idx):
+        return (self.first_month + np.timedelta64(month_idx, 'M')).astype('datetime64[ns]')
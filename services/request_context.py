@@ -0,0 +1,163 @@
+"""
+Request-scoped data contexts.
+
+A change of the dashboard controls fires several callbacks at once
+(update_visuals and update_metrics in cs_index.py). They resolve the controls
+into one DashboardFilters value and fetch a DashboardData for it from a
+ContextStore, so the filters are resolved once and every source is loaded once
+per interaction, also when the callbacks run concurrently.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from services.date_window import resolve_date_window
+
+# Canonical dashboard filters: whole-day window and sorted locality ids (None = all)
+DashboardFilters = namedtuple('DashboardFilters', ['start_date', 'end_date', 'locality_ids'])
+
+
+def resolve_locality_ids(selection, groups=None):
+    """
+    Sorted tuple of the locality ids of a locality-dropdown value, or None
+    for all localities (nothing selected, or 0 / "all" among the selection).
+    `groups` maps group values (e.g. "rebiogrp") to their locality ids;
+    values that are neither a group nor an integer are ignored.
+    """
+    selection = selection if isinstance(selection, (list, tuple)) else [selection]
+    if not selection or selection == [None] or 0 in selection:
+        return None
+    groups = groups or {}
+    ids = set()
+    for value in selection:
+        if value in groups:
+            ids.update(groups[value])
+        else:
+            try:
+                ids.add(int(value))
+            except (TypeError, ValueError):
+                pass
+    return tuple(sorted(ids)) or None
+
+
+def resolve_dashboard_filters(selection, time_range, custom_start=None, custom_end=None, groups=None, today=None):
+    """DashboardFilters of the dashboard controls (unknown time ranges fall back to the last year)."""
+    start_date, end_date = resolve_date_window(time_range, custom_start, custom_end, fallback='1year', today=today)
+    return DashboardFilters(start_date, end_date, resolve_locality_ids(selection, groups))
+
+
+class LazyFrames:
+    """
+    Named data sources loaded on first use and kept for the lifetime of the
+    object. Concurrent first uses of the same source wait for a single load.
+    """
+
+    def __init__(self):
+        self._frames = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _load(self, name, load):
+        if name not in self._frames:
+            with self._lock:
+                lock = self._locks.setdefault(name, threading.Lock())
+            with lock:
+                if name not in self._frames:
+                    self._frames[name] = load()
+        return self._frames[name]
+
+
+class DashboardData(LazyFrames):
+    """
+    The data of one set of dashboard filters. Frame accessors return copies
+    restricted to the selected localities, except management, occurrences and
+    the locality table, which the dashboard shows for every locality.
+    """
+
+    def __init__(self, service, filters):
+        super().__init__()
+        self.service = service
+        self.filters = filters
+
+    @property
+    def window(self):
+        return self.filters.start_date, self.filters.end_date
+
+    @property
+    def locality_list(self):
+        return list(self.filters.locality_ids) if self.filters.locality_ids else None
+
+    def _selected(self, name, load):
+        df = self._load(name, load)
+        if self.filters.locality_ids:
+            return df[df['locality_id'].isin(self.filters.locality_ids)].copy()
+        return df.copy()
+
+    def dpue(self):
+        return self._selected('dpue', lambda: self.service.get_dpue_by_locality(*self.window))
+
+    def raiw(self):
+        return self._selected('raiw', lambda: self.service.get_raiw_by_locality(*self.window))
+
+    def dafor_sum(self):
+        return self._selected('dafor_sum', lambda: self.service.get_sum_of_dafor_by_locality(*self.window))
+
+    def dafor_values(self):
+        return self._load('dafor_values', lambda: self.service.get_dafor_value_histogram_data(
+            *self.window, self.locality_list))
+
+    def dafor_spatial(self):
+        return self._selected('dafor_spatial', lambda: self.service.get_dafor_spatial_data(*self.window))
+
+    def days_since_management(self):
+        return self._load('days_since_management', lambda: self.service.get_days_since_last_management(
+            *self.window, self.locality_list)).copy()
+
+    def days_since_monitoring(self):
+        return self._selected('days_since_monitoring', lambda: self.service.get_days_since_last_monitoring(*self.window))
+
+    def monitoring_events(self):
+        return self._selected('monitoring_events', lambda: self.service.get_monitoring_events_by_locality(*self.window))
+
+    def occurrences(self):
+        return self._load('occurrences', lambda: self.service.get_occurrences_data(*self.window)).copy()
+
+    def management(self):
+        return self._load('management', lambda: self.service.get_management_data(*self.window)).copy()
+
+    def localities(self):
+        return self._load('localities', self.service.get_locality_data).copy()
+
+    def km_monitored(self):
+        return self._load('km_monitored', lambda: self.service.get_km_monitored(*self.window))
+
+
+class ContextStore:
+    """
+    Small server-side memo of contexts keyed on their normalised inputs: the
+    `max_entries` most recently used are kept, each for at most `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries=16, ttl_seconds=60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """Context stored under `key`, built by `build()` if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl_seconds:
+                entry = (now, build())
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
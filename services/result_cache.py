@@ -0,0 +1,194 @@
+"""
+Process-wide cache for the results of CoralDataService getters.
+
+Dash callbacks create a new CoralDataService per request, so results are kept
+here rather than on the instance. Entries are keyed on the method, its
+normalised arguments (dates as ISO strings, sequences as tuples, NumPy scalars
+as Python scalars) and the data version of the tables it reads, so a result is
+reused until new data is loaded and never served stale afterwards.
+
+The cache is bounded by an estimated size in bytes (DataFrame.memory_usage with
+deep=True, array nbytes, pickle length otherwise) and evicts the least recently
+used entries first. Each entry can also expire after a TTL. Hits, misses,
+evictions and expirations are counted, globally and per method, for the
+/cache-stats endpoint.
+"""
+
+import datetime
+import functools
+import inspect
+import pickle
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}([ T][\d:.]+)?$')
+
+
+def normalise_argument(value):
+    """
+    Hashable, canonical form of a getter argument, so that equal requests
+    ('2024-01-01' vs Timestamp('2024-01-01'), [1, 2] vs (1, 2)) share an entry.
+    Raises TypeError for values that cannot be part of a key.
+    """
+    if isinstance(value, str) and ISO_DATE.match(value):
+        return pd.Timestamp(value).isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (pd.Timestamp, datetime.date, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(normalise_argument(v) for v in value))
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+        return tuple(normalise_argument(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalise_argument(v)) for k, v in value.items()))
+    hash(value)
+    return value
+
+
+def estimate_size(value):
+    """Approximate memory footprint of a cached result, in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def copy_result(value):
+    """Copy mutable results so callers cannot alter the cached entry."""
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+class ResultCache:
+    def __init__(self, max_bytes=256 * 1024 ** 2, ttl_seconds=0):
+        """
+        Args:
+            max_bytes: size budget of all entries; 0 disables the cache.
+            ttl_seconds: default lifetime of an entry; 0 keeps entries until evicted.
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (value, size, expires_at), oldest first
+        self._bytes = 0
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'rejected': 0}
+        self._by_function = {}         # function name -> {'hits': n, 'misses': n}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def get(self, key):
+        """Return (True, value) for a live entry, (False, None) otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._drop(key)
+                self._counters['expirations'] += 1
+                entry = None
+            self._count(key[0], 'hits' if entry is not None else 'misses')
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def put(self, key, value, ttl_seconds=None):
+        """
+        Store `value` under `key`, evicting least recently used entries to stay
+        within max_bytes. Values larger than the whole budget are not stored.
+        """
+        size = estimate_size(value)
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                self._counters['rejected'] += 1
+                return
+            while self._entries and self._bytes + size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._counters['evictions'] += 1
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Counters, current size and per-function hit/miss counts, JSON-serialisable."""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return dict(
+                self._counters,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                ttl_seconds=self.ttl_seconds,
+                hit_rate=self._counters['hits'] / lookups if lookups else None,
+                functions={name: dict(counts) for name, counts in self._by_function.items()},
+            )
+
+    def cached(self, version=None, ttl_seconds=None):
+        """
+        Decorator caching a method's result under its normalised arguments and
+        `version()`, the data version of what it reads. When `version` returns
+        None the call bypasses the cache (e.g. when snapshots are disabled).
+        Mutable results are copied on the way in and out.
+        """
+        def decorator(func):
+            signature = inspect.signature(func)
+            name = func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                data_version = version() if version is not None else ()
+                if not self.enabled or data_version is None:
+                    return func(*args, **kwargs)
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                try:
+                    # The first argument is the service instance, which is not part of the key
+                    arguments = tuple(normalise_argument(v) for v in list(bound.arguments.values())[1:])
+                    key = (name, arguments, data_version)
+                    hash(key)
+                except TypeError:
+                    return func(*args, **kwargs)
+
+                found, value = self.get(key)
+                if found:
+                    return copy_result(value)
+                value = func(*args, **kwargs)
+                self.put(key, copy_result(value), ttl_seconds)
+                return value
+            return wrapper
+        return decorator
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _count(self, name, counter):
+        counts = self._by_function.setdefault(name, {'hits': 0, 'misses': 0})
+        counts[counter] += 1
+        self._counters[counter] += 1
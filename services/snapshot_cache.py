@@ -0,0 +1,176 @@
+"""
+Process-wide snapshot cache for database tables.
+
+Every CoralDataService instance reads through the same store, so a single
+dashboard interaction no longer triggers one full-table read per callback or
+map builder. Each table is kept as a typed DataFrame for `ttl_seconds`; when
+several threads miss the same table at once, only the first one runs the
+loader and the others wait for its result.
+
+Tables registered with a fingerprint callable (e.g. COUNT(*) and MAX(id)) are
+also checked for changes at most every `poll_seconds`. A snapshot is reloaded
+as soon as its fingerprint changes, and only then does its version number
+move, so anything derived from a table can be keyed on `version()` and stay
+valid until new field data arrives.
+
+Append-only tables can also register an `append` callable. When their
+fingerprint changes it receives the cached frame and the old/new fingerprints
+and returns the grown frame (or None to force a full reload), so only the new
+rows are fetched and processed.
+"""
+
+import threading
+import time
+
+
+class TableSnapshotStore:
+    def __init__(self, ttl_seconds=300, poll_seconds=30):
+        self.ttl_seconds = ttl_seconds
+        self.poll_seconds = poll_seconds
+        self._loaders = {}
+        self._fingerprints = {}
+        self._appenders = {}
+        self._entries = {}     # name -> (DataFrame, loaded_at, fingerprint, checked_at)
+        self._versions = {}    # name -> int, bumped whenever a load brings different data
+        self._in_flight = {}   # name -> threading.Event set when the load finishes
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0
+
+    def register(self, name, loader, fingerprint=None, append=None):
+        """
+        Register the zero-argument callable that loads table `name` from the database.
+        `fingerprint`, if given, is a cheap zero-argument callable whose result
+        changes whenever the table content changes. `append(frame, old_fingerprint,
+        new_fingerprint)`, if given, is tried before a full reload when the
+        fingerprint changes.
+        """
+        self._loaders[name] = loader
+        if fingerprint is not None:
+            self._fingerprints[name] = fingerprint
+        if append is not None:
+            self._appenders[name] = append
+
+    def get(self, name):
+        """
+        Return a copy of the snapshot for `name`, loading it if it is missing, expired
+        or its fingerprint changed. Callers are free to mutate the returned DataFrame.
+        """
+        return self._get_frame(name).copy()
+
+    def version(self, *names):
+        """
+        Return a tuple with the current data version of each table in `names`,
+        refreshing stale snapshots first. Suitable as part of a cache key.
+        """
+        if not self.enabled:
+            # Without snapshots every read goes to the database; never reuse derived results
+            return (time.monotonic(),)
+        for name in names:
+            self._get_frame(name)
+        with self._lock:
+            return tuple(self._versions.get(name, 0) for name in names)
+
+    def fingerprints(self, *names):
+        """
+        Current fingerprint of each table in `names`, read from the database
+        (None for tables without one). Unlike version(), it is comparable across
+        processes, so it can tag results persisted outside this store.
+        """
+        return tuple(self._read_fingerprint(name) for name in names)
+
+    def invalidate(self, name=None):
+        """Drop the snapshot for `name`, or every snapshot when `name` is None."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def _is_fresh(self, name, entry):
+        """Return True if `entry` can be served, polling the fingerprint when due."""
+        frame, loaded_at, fingerprint, checked_at = entry
+        now = time.monotonic()
+        if now - loaded_at >= self.ttl_seconds:
+            return False
+        if name not in self._fingerprints or now - checked_at < self.poll_seconds:
+            return True
+        current = self._read_fingerprint(name)
+        if current is None:
+            return True
+        if current != fingerprint:
+            print(f"[SNAPSHOT] {name} changed ({fingerprint} -> {current})")
+            return False
+        with self._lock:
+            if self._entries.get(name) is entry:
+                self._entries[name] = (frame, loaded_at, fingerprint, now)
+        return True
+
+    def _read_fingerprint(self, name):
+        """Return the current fingerprint of `name`, or None if it has none or the check failed."""
+        if name not in self._fingerprints:
+            return None
+        try:
+            return self._fingerprints[name]()
+        except Exception as e:
+            print(f"[SNAPSHOT] Fingerprint check failed for {name}: {e}")
+            return None
+
+    def _load(self, name):
+        """Run the loader (and fingerprint) for `name` and store the result."""
+        # Take the fingerprint first so rows inserted during the load trigger another reload
+        fingerprint = self._read_fingerprint(name)
+        with self._lock:
+            previous = self._entries.get(name)
+
+        frame = None
+        can_append = (previous is not None and name in self._appenders
+                      and fingerprint is not None and previous[2] is not None
+                      and time.monotonic() - previous[1] < self.ttl_seconds)
+        if can_append:
+            frame = self._appenders[name](previous[0], previous[2], fingerprint)
+        if frame is not None:
+            print(f"[SNAPSHOT] Appended {len(frame) - len(previous[0])} rows to {name}")
+            # Keep the original load time so the TTL still forces a periodic full reload
+            loaded_at = previous[1]
+        else:
+            frame = self._loaders[name]()
+            loaded_at = time.monotonic()
+            print(f"[SNAPSHOT] Loaded {name}: {len(frame)} rows")
+
+        with self._lock:
+            if previous is None or fingerprint is None or previous[2] != fingerprint:
+                self._versions[name] = self._versions.get(name, 0) + 1
+            self._entries[name] = (frame, loaded_at, fingerprint, time.monotonic())
+        return frame
+
+    def _get_frame(self, name):
+        if not self.enabled:
+            return self._loaders[name]()
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(name)
+            if entry is not None and self._is_fresh(name, entry):
+                return entry[0]
+
+            with self._lock:
+                event = self._in_flight.get(name)
+                is_owner = event is None
+                if is_owner:
+                    event = threading.Event()
+                    self._in_flight[name] = event
+
+            if not is_owner:
+                # Another thread is already loading this table; wait and re-check
+                event.wait()
+                continue
+
+            try:
+                return self._load(name)
+            finally:
+                with self._lock:
+                    self._in_flight.pop(name, None)
+                event.set()
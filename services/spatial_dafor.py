@@ -0,0 +1,194 @@
+"""
+Array engine for the spatial DAFOR map.
+
+Locality boundaries are cut into 100 m segments and every segment gets the
+effort-weighted mean score of the monitoring segments (the ~100 m pieces of
+each transect, see data_service.split_transect_segments) of the same
+locality lying near its midpoint. Segments without monitoring nearby score 0;
+localities without any monitoring in the window are left out.
+
+All monitoring segments are kept as NumPy arrays and indexed once in a single
+KD-tree on a local metric plane (geodesy.to_local_xy), so the neighbour radius
+is a true distance in meters. One batched radius query answers every boundary
+segment and neighbours from other localities are dropped.
+
+The boundary grid only depends on locality geometry and the neighbour pairs
+only on the data, so both are built once per data version (SpatialOverlay).
+The pairs are then pre-aggregated into a (grid segment, month) cube with
+prefix sums (services/month_cube.py), so any date window is answered from two
+prefix slices plus the raw pairs of its partial edge months.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from services.geodesy import cumulative_length, interpolate_at_distances, parse_line, to_local_xy
+from services.month_cube import MonthCube
+
+SEGMENT_LENGTH_M = 100
+NEIGHBOUR_RADIUS_M = 50
+
+OUTPUT_COLUMNS = ['locality_id', 'name', 'start_lat', 'start_lon', 'end_lat', 'end_lon', 'dafor_score']
+
+# One row per 100 m locality segment, in locality order then along the boundary
+LocalityGrid = namedtuple('LocalityGrid', ['locality_id', 'name', 'start', 'end', 'mid'])
+
+# One row per monitoring segment, with the locality and date of its transect
+MonitoringSegments = namedtuple('MonitoringSegments', ['locality_id', 'date', 'points', 'score', 'effort'])
+
+
+def segment_localities(df_locality, segment_m=SEGMENT_LENGTH_M):
+    """
+    Cut every locality boundary ('coords_local') into `segment_m` pieces.
+    The last piece of each boundary is shorter; boundaries that cannot be
+    parsed or have zero length are skipped.
+    """
+    ids, names, starts, ends = [], [], [], []
+    for locality_id, name, coords_json in zip(df_locality['locality_id'], df_locality['name'],
+                                              df_locality['coords_local']):
+        coords = parse_line(coords_json)
+        if coords is None:
+            continue
+        cumdist = cumulative_length(coords)
+        total_length = cumdist[-1]
+        if total_length == 0:
+            continue
+        num_segments = max(1, int(total_length / segment_m))
+        start_dists = np.arange(num_segments) * float(segment_m)
+        end_dists = np.minimum(start_dists + segment_m, total_length)
+        starts.append(interpolate_at_distances(coords, cumdist, start_dists))
+        ends.append(interpolate_at_distances(coords, cumdist, end_dists))
+        ids.append(np.full(num_segments, locality_id))
+        names.append(np.full(num_segments, name, dtype=object))
+
+    if not ids:
+        empty = np.zeros((0, 2))
+        return LocalityGrid(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=object), empty, empty, empty)
+    start = np.concatenate(starts)
+    end = np.concatenate(ends)
+    return LocalityGrid(np.concatenate(ids), np.concatenate(names), start, end, (start + end) / 2)
+
+
+def monitoring_arrays(df_dafor):
+    """Flatten the 'monitoring_segments' column of a DAFOR frame into arrays."""
+    segment_lists = df_dafor['monitoring_segments'].tolist()
+    counts = np.fromiter((len(s) for s in segment_lists), dtype=np.int64, count=len(segment_lists))
+    flat = [segment for segments in segment_lists for segment in segments]
+    return MonitoringSegments(
+        locality_id=np.repeat(df_dafor['locality_id'].to_numpy(), counts),
+        date=np.repeat(pd.to_datetime(df_dafor['date']).to_numpy(), counts),
+        points=np.array([[s['lat'], s['lon']] for s in flat], dtype=np.float64).reshape(-1, 2),
+        score=np.array([s['dafor_score'] for s in flat], dtype=np.float64),
+        effort=np.array([s['effort'] for s in flat], dtype=np.float64),
+    )
+
+
+class MonitoringIndex:
+    """
+    KD-tree over all monitoring segments, in meters on the local plane around
+    the REBIO centroid. Built once per DAFOR data version and shared by every
+    date window.
+    """
+
+    def __init__(self, monitoring):
+        self.monitoring = monitoring
+        x, y = to_local_xy(monitoring.points[:, 0], monitoring.points[:, 1])
+        self.tree = cKDTree(np.column_stack([x, y])) if len(x) else None
+
+    def neighbour_pairs(self, grid, radius_m=NEIGHBOUR_RADIUS_M):
+        """
+        (grid segment index, monitoring index) pairs for every monitoring segment
+        of the same locality within `radius_m` of a grid segment midpoint.
+        """
+        if self.tree is None or len(grid.locality_id) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        x, y = to_local_xy(grid.mid[:, 0], grid.mid[:, 1])
+        neighbours = self.tree.query_ball_point(np.column_stack([x, y]), r=radius_m)
+        lengths = np.fromiter((len(n) for n in neighbours), dtype=np.int64, count=len(neighbours))
+        if lengths.sum() == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        seg_idx = np.repeat(np.arange(len(neighbours)), lengths)
+        mon_idx = np.concatenate([n for n in neighbours if n]).astype(np.int64)
+        keep = self.monitoring.locality_id[mon_idx] == grid.locality_id[seg_idx]
+        return seg_idx[keep], mon_idx[keep]
+
+
+def weighted_scores(weighted, total_effort, score_sum, count):
+    """
+    Effort-weighted mean score per grid segment from its neighbour totals:
+    sum(score * effort) / sum(effort), the plain mean when the neighbours carry
+    no effort and 0 without neighbours.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(total_effort > 0, weighted / total_effort,
+                          np.where(count > 0, score_sum / count, 0.0))
+    return result
+
+
+class SpatialOverlay:
+    """
+    Fixed (grid segment, monitoring segment) neighbour pairs for one locality
+    grid, one monitoring index and one radius, pre-aggregated by month so any
+    date window can be scored without touching the pairs again.
+    """
+
+    def __init__(self, grid, index, radius_m=NEIGHBOUR_RADIUS_M):
+        self.grid = grid
+        self.index = index
+        self.radius_m = radius_m
+        monitoring = index.monitoring
+        seg_idx, mon_idx = index.neighbour_pairs(grid, radius_m)
+        score = monitoring.score[mon_idx]
+        effort = monitoring.effort[mon_idx]
+        pair_values = {
+            'weighted': score * effort,
+            'effort': effort,
+            'score': score,
+            'count': np.ones(len(mon_idx)),
+        }
+        n_segments = len(grid.locality_id)
+        # (grid segment, month) -> neighbour totals
+        dated = ~np.isnat(monitoring.date[mon_idx])
+        self.segment_cube = MonthCube(seg_idx[dated], monitoring.date[mon_idx][dated],
+                                      {name: v[dated] for name, v in pair_values.items()}, n_rows=n_segments)
+        # (locality, month) -> number of monitoring segments, to tell which localities were monitored
+        self.localities, locality_code = np.unique(monitoring.locality_id, return_inverse=True)
+        monitoring_dated = ~np.isnat(monitoring.date)
+        self.locality_cube = MonthCube(locality_code[monitoring_dated], monitoring.date[monitoring_dated],
+                                       {'count': np.ones(int(monitoring_dated.sum()))}, n_rows=len(self.localities))
+        # Segments of transects without a date only count when no window is applied
+        self._undated_segment = {name: np.bincount(seg_idx[~dated], weights=v[~dated], minlength=n_segments)
+                                 for name, v in pair_values.items()}
+        self._undated_locality = np.bincount(locality_code[~monitoring_dated], minlength=len(self.localities))
+
+    def frame(self, start_date=None, end_date=None):
+        """
+        Score every grid segment of the localities monitored in the window;
+        returns a frame with OUTPUT_COLUMNS.
+        """
+        grid = self.grid
+        totals = self.segment_cube.window_sums(start_date, end_date)
+        locality_counts = self.locality_cube.window_sums(start_date, end_date)['count']
+        if not (start_date and end_date):
+            totals = {name: totals[name] + self._undated_segment[name] for name in totals}
+            locality_counts = locality_counts + self._undated_locality
+        scores = weighted_scores(totals['weighted'], totals['effort'], totals['score'], totals['count'])
+        monitored = self.localities[locality_counts > 0]
+        keep = np.isin(grid.locality_id, monitored)
+        return pd.DataFrame({
+            'locality_id': grid.locality_id[keep],
+            'name': grid.name[keep],
+            'start_lat': grid.start[keep, 0],
+            'start_lon': grid.start[keep, 1],
+            'end_lat': grid.end[keep, 0],
+            'end_lon': grid.end[keep, 1],
+            'dafor_score': scores[keep],
+        }, columns=OUTPUT_COLUMNS)
+
+
+def spatial_dafor_frame(grid, index, start_date=None, end_date=None, radius_m=NEIGHBOUR_RADIUS_M):
+    """One-off scoring of a date window (see SpatialOverlay to reuse the neighbour pairs)."""
+    return SpatialOverlay(grid, index, radius_m).frame(start_date, end_date)
@@ -0,0 +1,45 @@
+"""
+SQL WHERE clause for the dashboard's date window and locality filter.
+
+The Date columns of the field tables are not guaranteed to be SQL dates:
+occurrence and management dates are stored as DD/MM/YYYY text (which is why
+the loaders parse them with dayfirst=True), and comparing such text with
+BETWEEN would order it as a string and silently return the wrong rows. The
+clause therefore compares sql_date(column), which reads DD/MM/YYYY text with
+STR_TO_DATE and falls back to CAST(... AS DATE) for columns (or values) that
+are already dates or ISO strings.
+"""
+
+import pandas as pd
+
+# MySQL format of the day-first dates stored as text
+DAYFIRST_FORMAT = '%d/%m/%Y'
+
+
+def sql_date(column):
+    """MySQL expression giving the date of `column`, whether it holds DD/MM/YYYY text or a date."""
+    return f"COALESCE(STR_TO_DATE({column}, '{DAYFIRST_FORMAT}'), CAST({column} AS DATE))"
+
+
+def build_window_filter(date_column, start_date=None, end_date=None, locality_ids=None, locality_column='Locality_id'):
+    """
+    Build a SQL WHERE clause and its bound parameters for a date window and an
+    optional list of locality IDs.
+
+    The date window is only applied when both ends are given, matching the
+    behaviour of the pandas filters it replaces (inclusive on both ends), and
+    compares whole days of sql_date(date_column): the end bound is inclusive
+    of its day. Returns a tuple (where_sql, params); where_sql is an empty
+    string when there is nothing to filter.
+    """
+    conditions = []
+    params = {}
+    if start_date and end_date:
+        conditions.append(f"{sql_date(date_column)} BETWEEN :start_date AND :end_date")
+        params['start_date'] = pd.to_datetime(start_date).to_pydatetime()
+        params['end_date'] = pd.to_datetime(end_date).to_pydatetime()
+    if locality_ids:
+        conditions.append(f"{locality_column} IN :locality_ids")
+        params['locality_ids'] = [int(i) for i in locality_ids]
+    where_sql = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where_sql, params
@@ -0,0 +1,23 @@
+import matplotlib
+import matplotlib.colors
+import numpy as np
+
+from cs_colors import COLORMAPS, color_for, colors_for
+
+
+def matplotlib_color(value, vmin, vmax, cmap_name):
+    norm = (value - vmin) / (vmax - vmin) if vmax > vmin else 0
+    return matplotlib.colors.rgb2hex(matplotlib.colormaps[cmap_name](norm))
+
+
+def test_lookup_matches_matplotlib():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.uniform(-2, 12, 500), [0, 10, 5, np.nan]])
+    for cmap_name in COLORMAPS:
+        expected = [matplotlib_color(v, 0, 10, cmap_name) for v in values]
+        assert colors_for(values, 0, 10, cmap_name).tolist() == expected
+
+
+def test_constant_range_and_scalar():
+    assert color_for(3.0, 3.0, 3.0, 'plasma') == matplotlib_color(3.0, 3.0, 3.0, 'plasma')
+    assert colors_for([], 0, 1).tolist() == []
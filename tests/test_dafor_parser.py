@@ -0,0 +1,33 @@
+import numpy as np
+
+from services.dafor_parser import parse_dafor_column
+
+
+def test_valid_scores_are_packed_in_csr_order():
+    parsed = parse_dafor_column([1, 2, 3], ['0,2,4', '10', '6, 8'])
+    assert parsed.values.dtype == np.int8
+    assert parsed.values.tolist() == [0, 2, 4, 10, 6, 8]
+    assert parsed.offsets.tolist() == [0, 3, 4, 6]
+    assert parsed.bad_records.empty
+
+
+def test_invalid_tokens_are_dropped_and_reported():
+    parsed = parse_dafor_column(
+        [10, 11, 12, 13, 14],
+        ['2,x,4', None, '2.5,6', '3', '8,'],
+    )
+    assert parsed.values.tolist() == [2, 4, 6, 8]
+    assert parsed.offsets.tolist() == [0, 2, 2, 3, 3, 4]
+    reasons = dict(zip(parsed.bad_records['dafor_id'], parsed.bad_records['reason']))
+    assert set(reasons) == {10, 11, 12, 13, 14}
+    assert reasons[10] == "non-numeric minute score 'x'"
+    assert reasons[11] == 'empty minute score'
+    assert reasons[12] == "non-integer minute score '2.5'"
+    assert reasons[13].startswith('score 3 is not on the DAFOR scale')
+    assert reasons[14] == 'empty minute score'
+
+
+def test_empty_column():
+    parsed = parse_dafor_column([], [])
+    assert len(parsed.values) == 0
+    assert parsed.offsets.tolist() == [0]
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from services.date_window import resolve_date_window
+
+
+def test_relative_ranges_snap_to_whole_days():
+    morning = resolve_date_window('1year', today=pd.Timestamp('2026-10-17 08:03:12.5'))
+    evening = resolve_date_window('1year', today=pd.Timestamp('2026-10-17 22:41:00'))
+    assert morning == evening
+    assert morning[0] == pd.Timestamp('2025-10-17')
+    assert morning[1] == pd.Timestamp('2026-10-17 23:59:59.999999')
+    assert resolve_date_window('3months', today='2026-10-17')[0] == pd.Timestamp('2026-07-18')
+
+
+def test_custom_all_and_fallback():
+    assert resolve_date_window('custom', '2024-01-01', '2024-01-31') == (
+        pd.Timestamp('2024-01-01'), pd.Timestamp('2024-01-31 23:59:59.999999'))
+    assert resolve_date_window('custom', '2024-01-01', None) == (None, None)
+    assert resolve_date_window('all') == (None, None)
+    assert resolve_date_window(None) == (None, None)
+    assert resolve_date_window(None, fallback='6months', today='2026-10-17')[0] == pd.Timestamp('2026-04-18')
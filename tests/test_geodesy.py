@@ -0,0 +1,45 @@
+import json
+
+import numpy as np
+from geopy.distance import geodesic
+
+from services.geodesy import (
+    cumulative_length, from_local_xy, interpolate_at_distances, polyline_length_json,
+    polyline_lengths_json, resample_every, segment_lengths, to_local_xy,
+)
+
+LINE = np.array([[-27.28, -48.39], [-27.2805, -48.3905], [-27.2805, -48.3905], [-27.281, -48.392]])
+
+
+def test_segment_lengths_match_geopy():
+    expected = [geodesic(LINE[i], LINE[i + 1]).meters for i in range(len(LINE) - 1)]
+    np.testing.assert_allclose(segment_lengths(LINE[:, 0], LINE[:, 1]), expected, rtol=1e-7, atol=1e-9)
+
+
+def test_interpolate_at_distances_edges():
+    cumdist = cumulative_length(LINE)
+    points = interpolate_at_distances(LINE, cumdist, [0, cumdist[1], cumdist[-1] + 10])
+    np.testing.assert_allclose(points, [LINE[0], LINE[1], LINE[-1]])
+
+    midpoint = interpolate_at_distances(LINE, cumdist, [cumdist[1] / 2])[0]
+    np.testing.assert_allclose(midpoint, (LINE[0] + LINE[1]) / 2)
+
+
+def test_resample_every_keeps_segment_endpoints():
+    points = resample_every(LINE[:2], 5)
+    n_expected = max(2, int(segment_lengths(LINE[:2, 0], LINE[:2, 1])[0] / 5))
+    assert len(points) == n_expected
+    np.testing.assert_allclose(points[[0, -1]], LINE[:2])
+
+
+def test_local_projection_round_trip():
+    x, y = to_local_xy(LINE[:, 0], LINE[:, 1])
+    lat, lon = from_local_xy(x, y)
+    np.testing.assert_allclose(np.column_stack([lat, lon]), LINE)
+
+
+def test_batched_lengths_match_single_lines():
+    lines = [json.dumps(LINE.tolist()), '[]', json.dumps((LINE[::-1] + 0.01).tolist()), 'x',
+             json.dumps(LINE[:2].tolist())]
+    np.testing.assert_allclose(polyline_lengths_json(lines), [polyline_length_json(c) for c in lines], rtol=1e-12)
+    assert len(polyline_lengths_json([])) == 0
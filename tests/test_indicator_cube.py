@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from services.dafor_parser import DAFOR_CLASSES
+from services.dafor_store import DaforMinuteStore
+from services.indicator_cube import IndicatorCube
+
+
+def synthetic_store(n_transects=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'dafor_id': np.arange(1, n_transects + 1),
+        'locality_id': rng.integers(1, 9, n_transects),
+        'date': pd.Timestamp('2021-01-01') + pd.to_timedelta(rng.integers(0, 1200, n_transects), unit='D'),
+        'dafor_value': [','.join(map(str, rng.choice(DAFOR_CLASSES, rng.integers(0, 15))))
+                        for _ in range(n_transects)],
+    })
+    return DaforMinuteStore.from_frame(df)
+
+
+def test_locality_totals_match_store():
+    store = synthetic_store()
+    cube = IndicatorCube(store)
+    for start, end in [(None, None), ('2021-03-15 12:00', '2022-07-20'), ('2022-01-01', '2022-01-31')]:
+        expected = store.locality_totals(store.transect_mask(start, end))
+        result = cube.locality_totals(start, end)
+        pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+
+
+def test_monthly_frame_sums_to_totals():
+    store = synthetic_store()
+    monthly = IndicatorCube(store).monthly_frame(locality_ids=[1, 2])
+    in_group = np.isin(store.locality_id, [1, 2])
+    assert monthly['n_transects'].sum() == in_group.sum()
+    assert monthly['class_10'].sum() == store.class_counts[in_group, -1].sum()
+    assert IndicatorCube(store).monthly_frame(locality_ids=[]).empty
+
+
+def test_store_from_parsed_minutes_matches_parsing():
+    store = synthetic_store()
+    df = pd.DataFrame({
+        'dafor_id': store.dafor_id, 'locality_id': store.locality_id, 'date': store.date,
+        'dafor_minutes': [store.values[a:b].tolist() for a, b in zip(store.offsets[:-1], store.offsets[1:])],
+    })
+    packed = DaforMinuteStore.from_frame(df)
+    np.testing.assert_array_equal(packed.values, store.values)
+    np.testing.assert_array_equal(packed.offsets, store.offsets)
+    np.testing.assert_array_equal(packed.class_counts, store.class_counts)
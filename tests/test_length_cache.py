@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+
+from services import length_cache
+from services.geodesy import polyline_length_json
+from services.length_cache import GeodesicLengthCache
+
+LINES = [
+    json.dumps([[-27.28, -48.39], [-27.281, -48.391], [-27.283, -48.39]]),
+    json.dumps([[-27.3, -48.4], [-27.3, -48.41]]),
+    'not a line',
+]
+
+
+def counting(monkeypatch):
+    measured = []
+    batch = length_cache.polyline_lengths_json
+
+    def measure(coords):
+        measured.append(len(coords))
+        return batch(coords)
+    monkeypatch.setattr(length_cache, 'polyline_lengths_json', measure)
+    return measured
+
+
+def test_hits_misses_and_coordinate_edits(monkeypatch):
+    measured = counting(monkeypatch)
+    cache = GeodesicLengthCache()
+    first = cache.lengths('dafor', [1, 2, 3], LINES)
+    np.testing.assert_allclose(first, [polyline_length_json(c) for c in LINES])
+    assert first[2] == 0
+
+    np.testing.assert_array_equal(cache.lengths('dafor', [3, 1, 2], LINES[2:] + LINES[:2]), first[[2, 0, 1]])
+    assert measured == [3]
+
+    # Editing line 2 only measures that line again; other tables do not share ids
+    edited = json.dumps([[-27.3, -48.4], [-27.3, -48.42]])
+    second = cache.lengths('dafor', [1, 2], [LINES[0], edited])
+    assert second[1] > first[1]
+    cache.lengths('locality', [1], [LINES[0]])
+    assert measured == [3, 1, 1]
+
+
+def test_json_round_trip(tmp_path, monkeypatch):
+    path = tmp_path / 'lengths.json'
+    first = GeodesicLengthCache(str(path)).lengths('dafor', [1, 2], LINES[:2])
+    assert set(json.loads(path.read_text())['dafor']) == {'1', '2'}
+
+    measured = counting(monkeypatch)
+    reloaded = GeodesicLengthCache(str(path)).lengths('dafor', [1, 2], LINES[:2])
+    np.testing.assert_array_equal(reloaded, first)
+    assert measured == []
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.month_cube import MonthCube
+
+
+def brute_force(rows, dates, values, n_rows, start, end):
+    inside = np.ones(len(dates), dtype=bool)
+    if start and end:
+        inside = (dates >= np.datetime64(start, 'ns')) & (dates <= np.datetime64(end, 'ns'))
+    return np.bincount(rows[inside], weights=values[inside], minlength=n_rows)
+
+
+def test_window_sums_match_brute_force():
+    rng = np.random.default_rng(0)
+    n = 2000
+    rows = rng.integers(0, 7, n)
+    dates = (np.datetime64('2021-01-01', 'ns')
+             + rng.integers(0, 1500, n).astype('timedelta64[D]').astype('timedelta64[ns]'))
+    values = rng.uniform(0, 10, n)
+    cube = MonthCube(rows, dates, {'v': values, 'count': np.ones(n)}, n_rows=7)
+
+    windows = [
+        (None, None),
+        (pd.Timestamp('2022-03-15 12:00'), pd.Timestamp('2023-07-20 12:00')),
+        (pd.Timestamp('2022-03-01'), pd.Timestamp('2022-05-01')),
+        (pd.Timestamp('2022-03-01'), pd.Timestamp('2022-03-31')),
+        (pd.Timestamp('2022-06-10'), pd.Timestamp('2022-06-12')),
+        (pd.Timestamp('2019-01-01'), pd.Timestamp('2030-01-01')),
+        (pd.Timestamp('2019-01-01'), pd.Timestamp('2019-06-01')),
+    ]
+    for _ in range(30):
+        a, b = np.sort(rng.integers(-100, 1700, 2))
+        windows.append((pd.Timestamp('2021-01-01') + pd.Timedelta(days=int(a)),
+                        pd.Timestamp('2021-01-01') + pd.Timedelta(days=int(b), hours=int(rng.integers(0, 24)))))
+
+    for start, end in windows:
+        sums = cube.window_sums(start, end)
+        np.testing.assert_allclose(sums['v'], brute_force(rows, dates, values, 7, start, end), rtol=1e-9, atol=1e-9)
+        np.testing.assert_array_equal(sums['count'], brute_force(rows, dates, np.ones(n), 7, start, end))
+
+
+def test_empty_cube():
+    cube = MonthCube(np.zeros(0, dtype=int), np.zeros(0, dtype='datetime64[ns]'), {'v': np.zeros(0)}, n_rows=3)
+    assert cube.window_sums('2022-01-01', '2022-12-31')['v'].tolist() == [0, 0, 0]
+    assert cube.window_sums()['v'].tolist() == [0, 0, 0]
+
+
+def test_undated_contributions_are_rejected():
+    dates = np.array(['2024-01-05', 'NaT'], dtype='datetime64[ns]')
+    with pytest.raises(ValueError):
+        MonthCube(np.array([0, 0]), dates, {'v': np.ones(2)}, n_rows=1)
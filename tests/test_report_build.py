@@ -0,0 +1,83 @@
+import json
+import threading
+
+import plotly.graph_objects as go
+import pytest
+
+try:
+    import cs_report_build
+    from cs_report import UNAVAILABLE_MESSAGE, placeholder_figure
+except (ValueError, ConnectionError):
+    # cs_report connects to the database on import (config/database.py)
+    pytest.skip("no database configured", allow_module_level=True)
+
+PLACEHOLDER = placeholder_figure(UNAVAILABLE_MESSAGE).to_json()
+
+
+def chart(title):
+    return lambda ctx: go.Figure(layout=dict(title=title))
+
+
+def failing_chart(ctx):
+    raise ValueError("boom")
+
+
+@pytest.fixture
+def release():
+    # Lets the stuck builders return once the test is done
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture
+def charts(monkeypatch, release):
+    def stuck_chart(ctx):
+        release.wait(10)
+        return go.Figure()
+
+    stubs = {
+        'stuck': stuck_chart,
+        'a': chart('a'),
+        'fails': failing_chart,
+        'b': chart('b'),
+        'c': chart('c'),
+    }
+    monkeypatch.setattr(cs_report_build, 'REPORT_CHARTS', stubs)
+    return stubs
+
+
+def assert_built(build, graph_ids):
+    for graph_id in graph_ids:
+        assert json.loads(build.figures[graph_id])['layout']['title']['text'] == graph_id
+        assert graph_id in build.timings
+
+
+def test_serial_build_replaces_failed_charts(charts):
+    charts['stuck'] = chart('stuck')
+    build = cs_report_build.build_report_figures('serial', ctx=object())
+    assert list(build.figures) == list(charts)
+    assert_built(build, ['stuck', 'a', 'b', 'c'])
+    assert build.figures['fails'] == PLACEHOLDER
+    assert build.failed == {'fails': 'boom'}
+
+    report = build.report()
+    assert report.splitlines()[0].startswith("[REPORT BUILD] 4/5 charts in")
+    assert "(serial, 1 workers" in report
+    assert "fails" in report and "failed: boom" in report
+
+
+def test_thread_build_times_out_stuck_charts(charts):
+    build = cs_report_build.build_report_figures('thread', workers=2, timeout=0.2, ctx=object())
+    assert list(build.figures) == list(charts)
+    assert_built(build, ['a', 'b', 'c'])
+    assert build.figures['stuck'] == build.figures['fails'] == PLACEHOLDER
+    assert build.failed == {'stuck': 'timed out after 0.2s', 'fails': 'boom'}
+    assert "failed: timed out after 0.2s" in build.report()
+
+
+def test_thread_build_moves_on_when_every_worker_is_stuck(charts):
+    build = cs_report_build.build_report_figures('thread', workers=1, timeout=0.2, ctx=object())
+    assert_built(build, ['a', 'b', 'c'])
+    assert set(build.failed) == {'stuck', 'fails'}
+    assert build.elapsed < 5
@@ -0,0 +1,99 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.dafor_parser import DAFOR_CLASSES
+from services.dafor_store import DaforMinuteStore
+from services.indicator_cube import IndicatorCube
+
+try:
+    from cs_report import REPORT_CHARTS, ReportContext, compute_report_summary
+except (ValueError, ConnectionError):
+    # cs_report connects to the database on import (config/database.py)
+    pytest.skip("no database configured", allow_module_level=True)
+
+
+class CountingService:
+    """Small full-history data set that counts the loads of each source."""
+
+    def __init__(self, n_transects=60, seed=0):
+        rng = np.random.default_rng(seed)
+        self.loads = Counter()
+        self.names = {i: f"Loc {i}" for i in range(1, 5)}
+        self.dafor = pd.DataFrame({
+            'dafor_id': np.arange(1, n_transects + 1),
+            'locality_id': rng.integers(1, 5, n_transects),
+            'date': pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 900, n_transects), unit='D'),
+            'dafor_value': [','.join(map(str, rng.choice(DAFOR_CLASSES, rng.integers(1, 12))))
+                            for _ in range(n_transects)],
+        })
+
+    def _count(self, source):
+        self.loads[source] += 1
+
+    def _per_locality(self, column, values):
+        return pd.DataFrame({'locality_id': list(self.names), 'name': list(self.names.values()),
+                             'Nmin': [60, 120, 30, 90], 'Nhoras': [1.0, 2.0, 0.5, 1.5], column: values})
+
+    def get_dafor_minute_store(self):
+        self._count('minute_store')
+        return DaforMinuteStore.from_frame(self.dafor)
+
+    def get_indicator_cube(self):
+        self._count('indicator_cube')
+        return IndicatorCube(DaforMinuteStore.from_frame(self.dafor))
+
+    def get_locality_data(self):
+        self._count('localities')
+        return pd.DataFrame({'locality_id': list(self.names), 'name': list(self.names.values()),
+                             'length_m': [1000.0, 2500.0, 400.0, 1800.0]})
+
+    def get_occurrences_data(self, start_date=None, end_date=None):
+        self._count('occurrences')
+        return pd.DataFrame({'occurrence_id': [1, 2, 3], 'locality_id': [1, 2, 2], 'name': ['Loc 1', 'Loc 2', 'Loc 2'],
+                             'date': pd.to_datetime(['2022-03-01', '2023-05-10', '2024-01-20'])})
+
+    def get_dpue_by_locality(self, start_date=None, end_date=None):
+        self._count('dpue')
+        return self._per_locality('DPUE', [0.5, 1.2, 0.0, 2.1])
+
+    def get_raiw_by_locality(self, start_date=None, end_date=None):
+        self._count('raiw')
+        return self._per_locality('RAIW', [0.2, 0.9, 0.0, 1.4])
+
+    def get_sum_of_dafor_by_locality(self, start_date=None, end_date=None):
+        self._count('dafor_sum')
+        return pd.DataFrame({'locality_id': [1, 2, 2, 4], 'name': ['Loc 1', 'Loc 2', 'Loc 2', 'Loc 4'],
+                             'date': pd.to_datetime(['2022-02-01', '2022-06-01', '2023-06-01', '2024-02-01']),
+                             'DAFOR': [12.0, 30.0, 18.0, 44.0]})
+
+    def get_management_data(self, start_date=None, end_date=None):
+        self._count('management')
+        return pd.DataFrame({'management_id': [1, 2, 3], 'locality_id': [1, 2, 4],
+                             'Date': ['07/12/2022', '09/08/2023', '15/02/2024'],
+                             'number_of_divers': [2, 3, 2], 'number_of_cylinders': [4, 6, 3],
+                             'method': ['Mecanizado', 'Manual', 'Mecanizado'],
+                             'managed_mass_kg': [44.5, 12.0, 30.25], 'occurrences_managed': [1, 2, 1]})
+
+
+def test_charts_of_one_context_load_each_source_once():
+    service = CountingService()
+    ctx = ReportContext(service)
+    for build in REPORT_CHARTS.values():
+        build(ctx)
+    summary = compute_report_summary(ctx)
+
+    assert summary['total_management_kg'] == pytest.approx(86.75)
+    assert summary['total_occurrences'] == 3
+    assert service.loads == dict.fromkeys(['indicator_cube', 'minute_store', 'localities', 'occurrences',
+                                           'dpue', 'raiw', 'dafor_sum', 'management'], 1)
+
+
+def test_load_all_reads_every_source_once():
+    service = CountingService()
+    ctx = ReportContext(service).load_all()
+    for build in REPORT_CHARTS.values():
+        build(ctx)
+    assert len(service.loads) == 8 and set(service.loads.values()) == {1}
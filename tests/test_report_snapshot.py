@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+try:
+    import cs_report_snapshot
+    from cs_report_build import ReportBuild
+except (ValueError, ConnectionError):
+    # cs_report connects to the database on import (config/database.py)
+    pytest.skip("no database configured", allow_module_level=True)
+
+FIGURE = {'data': [], 'layout': {'title': {'text': 'stored'}}}
+SUMMARY = {'total_localities': 2, 'total_management_kg': 1.5, 'total_occurrences': 3, 'avg_dpue': 0.25}
+
+
+@pytest.fixture
+def fingerprint(monkeypatch):
+    current = [[[3, 3, '2026-10-17 10:00:00']]]
+    monkeypatch.setattr(cs_report_snapshot, 'data_fingerprint', lambda: current[0])
+    monkeypatch.setattr(cs_report_snapshot.snapshot_store, 'poll_seconds', 0)
+    return current
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch, fingerprint):
+    def build_report_figures(**options):
+        build = ReportBuild('serial', 1)
+        build.add('report-temporal-chart', json.dumps(FIGURE), 0.1)
+        build.fail('report-ranking-chart', 'boom')
+        return build
+
+    monkeypatch.setattr(cs_report_snapshot, 'build_report_figures', build_report_figures)
+    monkeypatch.setattr(cs_report_snapshot, 'ReportContext', lambda: None)
+    monkeypatch.setattr(cs_report_snapshot, 'compute_report_summary', lambda ctx: SUMMARY)
+    cs_report_snapshot.write_report_snapshot(str(tmp_path))
+    return str(tmp_path)
+
+
+def test_current_snapshot_is_served(snapshot_dir):
+    assert cs_report_snapshot.load_report_figure('report-temporal-chart', snapshot_dir) == FIGURE
+    assert cs_report_snapshot.load_report_figure('report-ranking-chart', snapshot_dir) is None
+    assert cs_report_snapshot.load_report_summary(snapshot_dir) == SUMMARY
+
+
+def test_snapshot_of_old_data_is_not_served(snapshot_dir, fingerprint):
+    fingerprint[0] = [[4, 4, '2026-10-17 11:00:00']]
+    assert cs_report_snapshot.load_report_figure('report-temporal-chart', snapshot_dir) is None
+    assert cs_report_snapshot.load_report_summary(snapshot_dir) is None
+
+
+def test_fingerprint_check_is_reused_within_the_poll_interval(snapshot_dir, fingerprint, monkeypatch):
+    monkeypatch.setattr(cs_report_snapshot.snapshot_store, 'poll_seconds', 60)
+    assert cs_report_snapshot.load_report_summary(snapshot_dir) == SUMMARY
+    fingerprint[0] = [[4, 4, '2026-10-17 11:00:00']]
+    assert cs_report_snapshot.load_report_summary(snapshot_dir) == SUMMARY
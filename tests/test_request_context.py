@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pandas as pd
+
+from services.request_context import (
+    ContextStore, DashboardData, DashboardFilters, resolve_dashboard_filters, resolve_locality_ids,
+)
+
+GROUPS = {'rebiogrp': [3, 1], 'rebiogrp_entorno': [1, 2, 3]}
+
+
+class FakeService:
+    def __init__(self):
+        self.calls = 0
+
+    def get_management_data(self, start_date=None, end_date=None):
+        self.calls += 1
+        time.sleep(0.05)
+        return pd.DataFrame({'locality_id': [1, 2, 3], 'managed_mass_kg': [1.0, 2.0, 3.0]})
+
+    def get_dpue_by_locality(self, start_date=None, end_date=None):
+        return pd.DataFrame({'locality_id': [1, 2, 3], 'DPUE': [0.1, 0.2, 0.3]})
+
+
+def test_resolve_locality_ids():
+    assert resolve_locality_ids(None) is None
+    assert resolve_locality_ids([]) is None
+    assert resolve_locality_ids([5, 0]) is None
+    assert resolve_locality_ids(['rebiogrp', '2', 'x'], GROUPS) == (1, 2, 3)
+    assert resolve_locality_ids(7) == (7,)
+
+
+def test_filters_are_shared_across_equivalent_controls():
+    today = pd.Timestamp('2026-10-17 15:00')
+    a = resolve_dashboard_filters(['rebiogrp_entorno'], '1year', groups=GROUPS, today=today)
+    b = resolve_dashboard_filters([3, 2, 1], None, '2020-01-01', groups=GROUPS, today=today)
+    assert a == b
+    assert a.start_date == pd.Timestamp('2025-10-17')
+
+
+def test_sources_load_once_for_concurrent_callbacks():
+    service = FakeService()
+    data = DashboardData(service, DashboardFilters(None, None, (1, 3)))
+    threads = [threading.Thread(target=data.management) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert service.calls == 1
+    frame = data.management()
+    frame['managed_mass_kg'] = 0
+    assert data.management()['managed_mass_kg'].sum() == 6.0
+    assert data.dpue()['locality_id'].tolist() == [1, 3]
+
+
+def test_context_store_lru_and_ttl():
+    store = ContextStore(max_entries=2, ttl_seconds=0.05)
+    first = store.get('a', object)
+    assert store.get('a', object) is first
+    store.get('b', object)
+    store.get('c', object)
+    assert store.get('a', object) is not first
+    second = store.get('c', object)
+    time.sleep(0.06)
+    assert store.get('c', object) is not second
@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.result_cache import ResultCache, normalise_argument
+
+
+class FakeService:
+    def __init__(self, cache, version):
+        self.calls = 0
+        self.version = version
+
+        @cache.cached(lambda: self.version[0])
+        def totals(service, start_date=None, end_date=None, locality_ids=None):
+            service.calls += 1
+            return pd.DataFrame({'value': np.arange(100.0)})
+        self.totals = lambda *args, **kwargs: totals(self, *args, **kwargs)
+
+
+def test_hits_share_normalised_arguments_and_return_copies():
+    cache = ResultCache(max_bytes=10 ** 6)
+    service = FakeService(cache, [(1,)])
+    first = service.totals('2024-01-01', pd.Timestamp('2024-02-01'), [1, 2])
+    first['value'] = 0
+    second = service.totals(start_date=pd.Timestamp('2024-01-01'), end_date='2024-02-01',
+                            locality_ids=np.array([1, 2]))
+    assert service.calls == 1
+    assert second['value'].sum() == np.arange(100.0).sum()
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_new_data_version_and_bypass():
+    cache = ResultCache(max_bytes=10 ** 6)
+    service = FakeService(cache, [(1,)])
+    service.totals()
+    service.version[0] = (2,)
+    service.totals()
+    service.version[0] = None
+    service.totals()
+    service.totals()
+    assert service.calls == 4
+
+
+def test_lru_eviction_by_bytes_and_ttl():
+    frame = pd.DataFrame({'value': np.arange(1000.0)})
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+    cache = ResultCache(max_bytes=2 * size + 10)
+    for key in 'abc':
+        cache.put((key,), frame)
+        cache.get(('a',))
+    assert [cache.get((key,))[0] for key in 'abc'] == [True, False, True]
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] <= cache.max_bytes
+
+    cache.put(('short',), 1, ttl_seconds=0.01)
+    time.sleep(0.02)
+    assert cache.get(('short',)) == (False, None)
+    assert cache.stats()['expirations'] == 1
+
+
+def test_normalise_argument():
+    assert normalise_argument(np.int64(3)) == 3
+    assert normalise_argument({3, 1}) == (1, 3)
+    assert normalise_argument('2024-01-01') == normalise_argument(pd.Timestamp('2024-01-01'))
+    assert normalise_argument('Saco do Vidal') == 'Saco do Vidal'
+    assert normalise_argument(np.datetime64('2024-01-01')) == pd.Timestamp('2024-01-01').isoformat()
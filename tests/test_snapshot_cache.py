@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pandas as pd
+
+from services.snapshot_cache import TableSnapshotStore
+
+
+class FakeTable:
+    def __init__(self, rows=3, delay=0.0):
+        self.rows = rows
+        self.delay = delay
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        time.sleep(self.delay)
+        return pd.DataFrame({'id': range(1, self.rows + 1)})
+
+
+def test_get_returns_isolated_copies():
+    table = FakeTable()
+    store = TableSnapshotStore(ttl_seconds=60)
+    store.register('t', table.load)
+    frame = store.get('t')
+    frame['id'] = 0
+    assert store.get('t')['id'].tolist() == [1, 2, 3]
+    assert table.loads == 1
+
+
+def test_ttl_expiry_reloads():
+    table = FakeTable()
+    store = TableSnapshotStore(ttl_seconds=0.05)
+    store.register('t', table.load)
+    store.get('t')
+    store.get('t')
+    time.sleep(0.06)
+    store.get('t')
+    assert table.loads == 2
+
+
+def test_concurrent_misses_share_one_load():
+    table = FakeTable(delay=0.05)
+    store = TableSnapshotStore(ttl_seconds=60)
+    store.register('t', table.load)
+    threads = [threading.Thread(target=store.get, args=('t',)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert table.loads == 1
+
+
+def test_disabled_store_always_loads():
+    table = FakeTable()
+    store = TableSnapshotStore(ttl_seconds=0)
+    store.register('t', table.load)
+    store.get('t')
+    store.get('t')
+    assert table.loads == 2
+
+
+def test_fingerprint_polling_bumps_version():
+    table = FakeTable()
+    fingerprint = [(3, 3)]
+    store = TableSnapshotStore(ttl_seconds=60, poll_seconds=0)
+    store.register('t', table.load, fingerprint=lambda: fingerprint[0])
+    first = store.version('t')
+    assert store.version('t') == first and table.loads == 1
+
+    table.rows = 4
+    fingerprint[0] = (4, 4)
+    assert store.version('t') != first
+    assert len(store.get('t')) == 4 and table.loads == 2
+    assert store.fingerprints('t') == ((4, 4),)
+
+
+def test_fingerprint_is_only_polled_when_due():
+    table = FakeTable()
+    fingerprint = [(3, 3)]
+    store = TableSnapshotStore(ttl_seconds=60, poll_seconds=60)
+    store.register('t', table.load, fingerprint=lambda: fingerprint[0])
+    first = store.version('t')
+    fingerprint[0] = (4, 4)
+    assert store.version('t') == first and table.loads == 1
+
+
+def test_append_grows_snapshot_or_falls_back_to_reload():
+    table = FakeTable()
+    fingerprint = [(3, 3)]
+    appended = []
+
+    def append(frame, old, new):
+        appended.append((old, new))
+        if new[0] < old[0]:
+            return None
+        return pd.concat([frame, pd.DataFrame({'id': range(old[1] + 1, new[1] + 1)})], ignore_index=True)
+
+    store = TableSnapshotStore(ttl_seconds=60, poll_seconds=0)
+    store.register('t', table.load, fingerprint=lambda: fingerprint[0], append=append)
+    first = store.version('t')
+
+    fingerprint[0] = (5, 5)
+    assert store.get('t')['id'].tolist() == [1, 2, 3, 4, 5]
+    assert table.loads == 1 and appended == [((3, 3), (5, 5))]
+    assert store.version('t') != first
+
+    # Rows deleted: the appender refuses and the table is reloaded
+    table.rows = 2
+    fingerprint[0] = (2, 5)
+    assert store.get('t')['id'].tolist() == [1, 2]
+    assert table.loads == 2
@@ -0,0 +1,147 @@
+import json
+
+import numpy as np
+import pandas as pd
+from geopy.distance import geodesic
+
+from services import spatial_dafor
+
+
+def _interpolate_point_on_line(coords, cumulative_dist, target_dist):
+    for i in range(len(cumulative_dist) - 1):
+        if cumulative_dist[i] <= target_dist <= cumulative_dist[i + 1]:
+            seg_length = cumulative_dist[i + 1] - cumulative_dist[i]
+            if seg_length == 0:
+                return coords[i]
+            fraction = (target_dist - cumulative_dist[i]) / seg_length
+            return [coords[i][0] + (coords[i + 1][0] - coords[i][0]) * fraction,
+                    coords[i][1] + (coords[i + 1][1] - coords[i][1]) * fraction]
+    return None
+
+
+def legacy_spatial_dafor(df_locality, df_dafor, radius_m=50):
+    """
+    The per-locality loop the engine replaced, kept as the reference output:
+    geopy lengths along each boundary and a brute-force geodesic distance from
+    every segment midpoint to every monitoring point of its locality (the
+    degree box of the original query replaced by the metric `radius_m`).
+    """
+    monitoring_segments = [
+        dict(segment, locality_id=locality_id)
+        for locality_id, segments in zip(df_dafor['locality_id'], df_dafor['monitoring_segments'])
+        for segment in segments
+    ]
+    rows = []
+    for _, loc_row in df_locality.iterrows():
+        coords = json.loads(loc_row['coords_local'])
+        loc_monitoring = [s for s in monitoring_segments if s['locality_id'] == loc_row['locality_id']]
+        if not loc_monitoring:
+            continue
+        cumulative_dist = [0]
+        for i in range(len(coords) - 1):
+            cumulative_dist.append(cumulative_dist[-1] + geodesic(coords[i], coords[i + 1]).meters)
+        total_length = cumulative_dist[-1]
+        for seg_idx in range(max(1, int(total_length / 100))):
+            start = _interpolate_point_on_line(coords, cumulative_dist, seg_idx * 100)
+            end = _interpolate_point_on_line(coords, cumulative_dist, min((seg_idx + 1) * 100, total_length))
+            mid = [(start[0] + end[0]) / 2, (start[1] + end[1]) / 2]
+            nearby = [s for s in loc_monitoring if geodesic(mid, (s['lat'], s['lon'])).meters <= radius_m]
+            total_effort = sum(s['effort'] for s in nearby)
+            score = sum(s['dafor_score'] * s['effort'] for s in nearby) / total_effort if nearby else 0.0
+            rows.append({
+                'locality_id': loc_row['locality_id'], 'name': loc_row['name'],
+                'start_lat': start[0], 'start_lon': start[1],
+                'end_lat': end[0], 'end_lon': end[1], 'dafor_score': score,
+            })
+    return pd.DataFrame(rows)
+
+
+def synthetic_tables(n_localities=12, n_transects=150, seed=0):
+    rng = np.random.default_rng(seed)
+    localities = []
+    for locality_id in range(1, n_localities + 1):
+        n = rng.integers(3, 30)
+        coords = np.cumsum(rng.normal(0, 0.0006, (n, 2)), axis=0) + rng.normal([-27.28, -48.39], 0.02)
+        localities.append({'locality_id': locality_id, 'name': f'L{locality_id}',
+                           'coords_local': json.dumps(coords.tolist())})
+    df_locality = pd.DataFrame(localities)
+
+    transects = []
+    # The last locality has no monitoring and must be left out
+    for _ in range(n_transects):
+        locality = localities[rng.integers(0, n_localities - 1)]
+        boundary = np.asarray(json.loads(locality['coords_local']))
+        centre = boundary[rng.integers(0, len(boundary))]
+        segments = [{'lat': lat, 'lon': lon, 'dafor_score': float(rng.choice([0, 2, 4, 6, 8, 10])),
+                     'effort': int(rng.integers(1, 8))}
+                    for lat, lon in centre + rng.normal(0, 0.0004, (rng.integers(0, 5), 2))]
+        transects.append({'locality_id': locality['locality_id'], 'monitoring_segments': segments,
+                          'date': pd.Timestamp('2023-01-01') + pd.Timedelta(days=int(rng.integers(0, 730)))})
+    return df_locality, pd.DataFrame(transects)
+
+
+def run_engine(df_locality, df_dafor, start_date=None, end_date=None, radius_m=50):
+    grid = spatial_dafor.segment_localities(df_locality)
+    index = spatial_dafor.MonitoringIndex(spatial_dafor.monitoring_arrays(df_dafor))
+    return spatial_dafor.spatial_dafor_frame(grid, index, start_date, end_date, radius_m)
+
+
+def test_engine_matches_legacy_pipeline():
+    df_locality, df_dafor = synthetic_tables()
+    expected = legacy_spatial_dafor(df_locality, df_dafor)
+    result = run_engine(df_locality, df_dafor)
+
+    assert len(expected) > 0
+    assert (result['dafor_score'] > 0).any()
+    pd.testing.assert_frame_equal(result, expected[spatial_dafor.OUTPUT_COLUMNS],
+                                  check_dtype=False, rtol=1e-12)
+
+
+def test_date_window_matches_filtered_input():
+    df_locality, df_dafor = synthetic_tables()
+    start, end = pd.Timestamp('2023-06-01'), pd.Timestamp('2024-02-15')
+    in_window = df_dafor[(df_dafor['date'] >= start) & (df_dafor['date'] <= end)]
+    expected = legacy_spatial_dafor(df_locality, in_window)
+    result = run_engine(df_locality, df_dafor, start, end)
+    pd.testing.assert_frame_equal(result, expected[spatial_dafor.OUTPUT_COLUMNS],
+                                  check_dtype=False, rtol=1e-12)
+
+
+def test_radius_is_metric():
+    # A 150 m north-south boundary; its first segment midpoint is at 50 m
+    df_locality = pd.DataFrame({'locality_id': [1], 'name': ['L1'],
+                                'coords_local': [json.dumps([[-27.28, -48.39], [-27.28135, -48.39]])]})
+    mid_lat = -27.28 - 0.00045
+
+    def transect(lat, lon, score):
+        return {'locality_id': 1, 'date': pd.Timestamp('2024-01-01'),
+                'monitoring_segments': [{'lat': lat, 'lon': lon, 'dafor_score': score, 'effort': 1}]}
+
+    # 0.00047 deg north is ~52 m (inside a 0.0005 deg box, outside 50 m);
+    # 0.0005 deg east is ~49 m
+    df_dafor = pd.DataFrame([transect(mid_lat + 0.00047, -48.39, 10.0), transect(mid_lat, -48.3895, 4.0)])
+    result = run_engine(df_locality, df_dafor)
+    assert result['dafor_score'].iloc[0] == 4.0
+    assert run_engine(df_locality, df_dafor, radius_m=60)['dafor_score'].iloc[0] == 7.0
+
+
+def test_no_monitoring_gives_empty_frame():
+    df_locality, df_dafor = synthetic_tables()
+    result = run_engine(df_locality, df_dafor.iloc[:0])
+    assert result.empty
+    assert list(result.columns) == spatial_dafor.OUTPUT_COLUMNS
+
+
+def test_undated_transects_only_count_without_window():
+    df_locality, df_dafor = synthetic_tables()
+    df_dafor = df_dafor.astype({'date': 'datetime64[ns]'})
+    df_dafor.loc[df_dafor.index[:10], 'date'] = pd.NaT
+    start, end = pd.Timestamp('2023-06-01'), pd.Timestamp('2024-02-15')
+
+    pd.testing.assert_frame_equal(run_engine(df_locality, df_dafor),
+                                  legacy_spatial_dafor(df_locality, df_dafor)[spatial_dafor.OUTPUT_COLUMNS],
+                                  check_dtype=False, rtol=1e-12)
+    in_window = df_dafor[(df_dafor['date'] >= start) & (df_dafor['date'] <= end)]
+    pd.testing.assert_frame_equal(run_engine(df_locality, df_dafor, start, end),
+                                  legacy_spatial_dafor(df_locality, in_window)[spatial_dafor.OUTPUT_COLUMNS],
+                                  check_dtype=False, rtol=1e-12)
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import pandas as pd
+
+from services.window_filter import build_window_filter, sql_date
+
+
+def test_no_filter():
+    assert build_window_filter('Date') == ("", {})
+    # A window needs both ends
+    assert build_window_filter('Date', '2024-01-01', None) == ("", {})
+
+
+def test_dates_only():
+    where, params = build_window_filter('Date', '2024-01-01', pd.Timestamp('2024-01-31 23:59:59'))
+    assert where == f" WHERE {sql_date('Date')} BETWEEN :start_date AND :end_date"
+    assert params == {'start_date': datetime(2024, 1, 1), 'end_date': datetime(2024, 1, 31, 23, 59, 59)}
+    assert "STR_TO_DATE(Date, '%d/%m/%Y')" in where
+
+
+def test_localities_only():
+    where, params = build_window_filter('Date', locality_ids=('3', 5), locality_column='locality_id')
+    assert where == " WHERE locality_id IN :locality_ids"
+    assert params == {'locality_ids': [3, 5]}
+
+
+def test_dates_and_localities():
+    where, params = build_window_filter('Date', '2024-01-01', '2024-02-01', [7])
+    assert where == f" WHERE {sql_date('Date')} BETWEEN :start_date AND :end_date AND Locality_id IN :locality_ids"
+    assert set(params) == {'start_date', 'end_date', 'locality_ids'}